@@ -0,0 +1,154 @@
+"""
+Captcha veri seti ölçümü (Ağ yok, canlı sunucuya dokunmadan).
+
+  1. Depolama: Aynı sentetik örnekler eski düzende (Her ham görüntü + her rakam ayrı PNG) ve
+     paketlenmiş depoda (DatasetStore) yazılır; yazma süresi, dosya sayısı ve eğitim için
+     tüm rakamları yükleme süresi karşılaştırılır. İki yoldan okunan rakamlar ve etiketler aynı
+     olmalı, değilse çıkış kodu 1 olur.
+  2. Toplama: Harvester, yerel sahte OBS'den (Gecikmeli) farklı thread sayılarıyla captcha
+     indirip ön etiketler; saniyede kuyruğa giren captcha sayısı raporlanır.
+
+  python benchmarks/bench_dataset.py --samples 2000 --harvest 60 --workers 1,4,8
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, current_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import cv2
+import numpy as np
+
+from fake_obs import FakeOBS
+from src.services.captcha_solver.captcha_solver import CaptchaSolver
+from src.services.captcha_solver.dataset_store import DatasetStore, label_digits
+
+
+def synthetic_samples(count: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        d = rng.integers(0, 10, 3)
+        yield rng.integers(0, 256, (40, 177), dtype=np.uint8), f"{d[0]}{d[1]}+{d[2]}"
+
+
+def write_png_tree(root: str, count: int) -> float:
+    """Eski collect_data.py düzeni: dataset/<etiket>_<n>.png + dataset_digits/<rakam>/<n>.png"""
+    started = time.perf_counter()
+    raw_dir = os.path.join(root, "dataset")
+    os.makedirs(raw_dir)
+    for i, (image, label) in enumerate(synthetic_samples(count)):
+        cv2.imwrite(os.path.join(raw_dir, f"{label}_{i:08d}.png"), image)
+        for k, (digit, value) in enumerate(zip(CaptchaSolver.slice_digits(image), label_digits(label))):
+            folder = os.path.join(root, "dataset_digits", str(value))
+            os.makedirs(folder, exist_ok=True)
+            cv2.imwrite(os.path.join(folder, f"{i:08d}_{k}.png"), digit)
+    return time.perf_counter() - started
+
+
+def load_png_tree(root: str):
+    """Eğitimin eski yükleme yolu: Her rakam dosyasını tek tek aç ve decode et."""
+    xs, ys = [], []
+    for value in range(10):
+        for path in sorted(glob.glob(os.path.join(root, "dataset_digits", str(value), "*.png"))):
+            xs.append((os.path.basename(path), cv2.imread(path, cv2.IMREAD_GRAYSCALE)))
+            ys.append(value)
+    # Depodaki sırayla (Örnek no, rakam no) karşılaştırabilmek için sırala
+    order = sorted(range(len(xs)), key=lambda i: xs[i][0])
+    return np.stack([xs[i][1] for i in order]), np.array([ys[i] for i in order], dtype=np.uint8)
+
+
+def write_store(root: str, count: int, shard_size: int) -> float:
+    started = time.perf_counter()
+    with DatasetStore(root, shard_size=shard_size) as store:
+        for image, label in synthetic_samples(count):
+            store.append(image, label, CaptchaSolver.slice_digits(image))
+    return time.perf_counter() - started
+
+
+def count_files(root: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+def bench_storage(samples: int, shard_size: int) -> dict:
+    tmp = tempfile.mkdtemp(prefix="bench_dataset_")
+    try:
+        png_root, store_root = os.path.join(tmp, "png"), os.path.join(tmp, "store")
+        png_write = write_png_tree(png_root, samples)
+        store_write = write_store(store_root, samples, shard_size)
+
+        started = time.perf_counter()
+        png_x, png_y = load_png_tree(png_root)
+        png_load = time.perf_counter() - started
+        started = time.perf_counter()
+        store_x, store_y = DatasetStore(store_root).digit_arrays()
+        store_load = time.perf_counter() - started
+
+        return {
+            "samples": samples,
+            "png": {"write_s": png_write, "load_s": png_load, "files": count_files(png_root)},
+            "store": {"write_s": store_write, "load_s": store_load, "files": count_files(store_root)},
+            "equal": bool(np.array_equal(png_x, store_x) and np.array_equal(png_y, store_y))
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captcha veri seti depolama ve toplama ölçümü")
+    parser.add_argument("--samples", type=int, default=1000, help="Sentetik captcha sayısı")
+    parser.add_argument("--shard-size", type=int, default=512)
+    parser.add_argument("--harvest", type=int, default=40, help="Her thread sayısı için toplanacak captcha (0: atla)")
+    parser.add_argument("--workers", default="1,4", help="Denenecek harvester thread sayıları")
+    parser.add_argument("--latency", type=float, default=0.05, help="Sahte OBS istek gecikmesi (sn)")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    storage = bench_storage(args.samples, args.shard_size)
+    print(f"{args.samples} captcha ({args.samples * 3} rakam):")
+    for key, title in (("png", "PNG klasörleri"), ("store", "Paketli depo")):
+        r = storage[key]
+        print(f"  {title:16} yazma {r['write_s']:6.2f} sn  yükleme {r['load_s'] * 1000:8.1f} ms  {r['files']:6d} dosya")
+    print(f"  Rakamlar ve etiketler aynı: {'evet' if storage['equal'] else 'HAYIR'}")
+
+    harvest = []
+    if args.harvest > 0:
+        from src.services.captcha_solver.collect_data import Harvester
+        solver = CaptchaSolver()
+        fake = FakeOBS(latency=args.latency)
+        host = fake.start()
+        try:
+            for workers in (int(w) for w in args.workers.split(",")):
+                harvester = Harvester(workers=workers, prefetch=workers * 2, host=host, solver=solver)
+                started = time.perf_counter()
+                harvester.start()
+                labelled = sum(1 for _ in range(args.harvest) if harvester.get().prediction is not None)
+                elapsed = time.perf_counter() - started
+                harvester.stop()
+                harvest.append({"workers": workers, "captchas": args.harvest, "seconds": elapsed,
+                                "per_second": args.harvest / elapsed, "prelabelled": labelled,
+                                "errors": dict(harvester.errors)})
+        finally:
+            fake.stop()
+        print(f"\nToplama (Sahte OBS, {args.latency * 1000:.0f} ms gecikme):")
+        for r in harvest:
+            print(f"  {r['workers']:2d} thread: {r['per_second']:6.1f} captcha/sn "
+                  f"(ön etiketli {r['prelabelled']}/{r['captchas']}, hata {sum(r['errors'].values())})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"storage": storage, "harvest": harvest}, f, indent=2, ensure_ascii=False)
+    if not storage["equal"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+HTML parser ölçümü ve eşdeğerlik kontrolü (Ağ yok).
+
+Sayfalar: Sahte OBS'nin login / not / istatistik sayfaları (Farklı menü boyutlarıyla) ve
+--fixtures ile verilen klasördeki kayıtlı gerçek sayfalar (*.html).
+Her parser ("fast", "html.parser", "lxml") için, OBSClient'ın okuduğu her şey (gizli inputlar,
+dönemler, ders satırları, istatistik ortalamaları, captcha linki) referans (html.parser, tam ağaç)
+ile karşılaştırılır. Fark varsa çıkış kodu 1 olur.
+
+  python benchmarks/bench_parse.py --repeat 50 --fixtures kayitli_sayfalar/
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Dict, List, Tuple
+
+# Proje kök dizinini path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, current_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fake_obs import FakeOBS
+from src.services.obs_client import OBSClient
+from src.services.page_parser import PARSERS
+
+REFERENCE = "html.parser"
+
+
+def build_fixtures(chrome_sizes: List[int], courses: int, fixtures_dir: str = None) -> List[Tuple[str, bytes]]:
+    pages = []
+    for kb in chrome_sizes:
+        fake = FakeOBS(courses=courses, chrome_kb=kb)
+        term = fake.current_term
+        pages.append((f"login (menü {kb} KB)", fake.login_page().encode("utf-8")))
+        pages.append((f"notlar (menü {kb} KB)", fake.grades_page(term).encode("utf-8")))
+        pages.append((f"istatistik (menü {kb} KB)", fake.stats_page(term, 0).encode("utf-8")))
+    if fixtures_dir:
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+            with open(path, "rb") as f:
+                pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def extract(client: OBSClient, page: bytes, ids: Tuple[str, ...], row_count: int) -> Dict:
+    """OBSClient'ın bir sayfadan okuduğu her şey (Karşılaştırılabilir sade veri olarak)."""
+    soup = client.parser.parse(page, ids)
+    img = soup.find(id="imgCaptchaImg")
+    result = {
+        "hidden": client._get_hidden_inputs(soup),
+        "captcha_src": img.get("src") if img else None,
+        "term": client._selected_term(soup),
+        "terms": client.list_terms(soup) if soup.find("select", id="cmbDonemler") else [],
+        "averages": client._parse_averages_from_html(page.decode("utf-8", "replace")),
+        "rows": []
+    }
+    if row_count and soup.find(id="grd_not_listesi"):
+        # Satırlar istatistik istekleri başlamadan önce yield edilir; sadece o kısım okunur
+        updates = islice(client._iter_grades_page(soup), row_count)
+        result["rows"] = [(u.course.code, u.course.name, u.course.letter_grade, u.course.midterm.score,
+                           u.course.final.score, u.course.makeup.score) for u in updates]
+    return result
+
+
+def time_parse(client: OBSClient, page: bytes, ids: Tuple[str, ...], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.parser.parse(page, ids)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parser ölçümü ve eşdeğerlik kontrolü")
+    parser.add_argument("--repeat", type=int, default=30, help="Sayfa başına parse tekrarı")
+    parser.add_argument("--courses", type=int, default=12)
+    parser.add_argument("--chrome-kb", default="0,60", help="Sahte sayfalara eklenecek menü boyutları (KB)")
+    parser.add_argument("--fixtures", help="Kayıtlı gerçek sayfaların (*.html) klasörü")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    clients = {}
+    for name in PARSERS:
+        try:
+            clients[name] = OBSClient(parser=name)
+        except ValueError as e:
+            print(f"[ATLANDI] {name}: {e}")
+
+    reference = clients[REFERENCE]
+    pages = build_fixtures([int(kb) for kb in args.chrome_kb.split(",")], args.courses, args.fixtures)
+    results = []
+    mismatches = 0
+    for label, page in pages:
+        ref_soup = reference.parser.parse(page)
+        # Sayfada hangi elementler varsa OBSClient onları ister (login / not / istatistik sayfası)
+        ids = tuple(i for i in reference.LOGIN_PAGE_IDS + reference.GRADES_PAGE_IDS + reference.STATS_PAGE_IDS
+                    if ref_soup.find(id=i))
+        table = ref_soup.find(id="grd_not_listesi")
+        row_count = sum(1 for tr in table.find_all("tr")[1:] if len(tr.find_all("td")) >= 5) if table else 0
+        expected = extract(reference, page, ids, row_count)
+
+        row = {"page": label, "kb": round(len(page) / 1024, 1), "ms": {}, "equal": {}}
+        for name, client in clients.items():
+            row["ms"][name] = round(time_parse(client, page, ids, args.repeat), 3)
+            row["equal"][name] = extract(client, page, ids, row_count) == expected
+            if not row["equal"][name]:
+                mismatches += 1
+        results.append(row)
+
+    names = list(clients)
+    print(f"\n{'Sayfa':<26} {'KB':>6} " + " ".join(f"{n + ' ms':>15}" for n in names))
+    for row in results:
+        cells = []
+        for n in names:
+            mark = "" if row["equal"][n] else " ≠"
+            cells.append(f"{row['ms'][n]:>13.3f}{mark:>2}")
+        print(f"{row['page']:<26} {row['kb']:>6} " + " ".join(cells))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+
+    if mismatches:
+        print(f"\n[HATA] {mismatches} sayfa/parser çiftinde sonuç referanstan ({REFERENCE}) farklı (≠)!")
+        sys.exit(1)
+    print(f"\nTüm parser'lar referansla ({REFERENCE}) aynı sonucu verdi.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+OBSClient uçtan uca ölçümü (Yerel sahte OBS üzerinde, canlı sunucuya dokunmadan).
+
+Her mod için: login + N kez fetch_grades. Rapor: çekim başına istek sayısı, aktarılan byte,
+duvar saati (p50/p95) ve istek gecikmesi (p50/p95). Sonuçlar sahte sunucunun verisiyle
+karşılaştırılır; yanlış ortalama dönerse çıkış kodu 1 olur (Regresyon testi olarak da kullanılır).
+
+  python benchmarks/bench_pull.py --courses 9 --latency 0.05 --pulls 5 --json sonuc.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+# Proje kök dizinini path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, current_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fake_obs import FakeOBS
+from src.services.obs_client import OBSClient
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Basit (nearest-rank) yüzdelik; numpy gerektirmez."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def run_mode(fake: FakeOBS, base_url: str, stats_workers: int, pulls: int) -> Dict:
+    client = OBSClient(stats_workers=stats_workers, host=base_url)
+    latencies: List[float] = []
+    client.session.hooks["response"].append(lambda r, *args, **kwargs: latencies.append(r.elapsed.total_seconds()))
+
+    # Login (Captcha'yı sahte sunucu kontrol etmiyor, sabit kod yeterli)
+    fake.reset_stats()
+    started = time.perf_counter()
+    if not client.login("20230001", "parola", lambda image, attempt: "42"):
+        raise RuntimeError("Sahte sunucuya giriş yapılamadı")
+    login_seconds = time.perf_counter() - started
+    login_requests = fake.stats["requests"]
+
+    latencies.clear()
+    fake.reset_stats()
+    walls = []
+    mismatches = 0
+    expected = fake.expected_averages(fake.current_term)
+    for _ in range(pulls):
+        started = time.perf_counter()
+        grades = client.fetch_grades()
+        walls.append(time.perf_counter() - started)
+        got = [{"Vize": g.midterm.class_avg, "Final": g.final.class_avg, "Büt": g.makeup.class_avg} for g in grades]
+        if got != expected:
+            mismatches += 1
+    client.session.close()
+
+    stats = fake.stats
+    return {
+        "mode": "seri" if stats_workers == 1 else f"paralel x{stats_workers}",
+        "stats_workers": stats_workers,
+        "login_seconds": round(login_seconds, 4),
+        "login_requests": login_requests,
+        "requests_per_pull": stats["requests"] / pulls,
+        "bytes_per_pull": (stats["bytes_in"] + stats["bytes_out"]) // pulls,
+        "by_page": {page: count / pulls for page, count in stats["by_page"].items()},
+        "wall_p50": round(percentile(walls, 50), 4),
+        "wall_p95": round(percentile(walls, 95), 4),
+        "latency_p50": round(percentile(latencies, 50), 4),
+        "latency_p95": round(percentile(latencies, 95), 4),
+        "mismatches": mismatches,
+        "failures": dict(client.failures)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OBSClient uçtan uca benchmark (sahte OBS)")
+    parser.add_argument("--courses", type=int, default=9)
+    parser.add_argument("--latency", type=float, default=0.05, help="Sunucu tarafı istek başı gecikme (sn)")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--pulls", type=int, default=5, help="Mod başına fetch_grades tekrar sayısı")
+    parser.add_argument("--workers", default="1,4,8", help="Denenecek stats_workers değerleri (1 = seri)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Sahte sunucuda istatistik sayfası 503 oranı (Tekrar deneme ölçümü)")
+    parser.add_argument("--no-gzip", action="store_true", help="Sunucu cevapları sıkıştırmasın")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    fake = FakeOBS(courses=args.courses, latency=args.latency, jitter=args.jitter,
+                   error_rate=args.error_rate, compress=not args.no_gzip)
+    base_url = fake.start()
+    try:
+        results = [run_mode(fake, base_url, int(w), args.pulls) for w in args.workers.split(",")]
+    finally:
+        fake.stop()
+
+    print(f"\nSahte OBS: {args.courses} ders, {args.latency * 1000:.0f} ms gecikme, mod başına {args.pulls} çekim\n")
+    print(f"{'Mod':<12} {'İstek':>6} {'KB':>8} {'Süre p50':>9} {'Süre p95':>9} {'İstek p50':>10} {'İstek p95':>10} {'Hata':>5}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['requests_per_pull']:>6.0f} {r['bytes_per_pull'] / 1024:>8.1f} "
+              f"{r['wall_p50']:>8.3f}s {r['wall_p95']:>8.3f}s {r['latency_p50'] * 1000:>8.1f}ms "
+              f"{r['latency_p95'] * 1000:>8.1f}ms {r['mismatches']:>5}")
+        if r["failures"]:
+            print(f"{'':<12} başarısız istekler: {r['failures']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+
+    if any(r["mismatches"] for r in results):
+        print("\n[HATA] Çekilen ortalamalar sahte sunucudaki veriyle uyuşmuyor!")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Rakam kesimi (segmentation) ölçümü ve regresyon kontrolü (Ağ yok).
+
+Referans yerleşimde (xx + x, 177x40) sentetik captcha'lar çizilir ve yatayda kaydırılır:
+  - Kaydırmasız görüntülerde yeni kesim, eski sabit SLICES kesimiyle bire bir aynı olmalı
+    (Mevcut model bu kesimlerle eğitildi).
+  - Kaydırılmış görüntülerde her rakamın en az %80'i kendi kutusunda kalmalı (Sabit kesimle karşılaştırılır).
+  - Boş / yazısız görüntüler reddedilmeli, CaptchaSolver bunlar için modele gitmeden red dönmeli.
+  - Vektörize (batch) kesim ile tek tek kesim hızı karşılaştırılır.
+Kontrollerden biri tutmazsa çıkış kodu 1 olur.
+
+  python benchmarks/bench_segment.py --samples 300 --max-shift 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+import numpy as np
+
+from src.services.captcha_solver import segmentation
+from src.services.captcha_solver.captcha_solver import CaptchaSolver
+
+HEIGHT, WIDTH = 40, segmentation.REFERENCE_WIDTH
+
+
+def _put_centered(canvas: np.ndarray, text: str, center_x: float, color: int) -> Tuple[int, int]:
+    (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2)
+    x = int(center_x - w / 2)
+    cv2.putText(canvas, text, (x, (HEIGHT + h) // 2), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
+    return x, x + w
+
+
+def render(digits, shift: int, rng: np.random.Generator, dark: bool) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """Referans yerleşimde 'ab+c' captcha'sı, shift px kaydırılmış. Arka plan düz, hafif gürültülü.
+    (görüntü, rakam başına [başlangıç, bitiş) sütunları) döner."""
+    background, ink = (20, 230) if dark else (235, 30)
+    canvas = np.full((HEIGHT, WIDTH), background, dtype=np.uint8)
+    glyphs = []
+    for (start, end), digit in zip(segmentation.TEMPLATE, digits):
+        x0, x1 = _put_centered(canvas, str(digit), (start + end) / 2, ink)
+        glyphs.append((x0 + shift, x1 + shift))
+    _put_centered(canvas, "+", 70, ink)
+    # İnce gürültü çizgisi (Sütun profilini tek başına doldurmamalı)
+    y = int(rng.integers(5, HEIGHT - 5))
+    cv2.line(canvas, (0, y), (WIDTH - 1, y + int(rng.integers(-3, 4))), ink, 1)
+    noisy = canvas.astype(np.int16) + rng.integers(-12, 13, canvas.shape)
+    canvas = np.clip(noisy, 0, 255).astype(np.uint8)
+    if shift:
+        shifted = np.full_like(canvas, background)
+        if shift > 0:
+            shifted[:, shift:] = canvas[:, :-shift]
+        else:
+            shifted[:, :shift] = canvas[:, -shift:]
+        canvas = shifted
+    return canvas, glyphs
+
+
+def inside(boxes, glyphs, minimum: float = 0.8) -> bool:
+    """Her rakamın en az minimum oranı kendi kutusunda mı."""
+    return all(max(0, min(e, g1) - max(s, g0)) >= minimum * (g1 - g0) for (s, e), (g0, g1) in zip(boxes, glyphs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rakam kesimi ölçümü ve regresyon kontrolü")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--max-shift", type=int, default=20,
+                        help="Denenecek en büyük kayma (px, sola kayma ilk rakam kesilmeyecek kadarla sınırlı)")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    labels = rng.integers(0, 10, (args.samples, 3))
+    darks = rng.random(args.samples) < 0.5
+    lowest = -min(args.max_shift, segmentation.TEMPLATE[0][0] - 1)
+    shifts = rng.integers(lowest, args.max_shift + 1, args.samples)
+    originals = [render(d, 0, rng, dark)[0] for d, dark in zip(labels, darks)]
+    rendered = [render(d, int(s), rng, dark) for d, s, dark in zip(labels, shifts, darks)]
+    shifted = [image for image, _ in rendered]
+    blanks = [np.full((HEIGHT, WIDTH), v, dtype=np.uint8) for v in rng.integers(0, 256, 20)]
+    problems = []
+
+    # 1. Kaydırmasız: Eski sabit kesimle aynı
+    segs = segmentation.segment_many(originals)
+    same_crops = sum(
+        seg.shift == 0 and np.array_equal(segmentation.crop_digits(img, seg.boxes),
+                                          segmentation.crop_digits(img, segmentation.TEMPLATE))
+        for img, seg in zip(originals, segs))
+    if same_crops != len(originals):
+        problems.append(f"kaydırmasız görüntülerin {len(originals) - same_crops} tanesinde kesim değişti")
+
+    # 2. Kaydırılmış: Rakamlar kutularda kalmalı
+    segs_shifted = segmentation.segment_many(shifted)
+    adaptive_hits = sum(seg.ok and inside(seg.boxes, glyphs) for seg, (_, glyphs) in zip(segs_shifted, rendered))
+    fixed_hits = sum(inside(segmentation.TEMPLATE, glyphs) for _, glyphs in rendered)
+    shift_error = np.abs(np.array([seg.shift for seg in segs_shifted]) - shifts)
+    if adaptive_hits < 0.95 * len(shifted):
+        problems.append(f"kaydırılmış görüntülerde doğru kesim oranı düşük: {adaptive_hits}/{len(shifted)}")
+
+    # 3. Boş görüntüler reddedilmeli (Kesimde ve CaptchaSolver'da)
+    rejected_blank = sum(not seg.ok for seg in segmentation.segment_many(blanks))
+    if rejected_blank != len(blanks):
+        problems.append(f"{len(blanks) - rejected_blank} boş görüntü reddedilmedi")
+    solver = CaptchaSolver()
+    if solver.model:
+        solver_rejected = sum(p is not None and p.rejected for p in solver.solve_many(blanks))
+        if solver_rejected != len(blanks):
+            problems.append(f"CaptchaSolver {len(blanks) - solver_rejected} boş görüntüyü reddetmedi")
+
+    # 5. Hız: Batch (vektörize) / tek tek
+    started = time.perf_counter()
+    segmentation.segment_many(shifted)
+    batch_ms = (time.perf_counter() - started) * 1000 / len(shifted)
+    started = time.perf_counter()
+    for img in shifted:
+        segmentation.segment(img)
+    single_ms = (time.perf_counter() - started) * 1000 / len(shifted)
+
+    print(f"Kaydırmasız: {same_crops}/{len(originals)} görüntüde kesim eski SLICES ile aynı")
+    print(f"Kaydırılmış ({lowest}..+{args.max_shift} px): rakamlar kutuda, yeni kesim {adaptive_hits}/{len(shifted)}, "
+          f"sabit kesim {fixed_hits}/{len(shifted)} (Kayma hatası ortalama {shift_error.mean():.1f} px)")
+    print(f"Boş görüntü reddi: {rejected_blank}/{len(blanks)}")
+    print(f"Kesim süresi (görüntü başına): batch {batch_ms:.3f} ms, tek tek {single_ms:.3f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"samples": args.samples, "same_crops": same_crops, "adaptive_hits": adaptive_hits,
+                       "fixed_hits": fixed_hits, "mean_shift_error": float(shift_error.mean()),
+                       "rejected_blank": rejected_blank,
+                       "batch_ms": batch_ms, "single_ms": single_ms, "problems": problems}, f, indent=2)
+    if problems:
+        print("HATA: " + "; ".join(problems))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
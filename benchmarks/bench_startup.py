@@ -0,0 +1,174 @@
+"""
+CLI açılış süresi ölçümü ve bütçe kontrolü (Ağ yok).
+
+  1. import dökümü: python -X importtime ile 'import src.main' sırasında en pahalı modüller.
+  2. Açılış: src/main.py ayrı bir süreçte, boş bir HOME ile (Kayıtlı kullanıcı yok) çalıştırılır;
+     banner'ın basıldığı ve ilk sorunun sorulduğu an, süreç başlatıldığından itibaren ölçülür.
+     İlk soruda süreç kapatılır (Kullanıcı girişi/ağ yok). O anda yüklü olmaması gereken ağır
+     modüller (requests, bs4, numpy, cv2, keyring, tensorflow) de kontrol edilir.
+
+Medyan süre bütçeyi aşarsa veya yasak bir modül erken yüklenmişse çıkış kodu 1 olur.
+
+  python benchmarks/bench_startup.py --runs 7 --budget-prompt-ms 400 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+MAIN_PATH = os.path.join(project_root, "src", "main.py")
+
+# İlk soruya kadar yüklenmemesi gerekenler (Ağ, captcha modeli ve keyring sonradan lazım olur)
+FORBIDDEN_AT_PROMPT = ("requests", "bs4", "numpy", "cv2", "keyring", "tensorflow")
+
+# Çocuk süreçte çalışır: DisplayManager'ın banner/soru metotlarına zaman damgası ekler
+_HARNESS = r"""
+import json, os, runpy, sys, time
+project_root, main_path, marks_path, forbidden = sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4].split(",")
+sys.path.insert(0, project_root)
+marks = {}
+
+def finish():
+    marks["loaded"] = sorted(m for m in forbidden if m in sys.modules)
+    marks["modules"] = len(sys.modules)
+    with open(marks_path, "w") as f:
+        json.dump(marks, f)
+
+import src.ui.display as display
+original_banner = display.DisplayManager.print_banner
+
+def print_banner(self, *args, **kwargs):
+    original_banner(self, *args, **kwargs)
+    marks["banner"] = time.time()
+
+def first_prompt(self, *args, **kwargs):
+    marks["prompt"] = time.time()
+    finish()
+    raise SystemExit(0)
+
+display.DisplayManager.print_banner = print_banner
+display.DisplayManager.ask_choice = first_prompt
+display.DisplayManager.ask_input = first_prompt
+sys.argv = [main_path]
+runpy.run_path(main_path, run_name="__main__")
+finish() # Soru sorulmadan biterse (Beklenmeyen akış) en azından modüller yazılsın
+"""
+
+
+def import_breakdown(top: int) -> List[Tuple[str, float]]:
+    """'import src.main' sırasında kümülatif süresi en yüksek modüller (ms)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                          cwd=project_root, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # 'import time:  self [us] | cumulative | imported package'
+        _, cumulative, name = line.split("|")
+        rows.append((name.strip(), int(cumulative) / 1000))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def _isolated_env(home: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["LOCALAPPDATA"] = home # Windows
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_startup(home: str) -> Dict:
+    """Tek açılış: Süreç başlatmadan banner'a ve ilk soruya kadar geçen süre (ms)."""
+    fd, marks_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        started = time.time()
+        subprocess.run([sys.executable, "-c", _HARNESS, project_root, MAIN_PATH, marks_path,
+                        ",".join(FORBIDDEN_AT_PROMPT)],
+                       cwd=project_root, env=_isolated_env(home),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        with open(marks_path) as f:
+            marks = json.load(f)
+    finally:
+        os.remove(marks_path)
+    return {
+        "banner_ms": (marks["banner"] - started) * 1000 if "banner" in marks else None,
+        "prompt_ms": (marks["prompt"] - started) * 1000 if "prompt" in marks else None,
+        "loaded": marks["loaded"],
+        "modules": marks["modules"]
+    }
+
+
+def measure_interpreter() -> float:
+    """Sadece yorumlayıcının açılıp kapanması (ms): Bu kısım projenin elinde değil."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI açılış süresi ölçümü ve bütçe kontrolü")
+    parser.add_argument("--runs", type=int, default=5, help="Açılış tekrarı (Medyan alınır)")
+    parser.add_argument("--top", type=int, default=12, help="import dökümünde gösterilecek modül sayısı")
+    parser.add_argument("--budget-banner-ms", type=float, default=250,
+                        help="Banner'a kadar izin verilen medyan süre (ms)")
+    parser.add_argument("--budget-prompt-ms", type=float, default=300,
+                        help="İlk soruya kadar izin verilen medyan süre (ms)")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    print("import src.main (kümülatif, ms):")
+    breakdown = import_breakdown(args.top)
+    for name, ms in breakdown:
+        print(f"  {ms:8.1f}  {name}")
+
+    interpreter = statistics.median(measure_interpreter() for _ in range(args.runs))
+    with tempfile.TemporaryDirectory() as home:
+        runs = [measure_startup(home) for _ in range(args.runs)]
+
+    banner = statistics.median(r["banner_ms"] for r in runs if r["banner_ms"] is not None)
+    prompt = statistics.median(r["prompt_ms"] for r in runs if r["prompt_ms"] is not None)
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    print(f"\nYorumlayıcı (python -c pass): {interpreter:.0f} ms")
+    print(f"Banner:     {banner:6.0f} ms  (Bütçe {args.budget_banner_ms:.0f})")
+    print(f"İlk soru:   {prompt:6.0f} ms  (Bütçe {args.budget_prompt_ms:.0f})")
+    print(f"İlk soruda yüklü modül sayısı: {runs[-1]['modules']}")
+
+    problems = []
+    if banner > args.budget_banner_ms:
+        problems.append(f"banner {banner:.0f} ms > {args.budget_banner_ms:.0f} ms")
+    if prompt > args.budget_prompt_ms:
+        problems.append(f"ilk soru {prompt:.0f} ms > {args.budget_prompt_ms:.0f} ms")
+    if loaded:
+        problems.append(f"ilk sorudan önce yüklenenler: {', '.join(loaded)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "interpreter_ms": interpreter,
+                "banner_ms": banner,
+                "prompt_ms": prompt,
+                "budget_banner_ms": args.budget_banner_ms,
+                "budget_prompt_ms": args.budget_prompt_ms,
+                "loaded_at_prompt": loaded,
+                "import_breakdown": [{"module": n, "cumulative_ms": ms} for n, ms in breakdown],
+                "runs": runs,
+                "problems": problems
+            }, f, indent=2, ensure_ascii=False)
+
+    if problems:
+        print("\nBÜTÇE AŞILDI: " + "; ".join(problems))
+        sys.exit(1)
+    print("\nBütçe içinde.")
+
+
+if __name__ == "__main__":
+    main()
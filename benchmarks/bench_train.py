@@ -0,0 +1,94 @@
+"""
+Rakam modeli eğitim hattı ölçümü (TensorFlow gerekir, ağ yok).
+
+Aynı sentetik veri iki yoldan eğitilir:
+  eski: dataset_digits/<rakam>/*.png + image_dataset_from_directory (batch 16, her epoch PNG decode)
+  yeni: DatasetStore (.npy) + train_digit_model.train (Bellekte, batch 128, paralel artırma + prefetch)
+Epoch başına saniyede işlenen örnek sayısı ve toplam süre raporlanır. Veri rastgele gürültü
+olduğundan doğruluk anlamsızdır; sadece hız ölçülür.
+
+  python benchmarks/bench_train.py --samples 2000 --epochs 3
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, current_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+import numpy as np
+import tensorflow as tf
+
+from bench_dataset import write_png_tree, write_store
+from src.services.captcha_solver import train_digit_model as trainer
+from src.services.captcha_solver.dataset_store import DatasetStore
+
+
+def train_legacy(digits_dir: str, epochs: int):
+    """train_digit_model.py'nin önceki veri yolu."""
+    options = dict(validation_split=0.2, seed=123, image_size=(32, 32), batch_size=16, color_mode="grayscale")
+    train_ds = tf.keras.preprocessing.image_dataset_from_directory(digits_dir, subset="training", **options)
+    val_ds = tf.keras.preprocessing.image_dataset_from_directory(digits_dir, subset="validation", **options)
+    rescale = tf.keras.layers.Rescaling(1. / 255)
+    train_ds = train_ds.map(lambda x, y: (rescale(x), y))
+    val_ds = val_ds.map(lambda x, y: (rescale(x), y))
+    samples = sum(int(x.shape[0]) for x, _ in train_ds)
+
+    model = trainer.build_model()
+    model.compile(optimizer="adam", loss=tf.keras.losses.SparseCategoricalCrossentropy(), metrics=["accuracy"])
+    throughput = trainer.ThroughputCallback(samples, verbose=False)
+    model.fit(train_ds, validation_data=val_ds, epochs=epochs, callbacks=[throughput], verbose=0)
+    return throughput
+
+
+def report(name: str, load_s: float, throughput) -> dict:
+    rates = [rate for _, rate in throughput.epochs]
+    total = load_s + sum(t for t, _ in throughput.epochs)
+    print(f"  {name:5} yükleme {load_s:6.2f} sn | epoch örnek/sn: "
+          + ", ".join(f"{r:,.0f}" for r in rates) + f" | toplam {total:.1f} sn")
+    return {"load_s": load_s, "epochs": [{"seconds": t, "samples_per_s": r} for t, r in throughput.epochs],
+            "total_s": total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rakam modeli eğitim hattı ölçümü")
+    parser.add_argument("--samples", type=int, default=1000, help="Sentetik captcha sayısı (x3 rakam)")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_train_")
+    try:
+        write_png_tree(os.path.join(tmp, "png"), args.samples)
+        write_store(os.path.join(tmp, "store"), args.samples, shard_size=512)
+        print(f"{args.samples * 3} rakam, {args.epochs} epoch:")
+
+        legacy = train_legacy(os.path.join(tmp, "png", "dataset_digits"), args.epochs)
+        results = {"legacy": report("eski", 0.0, legacy)}
+
+        started = time.perf_counter()
+        x, y = DatasetStore(os.path.join(tmp, "store")).digit_arrays()
+        load_s = time.perf_counter() - started
+        _, _, throughput = trainer.train(x, y, args.epochs, verbose=False)
+        results["store"] = report("yeni", load_s, throughput)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    speedup = np.mean([e["samples_per_s"] for e in results["store"]["epochs"][1:] or results["store"]["epochs"]]) / \
+        np.mean([e["samples_per_s"] for e in results["legacy"]["epochs"][1:] or results["legacy"]["epochs"]])
+    print(f"Sabit durum hızlanma (İlk epoch hariç): {speedup:.1f}x")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
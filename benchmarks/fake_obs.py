@@ -0,0 +1,327 @@
+"""
+Yerel sahte OBS sunucusu (Ölçüm ve regresyon testi için).
+
+Gerçek sunucudaki akışı taklit eder:
+  login.aspx (captcha resmi + __VIEWSTATE) -> POST ile giriş
+  not_listesi_op.aspx (grd_not_listesi + cmbDonemler, dönem değiştirme postback'i)
+  UpdatePanel AJAX delta cevabı (Ders_Istatistik.aspx linki ile)
+  Ders_Istatistik.aspx (grdIstSnv)
+
+Gecikme, ders ve dönem sayısı ayarlanabilir. chrome_kb ile sayfalara gerçek portaldaki gibi
+menü/script/yerleşim tablosu markup'ı eklenir (Parser ölçümleri için). İstemci isterse cevaplar gzip'lenir; error_rate ile
+Ders_Istatistik.aspx isteklerinin bir kısmı 503 döner (Tekrar deneme davranışını ölçmek için). Tek başına çalıştırmak için:
+  python benchmarks/fake_obs.py --port 8080 --courses 9 --latency 0.05
+"""
+import argparse
+import gzip
+import random
+import secrets
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class FakeCourse:
+    code: str
+    name: str
+    scores: Dict[str, str]    # {"Vize": "80", ...} (Girilmemişse anahtar yok)
+    averages: Dict[str, str]  # {"Vize": "44,90", ...}
+    letter: str
+
+
+def _png_gray(width: int, height: int, seed: int) -> bytes:
+    """Bağımlılıksız gri tonlamalı PNG (Captcha yerine gürültü görüntüsü)."""
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + bytes(rng.randrange(256) for _ in range(width)) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}".replace(".", ",")
+
+
+class FakeOBS:
+    """Sahte OBS verisi + HTTP sunucusu. start() taban URL'yi döner (OBSClient(host=...))."""
+
+    EXAMS = ("Vize", "Final", "Büt")
+    EXAM_LABELS = {"Vize": "Vize", "Final": "Final", "Büt": "Bütünleme"}
+    STATS_HEADERS = {"Vize": "Ara Sınav", "Final": "Yarıyıl Sonu Sınavı", "Büt": "Bütünleme Sınavı"}
+
+    def __init__(self, courses: int = 9, terms: int = 4, latency: float = 0.05, jitter: float = 0.0,
+                 viewstate_kb: int = 40, captcha_answer: Optional[str] = None, seed: int = 42,
+                 error_rate: float = 0.0, compress: bool = True, chrome_kb: int = 0):
+        self.latency = latency
+        self.chrome = self._make_chrome(chrome_kb)
+        self.error_rate = error_rate
+        self.compress = compress
+        self.jitter = jitter
+        self.captcha_answer = captcha_answer # None: Boş olmayan her kod kabul edilir
+        self.viewstate = "x" * (viewstate_kb * 1024)
+        # En yeni dönem başta: 20251, 20242, 20241, 20232...
+        self.terms = [f"{2025 - (i + 1) // 2}{1 if i % 2 == 0 else 2}" for i in range(terms)]
+        self.current_term = self.terms[0]
+        rng = random.Random(seed)
+        self.data: Dict[str, List[FakeCourse]] = {
+            term: [self._make_course(rng, i, finalized=(term != self.current_term)) for i in range(courses)]
+            for term in self.terms
+        }
+        self.sessions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.reset_stats()
+
+    # --- VERİ ---
+    def _make_course(self, rng: random.Random, i: int, finalized: bool) -> FakeCourse:
+        scores = {"Vize": str(rng.randint(20, 100))}
+        averages = {"Vize": _fmt(rng.uniform(30, 70))}
+        if finalized or rng.random() < 0.3:
+            scores["Final"] = str(rng.randint(20, 100))
+            averages["Final"] = _fmt(rng.uniform(30, 70))
+        letter = rng.choice(["AA", "BA", "BB", "CB", "CC", "FF"]) if finalized else "--"
+        return FakeCourse(f"BİLM{101 + i}", f"Ders {i + 1}", scores, averages, letter)
+
+    def expected_averages(self, term: str) -> List[Dict[str, str]]:
+        """İstemcinin bu dönem için bulması gereken ortalamalar (Doğrulama için)."""
+        return [{exam: c.averages.get(exam, "?") for exam in self.EXAMS} for c in self.data[term]]
+
+    # --- SAYAÇLAR ---
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0, "by_page": {}}
+
+    def _count(self, page: str, bytes_in: int, bytes_out: int):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+            self.stats["by_page"][page] = self.stats["by_page"].get(page, 0) + 1
+
+    # --- SAYFALAR ---
+    @staticmethod
+    def _make_chrome(kb: int) -> Tuple[str, str]:
+        """Portal iskeleti: (<head> + menü başlangıcı, kapanış). Script ve yorum içinde sahte
+        <input type="hidden"> var; parser'lar bunları gizli alan saymamalı."""
+        if kb <= 0:
+            return "<html><body>", "</body></html>"
+        head = ('<html><head><title>OBS</title>'
+                '<script type="text/javascript">var tpl = \'<input type="hidden" name="scriptField" value="x" />\';'
+                'function prolizPopup(u, n) { window.open(u, n, "width=600,height=400"); }</script>'
+                '<style>.menu li { display: inline; } table.layout td { padding: 2px; }</style></head><body>'
+                '<!-- <input type="hidden" name="commentField" value="y" /> -->'
+                '<table class="layout"><tr><td><ul class="menu">')
+        items = []
+        size = len(head)
+        i = 0
+        while size < kb * 1024:
+            item = (f'<li><a href="../std/sayfa_{i}.aspx" id="menu_{i}" class="menu-item">'
+                    f'<span><img src="../img/ikon_{i % 12}.png" alt="" /> Menü Öğesi {i}</span></a></li>')
+            items.append(item)
+            size += len(item)
+            i += 1
+        return head + "".join(items) + '</ul></td><td>', '</td></tr></table></body></html>'
+
+    def _hidden(self, extra: str = "") -> str:
+        return (f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{self.viewstate}{extra}" />'
+                f'<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="ABCD1234" />'
+                f'<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="ev{extra}" />')
+
+    def login_page(self) -> str:
+        return (self.chrome[0] + '<form method="post" action="login.aspx" id="form1">'
+                + self._hidden() +
+                '<input name="txtParamT01" type="text" /><input name="txtParamT02" type="password" />'
+                '<img id="imgCaptchaImg" src="captcha.aspx?rnd=1" />'
+                '<input name="txtSecCode" type="text" /><input type="submit" name="btnLogin" value="Giriş" />'
+                '</form>' + self.chrome[1])
+
+    def grades_page(self, term: str) -> str:
+        options = []
+        for t in self.terms:
+            selected = ' selected="selected"' if t == term else ""
+            season = "Güz" if t.endswith("1") else "Bahar"
+            options.append(f'<option{selected} value="{t}">{t[:4]}-{int(t[:4]) + 1} {season}</option>')
+        options = "".join(options)
+        rows = ['<tr><th>#</th><th>Kod</th><th>Ders</th><th>Tür</th><th>Notlar</th><th>Ort</th><th>Harf</th><th></th></tr>']
+        for i, c in enumerate(self.data[term]):
+            exams = " ".join(f"{self.EXAM_LABELS[e]} : {c.scores[e]}" for e in self.EXAMS if e in c.scores)
+            rows.append(
+                f'<tr><td>{i + 1}</td><td>{c.code}</td><td>{c.name}</td><td>Zorunlu</td>'
+                f'<td><span>{exams}</span></td><td>-</td><td>{c.letter}</td>'
+                f'<td><a id="grd_not_listesi_btnIstatistik_{i}" '
+                f'href="javascript:__doPostBack(\'grd_not_listesi$ctl{i + 2:02d}$btnIstatistik\',\'\')">İstatistik</a></td></tr>'
+            )
+        return (self.chrome[0] + '<form method="post" action="not_listesi_op.aspx" id="form1">'
+                + self._hidden(term) +
+                f'<select name="cmbDonemler" id="cmbDonemler" onchange="__doPostBack(\'cmbDonemler\',\'\')">{options}</select>'
+                '<div id="UpdatePanel1"><table id="grd_not_listesi">' + "".join(rows) + '</table></div>'
+                '</form>' + self.chrome[1])
+
+    def stats_delta(self, term: str, index: int) -> str:
+        """ASP.NET UpdatePanel delta formatı: uzunluk|tür|id|içerik|"""
+        parts = [
+            ("updatePanel", "UpdatePanel1", '<div>İstatistik hazırlanıyor</div>'),
+            ("hiddenField", "__VIEWSTATE", self.viewstate + f"{term}{index}"),
+            ("hiddenField", "__EVENTVALIDATION", f"ev{term}{index}"),
+            ("scriptBlock", "ScriptContentNoTags",
+             f"prolizPopup('../acd/Ders_Istatistik.aspx?donem={term}&ders={index}','Istatistik');"),
+        ]
+        return "".join(f"{len(content)}|{kind}|{ident}|{content}|" for kind, ident, content in parts)
+
+    def stats_page(self, term: str, index: int) -> str:
+        course = self.data[term][index]
+        rows = []
+        for exam in self.EXAMS:
+            if exam not in course.averages:
+                continue
+            rows.append(f'<tr><td colspan="2">{self.STATS_HEADERS[exam]}</td></tr>')
+            rows.append(f'<tr><td>Sınava giren öğrenci sayısı</td><td>{40 + index}</td></tr>')
+            rows.append(f'<tr><td>Sınıf not ortalaması</td><td>{course.averages[exam]}</td></tr>')
+        return (self.chrome[0] + self._hidden("stats") +
+                '<table id="grdIstSnv">' + "".join(rows) + '</table>' + self.chrome[1])
+
+    # --- SUNUCU ---
+    def start(self, port: int = 0) -> str:
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _session(self) -> Dict:
+                cookie = self.headers.get("Cookie", "")
+                for part in cookie.split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "ASP.NET_SessionId" and value in owner.sessions:
+                        return owner.sessions[value]
+                return {}
+
+            def _reply(self, page: str, status: int = 200, body: bytes = b"", content_type: str = "text/html; charset=utf-8",
+                       headers: Optional[Dict[str, str]] = None, bytes_in: int = 0):
+                delay = owner.latency + (random.uniform(0, owner.jitter) if owner.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                if body and owner.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=6)
+                    headers = {**(headers or {}), "Content-Encoding": "gzip"}
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+                owner._count(page, bytes_in, len(body))
+
+            def _redirect(self, page: str, location: str, headers: Optional[Dict[str, str]] = None, bytes_in: int = 0):
+                self._reply(page, 302, headers={"Location": location, **(headers or {})}, bytes_in=bytes_in)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                name = url.path.rsplit("/", 1)[-1]
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                session = self._session()
+
+                if name == "login.aspx":
+                    headers = {}
+                    if not session:
+                        sid = secrets.token_hex(12)
+                        with owner._lock:
+                            owner.sessions[sid] = {"logged_in": False}
+                        headers["Set-Cookie"] = f"ASP.NET_SessionId={sid}; path=/; HttpOnly"
+                    self._reply(name, body=owner.login_page().encode("utf-8"), headers=headers)
+                elif name == "captcha.aspx":
+                    self._reply(name, body=_png_gray(177, 40, random.randrange(1 << 30)), content_type="image/png")
+                elif not session.get("logged_in"):
+                    self._redirect(name, "/oibs/std/login.aspx")
+                elif name == "not_listesi_op.aspx":
+                    self._reply(name, body=owner.grades_page(owner.current_term).encode("utf-8"))
+                elif name == "Ders_Istatistik.aspx":
+                    if owner.error_rate and random.random() < owner.error_rate:
+                        self._reply(name, status=503, body=b"Service Unavailable")
+                        return
+                    page = owner.stats_page(query.get("donem", owner.current_term), int(query.get("ders", 0)))
+                    self._reply(name, body=page.encode("utf-8"))
+                else:
+                    self._reply(name, body=b"<html><body>Ana Sayfa</body></html>")
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                name = url.path.rsplit("/", 1)[-1]
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                form = {k: v[0] for k, v in parse_qs(raw.decode("utf-8"), keep_blank_values=True).items()}
+                session = self._session()
+
+                if name == "login.aspx":
+                    code = form.get("txtSecCode", "")
+                    ok = bool(session) and bool(form.get("txtParamT01")) and bool(code)
+                    if owner.captcha_answer is not None:
+                        ok = ok and code == owner.captcha_answer
+                    if ok:
+                        session["logged_in"] = True
+                        self._redirect(name, "/oibs/std/index.aspx", bytes_in=length)
+                    else:
+                        self._reply(name, body=owner.login_page().encode("utf-8"), bytes_in=length)
+                elif not session.get("logged_in"):
+                    self._redirect(name, "/oibs/std/login.aspx", bytes_in=length)
+                elif name == "not_listesi_op.aspx":
+                    term = form.get("cmbDonemler") or owner.current_term
+                    target = form.get("__EVENTTARGET", "")
+                    if form.get("__ASYNCPOST") == "true" and "btnIstatistik" in target:
+                        index = int(target.split("$ctl")[1].split("$")[0]) - 2
+                        self._reply("delta", body=owner.stats_delta(term, index).encode("utf-8"),
+                                    content_type="text/plain; charset=utf-8", bytes_in=length)
+                    else:
+                        self._reply(name, body=owner.grades_page(term).encode("utf-8"), bytes_in=length)
+                else:
+                    self._reply(name, status=404, bytes_in=length)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-obs", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel sahte OBS sunucusu")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--courses", type=int, default=9)
+    parser.add_argument("--terms", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="İstek başı gecikme (sn)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Gecikmeye eklenecek rastgele üst sınır (sn)")
+    parser.add_argument("--viewstate-kb", type=int, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="İstatistik sayfası 503 oranı (0-1)")
+    parser.add_argument("--no-gzip", action="store_true", help="Cevapları sıkıştırma")
+    parser.add_argument("--chrome-kb", type=int, default=0, help="Sayfalara eklenecek menü/yerleşim markup'ı (KB)")
+    args = parser.parse_args()
+
+    fake = FakeOBS(args.courses, args.terms, args.latency, args.jitter, args.viewstate_kb,
+                   error_rate=args.error_rate, compress=not args.no_gzip, chrome_kb=args.chrome_kb)
+    url = fake.start(args.port)
+    print(f"Sahte OBS çalışıyor: {url} (Dönemler: {', '.join(fake.terms)}) - Ctrl+C ile durdur")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Callable, Optional
+
+from src.models import CourseGrade
+from src.services.auth_manager import AuthManager
+from src.services.obs_client import OBSClient
+from src.services.session_vault import SessionVault
+from src.services.grade_cache import GradeCache
+from src.handlers import create_auto_captcha_handler, prewarm_captcha_solver
+
+# Aynı anda en fazla kaç hesap işlenir (Toplam eşzamanlı istek sayısı da bununla sınırlı)
+DEFAULT_CONCURRENCY = 4
+
+@dataclass
+class AccountResult:
+    """Tek hesabın toplu çekim sonucu."""
+    username: str
+    success: bool = False
+    grades: List[CourseGrade] = field(default_factory=list)
+    error: str = ""
+    seconds: float = 0.0
+    reused_session: bool = False
+    cache_hits: int = 0
+    cache_misses: int = 0
+    failures: Dict[str, int] = field(default_factory=dict) # Başarısız istatistik istekleri (Tür -> adet)
+
+def pull_account(username: str, password: Optional[str], vault: SessionVault,
+                 grade_cache: Optional[GradeCache] = None) -> AccountResult:
+    """Bir hesap için (kayıtlı oturum veya AI captcha ile) giriş yapıp notları çeker. Prompt yok."""
+    result = AccountResult(username=username)
+    started = time.perf_counter()
+    # Her hesabın kendi OBSClient/Session'ı var. Ders istatistikleri seri çekilir ki
+    # hesap havuzunun boyutu aynı zamanda global istek sınırı olsun.
+    client = OBSClient(stats_workers=1, grade_cache=grade_cache)
+    try:
+        cookies = vault.load(username)
+        if cookies:
+            client.load_cookies(cookies)
+            result.reused_session = client.is_session_alive()
+            if not result.reused_session:
+                client.session.cookies.clear()
+
+        if not result.reused_session:
+            if not password:
+                raise Exception("Kayıtlı şifre okunamadı!")
+            if not client.login(username, password, create_auto_captcha_handler()):
+                raise Exception("Giriş başarısız (şifre veya captcha hatalı).")
+
+        result.grades = client.fetch_grades()
+        vault.save(username, client.export_cookies())
+        result.success = True
+    except Exception as e:
+        result.error = str(e)
+    finally:
+        client.session.close()
+        if grade_cache is not None:
+            result.cache_hits, result.cache_misses = grade_cache.hits, grade_cache.misses
+        result.failures = dict(client.failures)
+        result.seconds = time.perf_counter() - started
+    return result
+
+def _write_json(path: str, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def run_batch(out_dir: str, concurrency: int = DEFAULT_CONCURRENCY,
+              usernames: Optional[List[str]] = None,
+              log: Callable[[str], None] = print) -> List[AccountResult]:
+    """
+    Kayıtlı tüm hesapları (veya verilenleri) paralel çeker ve out_dir'e yazar:
+      <kullanıcı>.json -> Notlar, summary.json -> Hesap bazında durum/hata.
+    """
+    auth = AuthManager()
+    vault = SessionVault(auth.app_dir)
+    users = usernames if usernames is not None else list(auth.get_registered_users())
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    # Keyring backend'leri thread-safe olmayabilir: şifreler önceden, ana thread'de okunur
+    passwords = {}
+    for username in users:
+        try:
+            passwords[username] = auth.get_password(username)
+        except Exception as e:
+            # Tek hesabın keyring hatası tüm toplu işi durdurmasın: Kayıtlı oturumu denenir,
+            # o da yoksa hesap summary.json'da hatalı olarak raporlanır
+            log(f"[UYARI] {username}: Şifre okunamadı ({e})")
+            passwords[username] = None
+    log_lock = threading.Lock()
+
+    def work(username: str) -> AccountResult:
+        cache = GradeCache.for_user(auth.app_dir, username)
+        result = pull_account(username, passwords[username], vault, cache)
+        with log_lock:
+            if result.success:
+                source = "kayıtlı oturum" if result.reused_session else "yeni giriş"
+                failed = sum(result.failures.values())
+                warning = f", {failed} istatistik isteği başarısız" if failed else ""
+                log(f"[OK] {username}: {len(result.grades)} ders ({source}, {result.seconds:.1f} sn{warning})")
+            else:
+                log(f"[HATA] {username}: {result.error}")
+        return result
+
+    started = time.perf_counter()
+    # İlk login sayfaları inerken model arka planda yüklensin
+    prewarm_captcha_solver()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(work, users))
+
+    fetched_at = datetime.now().isoformat(timespec="seconds")
+    for result in results:
+        if result.success:
+            _write_json(os.path.join(out_dir, f"{result.username}.json"), {
+                "username": result.username,
+                "fetched_at": fetched_at,
+                "grades": [g.to_dict() for g in result.grades]
+            })
+
+    _write_json(os.path.join(out_dir, "summary.json"), {
+        "fetched_at": fetched_at,
+        "total_seconds": round(time.perf_counter() - started, 2),
+        "accounts": [
+            {
+                "username": r.username,
+                "success": r.success,
+                "error": r.error,
+                "courses": len(r.grades),
+                "seconds": round(r.seconds, 2),
+                "reused_session": r.reused_session,
+                "cache_hits": r.cache_hits,
+                "cache_misses": r.cache_misses,
+                "failures": r.failures
+            }
+            for r in results
+        ]
+    })
+
+    ok = sum(1 for r in results if r.success)
+    saved = sum(r.cache_hits for r in results) * GradeCache.REQUESTS_PER_LOOKUP
+    log(f"Toplam: {ok}/{len(results)} hesap başarılı, {time.perf_counter() - started:.1f} sn, "
+        f"önbellekle {saved} istek atlandı -> {out_dir}")
+    return results
@@ -0,0 +1,120 @@
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, TextIO
+
+from src.models import CourseGrade
+from src.services.auth_manager import AuthManager
+from src.services.session_vault import SessionVault
+from src.services.grade_cache import GradeCache
+from src.batch import AccountResult, DEFAULT_CONCURRENCY, pull_account
+
+# Dışa aktarma şeması: Alan eklenirse sona eklenir, anlamı değişirse sürüm artar
+SCHEMA_VERSION = 1
+EXPORT_FORMATS = ("jsonl", "csv")
+FIELDS = [
+    "schema", "account", "term_id", "course_code", "course_name",
+    "midterm_score", "midterm_score_value", "midterm_avg", "midterm_avg_value",
+    "final_score", "final_score_value", "final_avg", "final_avg_value",
+    "makeup_score", "makeup_score_value", "makeup_avg", "makeup_avg_value",
+    "letter_grade", "fetched_at"
+]
+
+def grade_record(account: str, grade: CourseGrade, fetched_at: str) -> Dict:
+    """Bir dersin düz (tek seviyeli) kaydı. Ham metinler + sayısal karşılıkları (Sayı değilse None)."""
+    record = {
+        "schema": SCHEMA_VERSION,
+        "account": account,
+        "term_id": grade.term_id,
+        "course_code": grade.code,
+        "course_name": grade.name
+    }
+    for key, exam in zip(CourseGrade.EXAMS, grade.exams):
+        record[f"{key}_score"] = exam.score
+        record[f"{key}_score_value"] = exam.score_value
+        record[f"{key}_avg"] = exam.class_avg
+        record[f"{key}_avg_value"] = exam.avg_value
+    record["letter_grade"] = grade.letter_grade
+    record["fetched_at"] = fetched_at
+    return record
+
+class RecordWriter:
+    """Kayıtları JSON Lines veya CSV olarak akıtır (CSV başlığı ilk kayıtta bir kez yazılır)."""
+
+    def __init__(self, stream: TextIO, fmt: str):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Bilinmeyen format: {fmt} (Seçenekler: {', '.join(EXPORT_FORMATS)})")
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=FIELDS, lineterminator="\n")
+            self._csv.writeheader()
+
+    def write(self, record: Dict):
+        if self._csv is not None:
+            self._csv.writerow({k: "" if v is None else v for k, v in record.items()})
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def flush(self):
+        self.stream.flush()
+
+def _stderr_log(message: str):
+    print(message, file=sys.stderr)
+
+def run_export(fmt: str, output: str = "-", usernames: Optional[List[str]] = None,
+               concurrency: int = DEFAULT_CONCURRENCY,
+               log: Callable[[str], None] = _stderr_log) -> List[AccountResult]:
+    """
+    Kayıtlı hesapları (veya verilenleri) menüsüz çeker ve her dersi bir kayıt olarak output'a akıtır
+    (output '-' ise stdout). Kayıtlar hesap tamamlandıkça yazılır. stdout sadece veriye ayrılır:
+    Durum mesajları ve model/captcha çıktıları stderr'e gider, böylece çıktı doğrudan pipe'lanabilir.
+    """
+    auth = AuthManager()
+    vault = SessionVault(auth.app_dir)
+    users = usernames if usernames is not None else list(auth.get_registered_users())
+    # Keyring backend'leri thread-safe olmayabilir: şifreler önceden, ana thread'de okunur
+    passwords = {}
+    for username in users:
+        try:
+            passwords[username] = auth.get_password(username)
+        except Exception as e:
+            # Keyring yoksa (Örn: cron/sunucu) kayıtlı oturumu olan hesaplar yine çekilebilir
+            log(f"[UYARI] {username}: Şifre okunamadı ({e})")
+            passwords[username] = None
+
+    out_stream = sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+    writer = RecordWriter(out_stream, fmt)
+    results = []
+    try:
+        with redirect_stdout(sys.stderr):
+            def work(username: str) -> AccountResult:
+                return pull_account(username, passwords[username], vault,
+                                    GradeCache.for_user(auth.app_dir, username))
+
+            # Captcha modeli sadece gerçekten login gerekirse yüklenir (Kayıtlı oturumlarla hiç gerekmez)
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                futures = [pool.submit(work, u) for u in users]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if not result.success:
+                        log(f"[HATA] {result.username}: {result.error}")
+                        continue
+                    fetched_at = datetime.now().isoformat(timespec="seconds")
+                    for grade in result.grades:
+                        writer.write(grade_record(result.username, grade, fetched_at))
+                    writer.flush()
+                    log(f"[OK] {result.username}: {len(result.grades)} ders ({result.seconds:.1f} sn)")
+    finally:
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    log(f"Toplam: {sum(1 for r in results if r.success)}/{len(results)} hesap, {writer.count} kayıt")
+    return results
@@ -2,35 +2,141 @@ import time
 import os
 import subprocess
 import platform
-from src.services.captcha_solver.captcha_solver import CaptchaSolver
+import tempfile
+import threading
+from typing import Callable, Optional
 
-def create_captcha_handler(ui_manager, status_context):
+# --- AI CAPTCHA AYARLARI ---
+AI_MIN_CONFIDENCE = 0.90 # En zayıf rakamın güveni bunun altındaysa cevap gönderilmez
+AI_AUTO_ATTEMPTS = 2     # Kaç login denemesi AI ile yapılır (Sonrası insana sorulur)
+AI_MAX_SKIPS = 3         # Bir denemede düşük güven yüzünden en fazla kaç captcha pas geçilir
+
+# Model hatası süreç başına bir kez raporlanır (Toplu modda her hesap için tekrar basılmasın)
+_model_error_reported = threading.Event()
+
+def prewarm_captcha_solver() -> threading.Thread:
+    """
+    Starts loading the captcha model in a background thread, including the numpy/cv2
+    imports, so the main thread can start downloading the login page right away.
+    """
+    def _warm():
+        try:
+            from src.services.captcha_solver.captcha_solver import get_solver
+            get_solver().warmup()
+        except Exception as e:
+            print(f"[UYARI] Model ısıtılamadı: {e}")
+
+    thread = threading.Thread(target=_warm, name="captcha-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+def create_auto_captcha_handler(min_confidence: float = AI_MIN_CONFIDENCE,
+                                max_skips: int = AI_MAX_SKIPS,
+                                log: Optional[Callable[[str], None]] = None):
+    """
+    Creates a headless (AI-only) captcha handler for OBSClient.login.
+    Returns the answer, None to request a fresh captcha (low confidence or no reliable
+    digit boxes), or CAPTCHA_ABORT when there is no usable answer (model missing or broken,
+    or the image stayed unreadable), so that login gives up without POSTing a guess.
+    """
+    skips = {"attempt": -1, "count": 0}
+
+    def handler(image: bytes, attempt: int = 0) -> Optional[str]:
+        # Yeni login denemesinde pas sayacı sıfırlanır
+        if skips["attempt"] != attempt:
+            skips["attempt"], skips["count"] = attempt, 0
+
+        # login sırasında çağrılır: obs_client zaten yüklü
+        from src.services.obs_client import CAPTCHA_ABORT
+
+        prediction = None
+        try:
+            # numpy/cv2 ve model sadece ilk captcha'da (veya prewarm thread'inde) yüklenir
+            from src.services.captcha_solver.captcha_solver import get_solver
+            solver = get_solver() # Süreç boyunca tek model
+            if solver.model is None:
+                raise RuntimeError(f"Captcha modeli yüklenemedi ({solver.model_path})")
+            prediction = solver.solve_detailed(image)
+        except Exception as err:
+            # Model yok/bozuk: Tahmin yok, giriş POST'suz iptal edilir
+            if not _model_error_reported.is_set():
+                _model_error_reported.set()
+                message = f"[UYARI] AI captcha çözücü kullanılamıyor: {err}"
+                if log:
+                    log(f"[red]{message}[/red]")
+                else:
+                    print(message)
+            return CAPTCHA_ABORT
+
+        # RESİM OKUNAMADI: Yeni captcha iste; pas hakkı bittiyse boş kod göndermek yerine vazgeç
+        if prediction is None:
+            if skips["count"] < max_skips:
+                skips["count"] += 1
+                return None
+            return CAPTCHA_ABORT
+
+        # KESİM GÜVENİLMEZ: Model hiç çalışmadı, cevap yok. Yeni captcha iste; pas hakkı bittiyse
+        # tahmin göndermek yerine vazgeç (Login POST'u harcanmaz)
+        if prediction.rejected:
+            if skips["count"] < max_skips:
+                skips["count"] += 1
+                if log:
+                    log(f"[dim]🤖 Rakamlar bulunamadı (kesim güveni {prediction.segmentation_confidence:.2f}), yeni captcha isteniyor...[/dim]")
+                return None
+            return CAPTCHA_ABORT
+
+        # DÜŞÜK GÜVEN: Login POST'u harcamak yerine yeni captcha iste (ucuz)
+        if prediction.confidence < min_confidence and skips["count"] < max_skips:
+            skips["count"] += 1
+            if log:
+                log(f"[dim]🤖 AI emin değil (güven {prediction.confidence:.2f}), yeni captcha isteniyor...[/dim]")
+            return None
+
+        return prediction.answer
+
+    return handler
+
+def create_captcha_handler(ui_manager, status_context,
+                           min_confidence: float = AI_MIN_CONFIDENCE,
+                           auto_attempts: int = AI_AUTO_ATTEMPTS,
+                           max_skips: int = AI_MAX_SKIPS):
     """
     Creates a captcha handler function that fits the signature expected by OBSClient.
     Args:
         ui_manager: DisplayManager instance for user interaction.
         status_context: The active rich status context (spinner) to pause/resume.
+        min_confidence: Below this per-digit confidence a fresh captcha is requested instead.
+        auto_attempts: Number of login attempts answered by the AI before asking a human.
+        max_skips: Low-confidence captchas skipped per attempt before submitting anyway.
     """
-    def handler(path: str) -> str:
-        # 1. Önce AI ile çözmeye çalış
-        ai_result = None
-        try:
-            solver = CaptchaSolver()
-            ai_result = solver.solve(path)
-        except Exception as err:
-            # Model hatası varsa yut, manuele düş
-            pass 
-        
-        # EĞER AI ÇÖZDÜYSE DİREKT DÖNDÜR (OTOMASYON)
-        if ai_result:
-            ui_manager.console.print(f"[bold cyan]🤖 AI Otomatik Çözdü: {ai_result}[/bold cyan]")
-            # Kısa bir bekleme (kullanıcının görmesi için)
-            time.sleep(0.5)
-            return ai_result
-
-        # --- AI BAŞARISIZ İSE MANUEL GİRİŞ ---
+    ai_handler = create_auto_captcha_handler(min_confidence, max_skips, log=ui_manager.console.print)
+
+    def handler(image: bytes, attempt: int = 0) -> Optional[str]:
+        from src.services.obs_client import CAPTCHA_ABORT
+
+        # 1. Önce AI ile çözmeye çalış (Resim bellekte, diske yazılmaz)
+        if attempt < auto_attempts:
+            ai_result = ai_handler(image, attempt)
+
+            # None: Yeni captcha istendi
+            if ai_result is None:
+                return None
+
+            # EĞER AI ÇÖZDÜYSE DİREKT DÖNDÜR (OTOMASYON). CAPTCHA_ABORT: AI vazgeçti, insana sor
+            if ai_result and ai_result is not CAPTCHA_ABORT:
+                ui_manager.console.print(f"[bold cyan]🤖 AI Otomatik Çözdü: {ai_result}[/bold cyan]")
+                # Kısa bir bekleme (kullanıcının görmesi için)
+                time.sleep(0.5)
+                return ai_result
+
+        # --- AI BAŞARISIZ İSE (veya otomatik denemeler bittiyse) MANUEL GİRİŞ ---
         ui_manager.console.print("[yellow]⚠️ AI Okuyamadı, Manuel Giriş Gerekiyor![/yellow]")
         
+        # Resim görüntüleyici dosya ister: Eşzamanlı girişler çakışmasın diye benzersiz isimli geçici dosya
+        fd, path = tempfile.mkstemp(prefix="obs_captcha_", suffix=".png")
+        with os.fdopen(fd, "wb") as f:
+            f.write(image)
+
         # Resmi işletim sisteminde aç
         if platform.system() == "Windows": os.startfile(path)
         elif platform.system() == "Darwin": subprocess.call(("open", path))
@@ -50,6 +156,12 @@ def create_captcha_handler(ui_manager, status_context):
         if status_context:
             status_context.start()
         # ---------------------------------------
+
+        # Kod girildi, geçici dosyayı temizle
+        try:
+            os.remove(path)
+        except OSError:
+            pass # Windows'ta görüntüleyici dosyayı kilitlemiş olabilir
         
         return code
 
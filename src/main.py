@@ -1,6 +1,7 @@
 import sys
 import os
 import time
+import argparse
 
 # Bu kod, main.py nereden çalıştırılırsa çalıştırılsın 'src' modülünün bulunmasını sağlar.
 current_dir = os.path.dirname(os.path.abspath(__file__)) # src/
@@ -8,19 +9,22 @@ project_root = os.path.dirname(current_dir)            # OBSGradePuller/
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from rich.progress import Progress, SpinnerColumn, TextColumn
-
-# Kendi modüllerimizi import ediyoruz
+# Kendi modüllerimizi import ediyoruz.
+# Ağır bağımlılıklar (requests/bs4, numpy/cv2, keyring) burada değil, kullanıldıkları yerde
+# yüklenir: Banner ve ilk soru bunları beklemez (Bkz. benchmarks/bench_startup.py).
 from src.services.auth_manager import AuthManager
-from src.services.obs_client import OBSClient
-from src.ui.display import DisplayManager
-from src.handlers import create_captcha_handler
+from src.services.session_vault import SessionVault
+from src.services.grade_cache import GradeCache, TermArchive
+from src.handlers import create_captcha_handler, prewarm_captcha_solver
 
 def main():
+    # rich sadece etkileşimli modlarda yüklenir (--export gibi headless modlar için gerekmez)
+    from src.ui.display import DisplayManager
+
     # 1. YÖNETİCİLERİ BAŞLAT
     ui = DisplayManager()
     auth = AuthManager()
-    client = OBSClient()
+    vault = SessionVault(auth.app_dir)
     
     ui.print_banner()
 
@@ -46,6 +50,7 @@ def main():
         elif choice == "Kullanıcı Sil":
             user_to_delete = ui.ask_choice("Silinecek Kullanıcı", registered_users)
             auth.delete_user(user_to_delete)
+            vault.delete(user_to_delete)
             ui.show_message(f"{user_to_delete} silindi.", "red")
             # Silince tekrar başa dönmek en temizi (recursive main çağrısı yerine loop kullanılabilir ama basit olsun)
             return main()
@@ -67,22 +72,38 @@ def main():
         save_credentials = True # Başarılı olursa soracağız
 
     # 3. OBS LOGIN İŞLEMİ
+    from src.services.obs_client import OBSClient
+    client = OBSClient()
     login_success = False
-    
+
+    # Kayıtlı ve süresi dolmamış bir oturum varsa önce onu dene (Login + Captcha atlanır)
+    saved_cookies = None if save_credentials else vault.load(current_user)
+    if saved_cookies:
+        with ui.console.status("[bold green]Kayıtlı oturum kontrol ediliyor...", spinner="dots"):
+            client.load_cookies(saved_cookies)
+            login_success = client.is_session_alive()
+        if not login_success:
+            # Oturum düşmüş, temiz bir sayfayla tam login akışına geç
+            client.session.cookies.clear()
+            vault.delete(current_user)
+
     # Login Loading Animasyonu
-    with ui.console.status("[bold green]OBS Sistemine Bağlanılıyor...", spinner="dots") as status:
-        try:
-            # Handler fonksiyonunu oluştur
-            captcha_handler = create_captcha_handler(ui, status)
+    if not login_success:
+        # Login sayfası inerken model (ve numpy/cv2) arka planda yüklensin
+        prewarm_captcha_solver()
+        with ui.console.status("[bold green]OBS Sistemine Bağlanılıyor...", spinner="dots") as status:
+            try:
+                # Handler fonksiyonunu oluştur
+                captcha_handler = create_captcha_handler(ui, status)
 
-            login_success = client.login(current_user, current_pass, captcha_handler)
+                login_success = client.login(current_user, current_pass, captcha_handler)
             
-        except Exception as e:
-            # Hata mesajı basmadan önce status'ü durdurmak gerekebilir ama
-            # with bloğu çıkışta otomatik kapatır. Yine de garanti olsun:
-            status.stop()
-            ui.show_message(f"Bağlantı Hatası: {str(e)}", "red")
-            return
+            except Exception as e:
+                # Hata mesajı basmadan önce status'ü durdurmak gerekebilir ama
+                # with bloğu çıkışta otomatik kapatır. Yine de garanti olsun:
+                status.stop()
+                ui.show_message(f"Bağlantı Hatası: {str(e)}", "red")
+                return
 
     if not login_success:
         ui.show_message("❌ Giriş Başarısız! Kullanıcı adı, şifre veya captcha hatalı.", "red")
@@ -97,41 +118,166 @@ def main():
             auth.save_user(current_user, current_pass)
             ui.show_message("Bilgiler kaydedildi!", "green")
 
+    # Kayıtlı kullanıcının oturumunu kasaya yaz (Bir sonraki çalıştırmada login atlanabilsin)
+    remember_session = current_user in auth.get_registered_users()
+    if remember_session:
+        vault.save(current_user, client.export_cookies())
+        # Değişmeyen dersler için istatistik isteği atılmasın
+        client.grade_cache = GradeCache.for_user(auth.app_dir, current_user)
+
     # 5. VERİ ÇEKME VE GÖSTERME
     try:
-        # Rich Progress Bar ile veri çekme animasyonu
-        grades = []
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True
-        ) as progress:
-            task = progress.add_task("[green]Ders notları ve ortalamalar çekiliyor...", total=None)
-            
-            # OBSClient bizim için her şeyi (Notlar + AJAX Ortalamaları) hallediyor
-            grades = client.fetch_grades()
-            
-            progress.update(task, completed=100)
+        # Canlı tablo: Satırlar sayfa parse edilir edilmez görünür, ortalamalar geldikçe dolar
+        # OBSClient bizim için her şeyi (Notlar + AJAX Ortalamaları) akış halinde veriyor
+        grades = ui.render_grades_live(client.iter_grades())
 
-        # Tabloyu çiz
-        # Dönem bilgisini grades listesindeki ilk elemandan alabiliriz (hepsi aynı dönemdir)
-        term_id = grades[0].term_id if grades else "Bilinmiyor"
-        ui.render_grades(grades, term_id)
+        # Başarılı kullanım oturum süresini uzatır
+        if remember_session:
+            vault.save(current_user, client.export_cookies())
+
+        if client.failures:
+            details = ", ".join(f"{kind}: {count}" for kind, count in client.failures.items())
+            ui.show_message(f"⚠ {sum(client.failures.values())} istatistik isteği başarısız ({details})", "yellow")
+
+        cache = client.grade_cache
+        if cache is not None and (cache.hits or cache.misses):
+            ui.show_message(
+                f"Önbellek: {cache.hits} isabet, {cache.misses} ıska ({cache.requests_saved} istek atlandı)", "dim"
+            )
 
     except Exception as e:
         ui.show_message(f"Veri Çekme Hatası: {str(e)}", "red")
         import traceback
         traceback.print_exc() # Detaylı hata (Geliştirme aşamasında açık kalsın)
 
-    # 6. ÇIKIŞ
+    # 6. TRANSKRİPT (İsteğe bağlı) VE ÇIKIŞ
     ui.console.print("\n")
-    if ui.ask_choice("Ne yapmak istersin?", ["Kullanıcı Değiştir", "Çıkış"]) == "Kullanıcı Değiştir":
+    choice = ui.ask_choice("Ne yapmak istersin?", ["Tüm Dönemleri Göster", "Kullanıcı Değiştir", "Çıkış"])
+    if choice == "Tüm Dönemleri Göster":
+        try:
+            # Kesinleşmiş dönemler arşivden gelir, sunucuya sorulmaz
+            archive = TermArchive.for_user(auth.app_dir, current_user) if remember_session else None
+            with ui.console.status("[bold green]Tüm dönemler çekiliyor...", spinner="dots"):
+                transcript = client.fetch_transcript(archive=archive)
+            for term_id, term_grades in transcript.items():
+                ui.render_grades(term_grades, term_id)
+        except Exception as e:
+            ui.show_message(f"Veri Çekme Hatası: {str(e)}", "red")
+
+        ui.console.print("\n")
+        choice = ui.ask_choice("Ne yapmak istersin?", ["Kullanıcı Değiştir", "Çıkış"])
+
+    if choice == "Kullanıcı Değiştir":
         main() # Rekürsif çağrı ile başa dön
     else:
         ui.show_message("İyi çalışmalar!", "yellow")
 
+def watch_main(username=None, interval_min: float = 15) -> int:
+    """İzleme modu: Notları periyodik yoklar, sadece değişen dersleri basar. Prompt yok."""
+    from datetime import datetime
+    from src.handlers import create_auto_captcha_handler
+    from src.watch import GradeWatcher
+    from src.services.obs_client import OBSClient
+    from src.ui.display import DisplayManager
+
+    ui = DisplayManager()
+    auth = AuthManager()
+    vault = SessionVault(auth.app_dir)
+
+    registered_users = auth.get_registered_users()
+    if not username:
+        if len(registered_users) != 1:
+            ui.show_message("İzleme için --user ile kayıtlı bir kullanıcı seçin.", "red")
+            return 1
+        username = registered_users[0]
+
+    password = auth.get_password(username)
+    if not password:
+        ui.show_message(f"Hata: {username} için kayıtlı şifre okunamadı!", "red")
+        return 1
+
+    client = OBSClient(grade_cache=GradeCache.for_user(auth.app_dir, username))
+    saved_cookies = vault.load(username)
+    if saved_cookies:
+        client.load_cookies(saved_cookies)
+
+    watcher = GradeWatcher(
+        client, username, password, create_auto_captcha_handler,
+        interval=interval_min * 60,
+        on_poll=lambda: vault.save(username, client.export_cookies())
+    )
+
+    def on_change(changed, initial):
+        stamp = datetime.now().strftime("%d.%m %H:%M")
+        label = "Başlangıç" if initial else "Değişiklik"
+        ui.render_grades(changed, f"{changed[0].term_id} - {label} {stamp}")
+
+    def on_error(err, delay):
+        stamp = datetime.now().strftime("%d.%m %H:%M")
+        ui.show_message(f"[{stamp}] Hata: {err} ({delay / 60:.1f} dk sonra tekrar denenecek)", "red")
+
+    ui.show_message(f"👀 {username} izleniyor ({interval_min:g} dk aralıkla). Çıkmak için Ctrl+C.", "cyan")
+    watcher.run(on_change, on_error)
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="OBS Grade Puller")
+    parser.add_argument("--batch", action="store_true",
+                        help="Kayıtlı tüm hesapları menü olmadan, paralel çek ve dosyaya yaz")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Toplu modda aynı anda işlenecek hesap sayısı (Varsayılan: 4)")
+    parser.add_argument("--out", default="obs_output",
+                        help="Toplu mod çıktı klasörü (Varsayılan: ./obs_output)")
+    parser.add_argument("--watch", action="store_true",
+                        help="İzleme modu: Notları periyodik yokla, sadece değişenleri göster")
+    parser.add_argument("--interval", type=float, default=15,
+                        help="İzleme modunda yoklama aralığı, dakika (Varsayılan: 15)")
+    parser.add_argument("--user", help="İzleme / dışa aktarma modunda kullanılacak kayıtlı kullanıcı")
+    parser.add_argument("--export", choices=["jsonl", "csv"],
+                        help="Kayıtlı hesapların notlarını UI olmadan JSON Lines / CSV olarak akıt")
+    parser.add_argument("--output", default="-",
+                        help="Dışa aktarma hedefi (Varsayılan: - yani stdout)")
+    parser.add_argument("--captcha-backend", choices=["auto", "numpy", "float16", "int8", "keras"],
+                        help="Captcha modeli motoru (Varsayılan: auto; int8/float16 küçük, TensorFlow'suz ağırlıklar)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Çıkışta istek/parse/captcha sürelerinin aşama bazında dökümünü göster")
+    parser.add_argument("--profile-out", metavar="DOSYA",
+                        help="Profil kayıtlarını JSON olarak yaz (chrome://tracing ile de açılır, --profile'ı açar)")
+    return parser.parse_args(argv)
+
+def _report_profile(active_profiler, out_path=None, stderr: bool = False):
+    """Profil dökümü. stderr=True ise (Dışa aktarma modu) her şey stderr'e yazılır, stdout veri olarak kalır."""
+    from src.ui.display import DisplayManager
+    DisplayManager(stderr=stderr).render_profile(active_profiler.summary(), active_profiler.wall_seconds)
+    if out_path:
+        active_profiler.dump(out_path)
+        print(f"Profil kaydedildi: {out_path}", file=sys.stderr if stderr else sys.stdout)
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.captcha_backend:
+        # Solver ilk captcha'da (lazy) kurulur; seçim ortam değişkeniyle ona ulaşır (CaptchaSolver.BACKEND_ENV)
+        os.environ["OBS_CAPTCHA_BACKEND"] = args.captcha_backend
+    active_profiler = None
+    if args.profile or args.profile_out:
+        from src.services import profiler
+        active_profiler = profiler.Profiler()
+        profiler.activate(active_profiler)
     try:
+        if args.export:
+            from src.export import run_export
+            results = run_export(args.export, args.output, [args.user] if args.user else None,
+                                 concurrency=args.concurrency)
+            sys.exit(0 if all(r.success for r in results) else 1)
+        if args.batch:
+            from src.batch import run_batch
+            results = run_batch(args.out, concurrency=args.concurrency)
+            sys.exit(0 if all(r.success for r in results) else 1)
+        if args.watch:
+            sys.exit(watch_main(args.user, args.interval))
         main()
     except KeyboardInterrupt:
-        print("\nİşlem iptal edildi.")
\ No newline at end of file
+        print("\nİşlem iptal edildi.", file=sys.stderr if args.export else sys.stdout)
+    finally:
+        if active_profiler is not None:
+            _report_profile(active_profiler, args.profile_out, stderr=bool(args.export))
\ No newline at end of file
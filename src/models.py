@@ -1,13 +1,64 @@
-from dataclasses import dataclass
-from typing import Optional
+import math
+from functools import lru_cache
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 
-@dataclass
+if TYPE_CHECKING:
+    import numpy as np
+
+class ScoreState(str, Enum):
+    """Bir not/ortalama hücresinin durumu (Ham metin bir kez yorumlanır)."""
+    NUMBER = "number"            # Sayı (Örn: 80, 44,90)
+    NOT_ENTERED = "not_entered"  # Henüz girilmemiş (-, --, boş)
+    UNKNOWN = "unknown"          # Bilinmiyor / çekilemedi (?)
+    TEXT = "text"                # Sayı olmayan bir işaret (Örn: G - Girmedi)
+
+_NOT_ENTERED = ("", "-", "--")
+
+# Aynı metinler ("-", "?", "80"...) binlerce kez tekrar eder: Sonuç (ve float nesnesi) paylaşılır
+@lru_cache(maxsize=4096)
+def parse_score(raw: str) -> Tuple[ScoreState, Optional[float]]:
+    """OBS'deki ham not metnini (durum, sayı) olarak yorumlar. Ondalık ayırıcı virgül de olabilir."""
+    text = (raw or "").strip()
+    if text in _NOT_ENTERED:
+        return ScoreState.NOT_ENTERED, None
+    if text == "?":
+        return ScoreState.UNKNOWN, None
+    try:
+        value = float(text.replace(",", "."))
+    except ValueError:
+        return ScoreState.TEXT, None
+    if not math.isfinite(value):
+        return ScoreState.TEXT, None
+    return ScoreState.NUMBER, value
+
+@dataclass(slots=True)
 class ExamStats:
-    """Tek bir sınavın notu ve sınıf ortalaması."""
+    """Tek bir sınavın notu ve sınıf ortalaması.
+    Ham metinler gösterim için saklanır; sayısal değerler oluşturulurken bir kez parse edilir."""
     score: str = "-"       # Öğrencinin notu (Örn: 80)
     class_avg: str = "?"   # Sınıf ortalaması (Örn: 44,90)
+    # Türetilmiş alanlar (Karşılaştırmaya ve serileştirmeye girmez)
+    score_state: ScoreState = field(init=False, repr=False, compare=False)
+    score_value: Optional[float] = field(init=False, repr=False, compare=False)
+    avg_state: ScoreState = field(init=False, repr=False, compare=False)
+    avg_value: Optional[float] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.score_state, self.score_value = parse_score(self.score)
+        self.avg_state, self.avg_value = parse_score(self.class_avg)
 
-@dataclass
+    @property
+    def average_missing(self) -> bool:
+        """Not girilmiş ama sınıf ortalaması bilinmiyor ('?'): Ortalama sonradan yayınlanabilir, kesin sayılmaz.
+        Notu olmayan sınavın (Örn: Yapılmamış bütünleme) '?' ortalaması ise eksik değildir."""
+        return self.score_state != ScoreState.NOT_ENTERED and self.avg_state == ScoreState.UNKNOWN
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"score": self.score, "class_avg": self.class_avg}
+
+@dataclass(slots=True)
 class CourseGrade:
     """Bir dersin tüm not bilgileri."""
     code: str              # Ders Kodu (BİLM201)
@@ -18,8 +69,87 @@ class CourseGrade:
     letter_grade: str      # Harf Notu (AA, BA, --)
     term_id: str           # Dönem ID (20251)
 
-@dataclass
+    # Sınavların sabit sırası (Sütunlu görünüm ve dışa aktarma bu sırayı kullanır)
+    EXAMS = ("midterm", "final", "makeup")
+
+    @property
+    def exams(self) -> Tuple[ExamStats, ExamStats, ExamStats]:
+        return self.midterm, self.final, self.makeup
+
+    @property
+    def averages_complete(self) -> bool:
+        """Notu girilmiş her sınavın sınıf ortalaması biliniyor mu (Bkz. ExamStats.average_missing)."""
+        return not any(exam.average_missing for exam in self.exams)
+
+    def to_dict(self) -> Dict:
+        """Sadece ham alanlar (JSON önbelleği / çıktı dosyaları). from_dict ile geri kurulur."""
+        return {
+            "code": self.code,
+            "name": self.name,
+            "midterm": self.midterm.to_dict(),
+            "final": self.final.to_dict(),
+            "makeup": self.makeup.to_dict(),
+            "letter_grade": self.letter_grade,
+            "term_id": self.term_id
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CourseGrade":
+        """to_dict() / asdict() çıktısından (JSON önbelleği) nesneyi geri kurar."""
+        fields = dict(data)
+        for key in cls.EXAMS:
+            exam = fields[key]
+            fields[key] = ExamStats(exam["score"], exam["class_avg"])
+        return cls(**fields)
+
+@dataclass(slots=True)
+class GradeUpdate:
+    """Akış (streaming) modunda bir dersin o anki hali."""
+    index: int             # Dersin tablodaki sırası (Aynı ders güncellenince aynı index gelir)
+    course: CourseGrade    # Güncel ders bilgisi
+    stats_ready: bool      # Sınıf ortalamaları geldi mi (False ise '?' olanlar bekleniyor)
+    stats_failed: bool = False # İstatistik isteği başarısız oldu ('?' ortalamalar bilinmiyor, "sınav yok" değil)
+
+@dataclass(slots=True)
+class TermColumns:
+    """
+    Bir dönemin sütunlu (NumPy) görünümü, analiz için.
+    scores / averages: (ders sayısı, 3) float dizileri, sütunlar CourseGrade.EXAMS sırasıyla;
+    sayı olmayan hücreler NaN. entered: Notu girilmiş (sayı olan) hücrelerin maskesi.
+    """
+    term_id: str
+    codes: List[str]
+    scores: "np.ndarray"
+    averages: "np.ndarray"
+    entered: "np.ndarray"
+
+    @classmethod
+    def from_grades(cls, grades: Sequence[CourseGrade]) -> "TermColumns":
+        import numpy as np # Sadece analizde gerekiyor, model import'unu ağırlaştırmasın
+
+        scores = np.full((len(grades), len(CourseGrade.EXAMS)), np.nan)
+        averages = np.full_like(scores, np.nan)
+        for row, grade in enumerate(grades):
+            for col, exam in enumerate(grade.exams):
+                if exam.score_value is not None:
+                    scores[row, col] = exam.score_value
+                if exam.avg_value is not None:
+                    averages[row, col] = exam.avg_value
+        return cls(
+            term_id=grades[0].term_id if grades else "",
+            codes=[g.code for g in grades],
+            scores=scores,
+            averages=averages,
+            entered=~np.isnan(scores)
+        )
+
+    @property
+    def diff_from_average(self) -> "np.ndarray":
+        """Notun ortalamadan farkı (İkisinden biri yoksa NaN)."""
+        return self.scores - self.averages
+
+@dataclass(slots=True)
 class UserProfile:
     """Kullanıcı profil bilgisi (Şifre burada tutulmaz!)."""
     username: str          # Öğrenci No
-    last_login: str = ""   # Son giriş tarihi (Opsiyonel, şimdilik boş kalsın)
\ No newline at end of file
+    last_login: str = ""   # Son giriş tarihi (Opsiyonel, şimdilik boş kalsın)
@@ -1,4 +1,3 @@
-import keyring
 import json
 import os
 from typing import List, Optional
@@ -46,6 +45,7 @@ class AuthManager:
 
     def save_user(self, username: str, password: str):
         """Kullanıcıyı listeye ekler, şifreyi Keyring'e kilitler."""
+        import keyring # Backend araması yavaş: Sadece şifreye gerçekten dokunulunca yüklenir
         keyring.set_password(self.SERVICE_ID, username, password)
         
         if username not in self._profiles:
@@ -53,6 +53,7 @@ class AuthManager:
             self._save_profiles()
 
     def get_password(self, username: str) -> Optional[str]:
+        import keyring
         return keyring.get_password(self.SERVICE_ID, username)
 
     def get_registered_users(self) -> List[str]:
@@ -60,6 +61,7 @@ class AuthManager:
 
     def delete_user(self, username: str):
         try:
+            import keyring
             keyring.delete_password(self.SERVICE_ID, username)
         except:
             pass
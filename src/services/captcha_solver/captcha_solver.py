@@ -1,90 +1,214 @@
-import tensorflow as tf
 import cv2
 import numpy as np
 import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+from src.services import profiler
+from src.services.captcha_solver import segmentation
+
+# Captcha girdisi: indirilen ham byte'lar, decode edilmiş dizi veya dosya yolu
+CaptchaImage = Union[bytes, np.ndarray, str]
+
+@dataclass
+class CaptchaPrediction:
+    """Bir captcha için model çıktısı."""
+    answer: str               # İşlemin sonucu (Örn: 58+5 -> "63")
+    digits: List[int]         # Okunan rakamlar [5, 8, 5]
+    confidences: List[float]  # Her rakamın softmax olasılığı
+    segmentation_confidence: float = 1.0 # Rakam kutularının ne kadar güvenilir bulunduğu
+
+    @property
+    def rejected(self) -> bool:
+        """Kesim güvenilmez bulundu, model hiç çalıştırılmadı (Cevap yok; yeni captcha istenmeli)."""
+        return not self.digits
+
+    @property
+    def confidence(self) -> float:
+        """En zayıf rakamın güveni (Cevap ancak bu kadar güvenilir)."""
+        return min(self.confidences) if self.confidences else 0.0
 
 class CaptchaSolver:
     MODEL_PATH = os.path.join(os.path.dirname(__file__), "digit_model.h5")
+    # export_model.py ile üretilen, TensorFlow gerektirmeyen ağırlık dosyası
+    NPZ_PATH = os.path.join(os.path.dirname(__file__), "digit_model.npz")
+    # export_model.py --quantize ile üretilen küçük ağırlık dosyaları (NumPy motoru ile çalışır)
+    QUANTIZED_PATHS = {
+        "float16": os.path.join(os.path.dirname(__file__), "digit_model.float16.npz"),
+        "int8": os.path.join(os.path.dirname(__file__), "digit_model.int8.npz")
+    }
+
+    # auto: .npz varsa NumPy motoru, yoksa Keras. float16 / int8: Quantize edilmiş .npz, NumPy motoru ile.
+    BACKENDS = ("auto", "numpy", "float16", "int8", "keras")
+    # get_solver()'ın kullandığı backend bu ortam değişkeniyle seçilir (Örn: küçük konteynerlerde int8)
+    BACKEND_ENV = "OBS_CAPTCHA_BACKEND"
+
     IMG_HEIGHT = 40
     IMG_WIDTH = 100
     
-    # Egitimdeki dilimleme ile ayni olmali
-    SLICES = [
-        (13, 29), 
-        (29, 52),
-        (88, 110)
-    ]
-
-    def __init__(self):
+    # Referans rakam sütunları (Kesim genişlikleri). Yerleri her görüntüde segmentation ile bulunur.
+    SLICES = list(segmentation.TEMPLATE)
+
+    def __init__(self, backend: str = "auto", model_path: Optional[str] = None):
+        """model_path verilmezse backend'in varsayılan dosyası (MODEL_PATH / NPZ_PATH) kullanılır."""
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Bilinmeyen backend: {backend} (Seçenekler: {', '.join(self.BACKENDS)})")
+        if backend == "auto":
+            backend = "numpy" if os.path.exists(model_path or self.NPZ_PATH) else "keras"
+        self.backend = backend
+        self.model_path = model_path or self.default_path(backend)
         self.model = None
+        self.load_seconds = 0.0
+        # Bu güvenin altındaki kesimler modele gönderilmez (Yanlış kutudan okunan cevap bir login POST'una mal olur)
+        self.min_segmentation_confidence = segmentation.MIN_CONFIDENCE
+        # Keras modeli aynı anda birden fazla thread'den çağrılmaya karşı korunur
+        self._predict_lock = threading.Lock()
         self._load_model()
 
+    @classmethod
+    def default_path(cls, backend: str) -> str:
+        if backend == "numpy":
+            return cls.NPZ_PATH
+        return cls.QUANTIZED_PATHS.get(backend, cls.MODEL_PATH)
+
     def _load_model(self):
-        if os.path.exists(self.MODEL_PATH):
+        started = time.perf_counter()
+        with profiler.span(f"captcha.load_{self.backend}"):
+            if self.backend != "keras":
+                self._load_numpy_model()
+            else:
+                self._load_keras_model()
+        self.load_seconds = time.perf_counter() - started
+
+    def _load_numpy_model(self):
+        if os.path.exists(self.model_path):
             try:
-                self.model = tf.keras.models.load_model(self.MODEL_PATH, compile=False)
+                from src.services.captcha_solver.numpy_backend import NumpyDigitModel
+                self.model = NumpyDigitModel(self.model_path)
+                print(f"[INFO] Rakam Modeli Yüklendi (NumPy, {self.model.quantization}).")
+            except Exception as e:
+                print(f"[HATA] Model yüklenemedi: {e}")
+        else:
+            print(f"[UYARI] NumPy ağırlık dosyası bulunamadı: {self.model_path} (export_model.py çalıştırılmalı).")
+
+    def _load_keras_model(self):
+        if os.path.exists(self.model_path):
+            try:
+                # TensorFlow sadece Keras backend seçilirse import edilir (Ağır import)
+                import tensorflow as tf
+                self.model = tf.keras.models.load_model(self.model_path, compile=False)
                 print("[INFO] Rakam Modeli Yüklendi.")
             except Exception as e:
                 print(f"[HATA] Model yüklenemedi: {e}")
         else:
             print("[UYARI] Model dosyası bulunamadı.")
 
-    def solve(self, image_path: str) -> str:
+    def warmup(self):
+        """Boş bir girdiyle tek tahmin yapar; ilk predict'teki graph kurulum maliyetini öne çeker."""
         if not self.model:
+            return
+        blob = np.zeros((1, 32, 32, 1), dtype=np.float32)
+        with self._predict_lock:
+            self.model.predict(blob, verbose=0)
+
+    def _read_image(self, image: CaptchaImage) -> Optional[np.ndarray]:
+        """Ham byte (PNG), NumPy dizisi ya da dosya yolundan gri tonlamalı görüntü döner."""
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            buffer = np.frombuffer(image, dtype=np.uint8)
+            return cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+        if isinstance(image, np.ndarray):
+            if image.ndim == 3:
+                return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            return image
+        return cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+
+    @classmethod
+    def slice_digits(cls, img: np.ndarray) -> Optional[np.ndarray]:
+        """Gri captcha görüntüsündeki rakam kutularını bulup keser, (3, 32, 32) uint8 rakam dizisi döner.
+        Kesim güvenilmezse None. Model gerektirmez: Veri toplayıcı ve eğitim de aynı kesimi kullanır."""
+        seg = segmentation.segment(img)
+        if not seg.ok:
             return None
+        return segmentation.crop_digits(img, seg.boxes)
 
-        try:
-            # 1. Okuma & Preprocessing (RAW - Filtersiz)
-            img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-            if img is None: return None
-            
-            # Gürültü temizleme KALDIRILDI (Training verisi de raw)
-            # img = cv2.medianBlur(img, 3) 
-            # ...
-            
-            # RESIZE KALDIRILDI - Egitim verisi orjinal boyutlarda (177x40) hazirlandi
-            #img = cv2.resize(img, (self.IMG_WIDTH, self.IMG_HEIGHT))
-
-            # 2. Dilimleme ve Tahmin
-            digits = []
-            for start, end in self.SLICES:
-                roi = img[:, start:end]
-                
-                # Kare yap (32x32) - Padding ile
-                h, w = roi.shape
-                if w == 0 or h == 0: continue
-                
-                top_bottom_pad = 0
-                left_right_pad = max(0, (h - w) // 2)
-                padded = cv2.copyMakeBorder(roi, top_bottom_pad, top_bottom_pad, left_right_pad, left_right_pad, cv2.BORDER_CONSTANT, value=0)
-                
-                # Resize 32x32 (Model girdisi)
-                resized = cv2.resize(padded, (32, 32))
-                resized = resized / 255.0 # Normalize
-                
-                # Batch dim ekle (1, 32, 32, 1)
-                blob = np.expand_dims(resized, axis=-1)
-                blob = np.expand_dims(blob, axis=0)
-                
-                # Tahmin
-                preds = self.model.predict(blob, verbose=0)
-                digit = np.argmax(preds)
-                digits.append(digit)
-            
-            if len(digits) != 3:
-                print(f"[HATA] Beklenen 3 rakam bulunamadı, bulunan: {len(digits)}")
-                return None
-
-            # 3. Sonuç Oluşturma
+    def solve_many(self, images: Sequence[CaptchaImage]) -> List[Optional[CaptchaPrediction]]:
+        """N captcha'yı tek bir batch (3N, 32, 32, 1) ile sınıflandırır.
+        Okunamayan görüntüler için listede None döner (sıra korunur). Kesimi güvenilmez bulunanlar
+        modele gönderilmez; onlar için rejected (rakamsız) bir tahmin döner."""
+        results: List[Optional[CaptchaPrediction]] = [None] * len(images)
+        if not self.model or not images:
+            return results
+
+        crops = []
+        owners = []
+        with profiler.span("captcha.preprocess"):
+            decoded = [(idx, img) for idx, img in enumerate(self._read_image(image) for image in images)
+                       if img is not None]
+            segments = segmentation.segment_many([img for _, img in decoded])
+            for (idx, img), seg in zip(decoded, segments):
+                if seg.confidence < self.min_segmentation_confidence:
+                    results[idx] = CaptchaPrediction("", [], [], segmentation_confidence=seg.confidence)
+                    continue
+                digits = segmentation.crop_digits(img, seg.boxes)
+                if digits is None: continue
+                crops.append(digits)
+                owners.append((idx, seg.confidence))
+
+        if not crops:
+            return results
+
+        batch = (np.concatenate(crops).astype(np.float32) / 255.0)[..., np.newaxis] # Normalize
+        with self._predict_lock, profiler.span("captcha.inference"):
+            probs = np.asarray(self.model.predict(batch, verbose=0))
+
+        labels = probs.argmax(axis=1)
+        confidences = probs.max(axis=1)
+        n = len(self.SLICES)
+        for k, (idx, seg_confidence) in enumerate(owners):
+            d1, d2, d3 = (int(d) for d in labels[k * n:(k + 1) * n])
             # xx + x formati
-            d1, d2, d3 = digits
-            num1 = (d1 * 10) + d2
-            num2 = d3
-            result = num1 + num2
-            
-            print(f"[AI TAHMİN] {d1}{d2} + {d3} = {result}")
-            return str(result)
-            
+            answer = (d1 * 10) + d2 + d3
+            results[idx] = CaptchaPrediction(
+                answer=str(answer),
+                digits=[d1, d2, d3],
+                confidences=[float(c) for c in confidences[k * n:(k + 1) * n]],
+                segmentation_confidence=seg_confidence
+            )
+        return results
+
+    def solve_detailed(self, image: CaptchaImage) -> Optional[CaptchaPrediction]:
+        """Tek captcha için rakamları ve rakam başına güven değerlerini döner."""
+        try:
+            return self.solve_many([image])[0]
         except Exception as e:
             print(f"[HATA] Çözüm hatası: {e}")
             return None
+
+    def solve(self, image: CaptchaImage) -> Optional[str]:
+        prediction = self.solve_detailed(image)
+        if prediction is None:
+            return None
+        if prediction.rejected:
+            print(f"[AI] Rakamlar bulunamadı (kesim güveni: {prediction.segmentation_confidence:.2f})")
+            return None
+
+        d1, d2, d3 = prediction.digits
+        print(f"[AI TAHMİN] {d1}{d2} + {d3} = {prediction.answer} (güven: {prediction.confidence:.2f})")
+        return prediction.answer
+
+
+# --- SÜREÇ GENELİ SOLVER KAYDI ---
+# Model her captcha'da değil, süreç başına bir kez yüklenir.
+_solver: Optional[CaptchaSolver] = None
+_solver_lock = threading.Lock()
+
+def get_solver() -> CaptchaSolver:
+    """Paylaşılan CaptchaSolver örneğini döner, ilk çağrıda (thread-safe) oluşturur.
+    Backend, OBS_CAPTCHA_BACKEND ortam değişkeninden okunur (Yoksa auto)."""
+    global _solver
+    if _solver is None:
+        with _solver_lock:
+            if _solver is None:
+                _solver = CaptchaSolver(backend=os.environ.get(CaptchaSolver.BACKEND_ENV, "auto"))
+    return _solver
@@ -1,133 +1,238 @@
+"""
+Captcha veri toplayıcı.
+
+Arka planda birkaç thread captcha'ları önceden indirir ve mevcut modelle ön etiketler (Kuyrukta
+bekler), böylece etiketleme hiç ağı beklemez: Kullanıcı sadece model tahminini onaylar (Enter)
+veya düzeltir. Ham görüntüler ve kesilmiş rakamlar tek bir paketlenmiş depoya (DatasetStore,
+.npy shard'ları) eklenir; her örnek için ayrı PNG yazılmaz.
+
+  python src/services/captcha_solver/collect_data.py --workers 4
+  python src/services/captcha_solver/collect_data.py --auto-accept 0.99   # Emin olunanlar sorulmaz
+  python src/services/captcha_solver/collect_data.py --import-png dataset/  # Eski PNG klasörünü aktar
+"""
 import sys
 import os
-import uuid
+import glob
 import time
+import queue
+import argparse
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
 from rich.console import Console
 
-# Proje kök dizinini path'e ekle
+# Proje kök dizinini path'e ekle (src/services/captcha_solver -> proje kökü)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(current_dir)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+import cv2
+import numpy as np
+
 from src.services.obs_client import OBSClient
+from src.services.captcha_solver.captcha_solver import CaptchaPrediction, CaptchaSolver
+from src.services.captcha_solver.dataset_store import DatasetStore
+
+DEFAULT_STORE = os.path.join(project_root, "dataset_store")
+# Login sayfası bu kadar captcha'da bir tazelenir (Arada sadece captcha.aspx indirilir)
+PAGE_REUSE = 25
+
+@dataclass
+class HarvestedCaptcha:
+    """Kuyruktaki, indirilmiş ve (model varsa) ön etiketlenmiş captcha."""
+    raw: bytes
+    image: np.ndarray
+    prediction: Optional[CaptchaPrediction]
+
+    @property
+    def suggested_label(self) -> Optional[str]:
+        if not self.prediction or self.prediction.rejected:
+            return None
+        d1, d2, d3 = self.prediction.digits
+        return f"{d1}{d2}+{d3}"
+
+
+class Harvester:
+    """
+    workers adet thread, her biri kendi OBS oturumuyla captcha indirir, decode eder, ön etiketler
+    ve sınırlı bir kuyruğa koyar (Kuyruk doluysa bekler: Etiketlenmeyecek kadar çok indirilmez).
+    """
+
+    def __init__(self, workers: int = 4, prefetch: int = 16, host: Optional[str] = None,
+                 solver: Optional[CaptchaSolver] = None):
+        self.items: "queue.Queue[HarvestedCaptcha]" = queue.Queue(maxsize=max(1, prefetch))
+        self.solver = solver if solver is not None and solver.model else None
+        self.host = host
+        self.errors = Counter()
+        self._errors_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._run, name=f"harvest-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        client = OBSClient(host=self.host)
+        soup = None
+        served = 0
+        while not self._stop.is_set():
+            try:
+                # Captcha login sayfasının oturumuna bağlı: Sayfa bir kez alınır, captcha tekrar tekrar indirilir
+                if soup is None or served >= PAGE_REUSE:
+                    page = client.session.get(client.LOGIN_URL, timeout=client.transport.timeout("login")).content
+                    soup = client.parser.parse(page, client.LOGIN_PAGE_IDS)
+                    served = 0
+                raw = client._download_captcha(soup)
+                served += 1
+                image = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_GRAYSCALE) if raw else None
+                if image is None:
+                    self._record_error("captcha_missing")
+                    soup = None
+                    time.sleep(1)
+                    continue
+                prediction = self.solver.solve_many([image])[0] if self.solver else None
+                self._put(HarvestedCaptcha(raw, image, prediction))
+            except Exception as e:
+                self._record_error(type(e).__name__)
+                soup = None
+                time.sleep(1)
+
+    def _record_error(self, kind: str):
+        with self._errors_lock:
+            self.errors[kind] += 1
+
+    def _put(self, item: HarvestedCaptcha):
+        while not self._stop.is_set():
+            try:
+                self.items.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def get(self) -> HarvestedCaptcha:
+        return self.items.get()
+
+
+def _open_image(raw: bytes) -> str:
+    """Görüntüyü sistemin resim görüntüleyicisinde açar, geçici dosyanın yolunu döner."""
+    import tempfile, platform, subprocess
+    fd, path = tempfile.mkstemp(prefix="obs_captcha_", suffix=".png")
+    with os.fdopen(fd, "wb") as f:
+        f.write(raw)
+    if platform.system() == "Windows": os.startfile(path)
+    elif platform.system() == "Darwin": subprocess.call(("open", path))
+    else: subprocess.call(("xdg-open", path))
+    return path
+
+
+def import_png_dir(store: DatasetStore, dataset_dir: str, console: Console) -> int:
+    """Eski formatta (dataset/<etiket>_<id>.png) toplanmış ham captcha'ları depoya aktarır."""
+    count = 0
+    for path in sorted(glob.glob(os.path.join(dataset_dir, "*.png"))):
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            continue
+        label = os.path.basename(path).rsplit("_", 1)[0]
+        store.append(image, label, CaptchaSolver.slice_digits(image), source="import")
+        count += 1
+    store.flush()
+    console.print(f"✅ {count} görüntü aktarıldı -> {store.root}")
+    return count
+
+
+def harvest(store: DatasetStore, args, console: Console):
+    solver = None if args.no_model else CaptchaSolver()
+    harvester = Harvester(args.workers, args.prefetch, args.host, solver)
+    harvester.start()
 
-def main():
-    console = Console()
-    client = OBSClient()
-    
-    dataset_dir = os.path.join(project_root, "dataset")
-    if not os.path.exists(dataset_dir):
-        os.makedirs(dataset_dir)
-        
     console.print("[bold green]OBS Captcha Veri Toplayıcı Başlatıldı![/bold green]")
-    console.print("Çıkmak için [bold red]'q'[/bold red], atlamak için [bold yellow]Enter[/bold yellow] tuşuna basın.")
+    console.print("[bold yellow]Enter[/bold yellow]: Model tahminini onayla, "
+                  "[bold yellow]x[/bold yellow]: atla, [bold red]q[/bold red]: çık")
     console.print("Format: [cyan]Sayı1[/cyan] [magenta]s[/magenta] [cyan]Sayı2[/cyan] (Örn: 58s5 -> 58+5 olarak kaydedilir)\n")
 
-    count = 0
-    while True:
-        try:
-            # 1. Login sayfasına git (Cookie ve ViewState tazele)
-            # Login metodu yerine manuel istek atıyoruz ki sistemi yormayalım
-            # Ancak OBSClient'ın login metodundaki captcha indirme mantığını kullanmak daha temiz
-            # Bu yüzden _download_captcha metodunu direkt çağıramayız (soup lazım)
-            # O yüzden basit bir "sayfa yükle -> resim bul -> indir" akışı yapalım
-            
-            console.print("[dim]Resim indiriliyor...[/dim]", end="\r")
-            
-            # Login sayfasını çek
-            r_get = client.session.get(client.LOGIN_URL)
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(r_get.content, "html.parser")
-            
-            # Captcha indir
-            captcha_path = client._download_captcha(soup)
-            
-            if not captcha_path:
-                console.print("[red]Captcha bulunamadı! Tekrar deneniyor...[/red]")
-                time.sleep(1)
+    saved = Counter()
+    waited = 0.0
+    started = time.perf_counter()
+    try:
+        while args.limit is None or sum(saved.values()) < args.limit:
+            wait_started = time.perf_counter()
+            item = harvester.get()
+            waited += time.perf_counter() - wait_started
+            suggested = item.suggested_label
+            confidence = item.prediction.confidence if item.prediction else None
+            digits = CaptchaSolver.slice_digits(item.image)
+
+            # Model çok eminse sorma (Varsayılan: Kapalı, her örnek bir insan tarafından görülür)
+            if suggested and args.auto_accept is not None and confidence >= args.auto_accept:
+                store.append(item.image, suggested, digits, source="model", confidence=confidence, predicted=suggested)
+                saved["model"] += 1
                 continue
 
-            # Resmi aç
-            import platform, subprocess
-            if platform.system() == "Windows": os.startfile(captcha_path)
-            elif platform.system() == "Darwin": subprocess.call(("open", captcha_path))
-            else: subprocess.call(("xdg-open", captcha_path))
-            
-            # Kullanıcı girişi
-            user_input = console.input(f"[bold yellow]#{count+1} Ne görüyorsun?[/bold yellow] (q=çık): ").strip().lower()
-            
-            # Dosyayı kapat/silmeye gerek yok, taşıyacağız
-            
-            if user_input == 'q':
-                if os.path.exists(captcha_path): os.remove(captcha_path)
-                console.print("\n[bold red]Çıkış yapılıyor... Teşekkürler![/bold red]")
+            captcha_path = None if args.no_viewer else _open_image(item.raw)
+            try:
+                hint = f" [dim](Model: {suggested.replace('+', 's')}, güven {confidence:.2f})[/dim]" if suggested else ""
+                user_input = console.input(f"[bold yellow]#{sum(saved.values()) + 1} Ne görüyorsun?[/bold yellow]{hint}: ").strip().lower()
+            finally:
+                if captcha_path and os.path.exists(captcha_path): os.remove(captcha_path)
+
+            if user_input == "q":
                 break
-                
-            if not user_input:
+            if user_input == "x" or (not user_input and not suggested):
                 console.print("[dim]Atlandı...[/dim]")
-                if os.path.exists(captcha_path): os.remove(captcha_path)
                 continue
-                
-            # 's' harfini '+' ile değiştir
-            formatted_label = user_input.replace('s', '+')
-            
-            # 1. Ham Resmi Kaydet
-            filename = f"{formatted_label}_{uuid.uuid4().hex[:8]}.png"
-            target_path = os.path.join(dataset_dir, filename)
-            
-            # open()'dan gelen dosyayi tasimak yerine, openCV ile okuyup kaydedelim (Daha kontrollü)
-            # Once cv2 ile oku
-            import cv2
-            import numpy as np
-            
-            full_img = cv2.imread(captcha_path, cv2.IMREAD_GRAYSCALE)
-            cv2.imwrite(target_path, full_img) # Raw yedek
-            
-            # --- OTOMATİK DİLİMLEME VE RAKAM KAYDETME ---
-            dataset_digits_dir = os.path.join(project_root, "dataset_digits")
-            if not os.path.exists(dataset_digits_dir): os.makedirs(dataset_digits_dir)
-            
-            parts = formatted_label.split('+')
-            # Eger format xx+x seklindeyse (ornegin 58+5)
-            if len(parts) == 2 and len(parts[0]) == 2 and len(parts[1]) == 1:
-                # Koordinatlar (VERIFIED)
-                SLICES = [(13, 29), (29, 52), (88, 110)]
-                digits_val = [int(parts[0][0]), int(parts[0][1]), int(parts[1][0])]
-                
-                for i, (start, end) in enumerate(SLICES):
-                    digit_val = digits_val[i]
-                    roi = full_img[:, start:end]
-                    
-                    # Kare yap & Resize 32x32
-                    h, w = roi.shape
-                    if w > 0 and h > 0:
-                        top_bottom_pad = 0
-                        left_right_pad = max(0, (h - w) // 2)
-                        padded = cv2.copyMakeBorder(roi, top_bottom_pad, top_bottom_pad, left_right_pad, left_right_pad, cv2.BORDER_CONSTANT, value=0)
-                        resized = cv2.resize(padded, (32, 32))
-                        
-                        # Klasor kontrol
-                        d_folder = os.path.join(dataset_digits_dir, str(digit_val))
-                        if not os.path.exists(d_folder): os.makedirs(d_folder)
-                        
-                        # Kaydet
-                        digit_filename = f"{uuid.uuid4().hex[:8]}.png"
-                        cv2.imwrite(os.path.join(d_folder, digit_filename), resized)
-                
-                console.print(f"✅ Kaydedildi: [cyan]{filename}[/cyan] (+ 3 Rakam Ayrıştırıldı)")
+
+            if not user_input:
+                label, source = suggested, "confirmed"
             else:
-                 console.print(f"✅ Kaydedildi: [cyan]{filename}[/cyan] (Sadece Raw - Format Uymadı)")
-            
-            os.remove(captcha_path) # Temp dosyayi sil
-            count += 1
-            
-        except KeyboardInterrupt:
-            console.print("\n[bold red]İşlem durduruldu.[/bold red]")
-            break
-        except Exception as e:
-            console.print(f"[red]Hata: {e}[/red]")
-            time.sleep(1)
+                # 's' harfini '+' ile değiştir
+                label = user_input.replace("s", "+")
+                source = "human" if not suggested else ("confirmed" if label == suggested else "corrected")
+            store.append(item.image, label, digits, source=source, confidence=confidence, predicted=suggested)
+            saved[source] += 1
+            console.print(f"✅ Kaydedildi: [cyan]{label}[/cyan] ({source})")
+    except KeyboardInterrupt:
+        console.print("\n[bold red]İşlem durduruldu.[/bold red]")
+    finally:
+        harvester.stop()
+        store.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(saved.values())
+    console.print(f"\n[bold]{total}[/bold] örnek kaydedildi ({dict(saved)}), depoda toplam {len(store)} -> {store.root}")
+    console.print(f"Süre: {elapsed:.1f} sn ({total / elapsed if elapsed else 0:.1f} örnek/sn), "
+                  f"kuyruk bekleme: {waited:.1f} sn")
+    if harvester.errors:
+        console.print(f"[yellow]İndirme hataları: {dict(harvester.errors)}[/yellow]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OBS captcha veri toplayıcı")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Paketlenmiş veri deposu klasörü")
+    parser.add_argument("--workers", type=int, default=4, help="Arka planda captcha indiren thread sayısı")
+    parser.add_argument("--prefetch", type=int, default=16, help="Önceden indirilip bekletilecek captcha sayısı")
+    parser.add_argument("--auto-accept", type=float, metavar="GÜVEN",
+                        help="Model güveni bu değer ve üstündeyse sormadan kaydet (Örn: 0.99)")
+    parser.add_argument("--limit", type=int, help="Bu kadar örnek kaydedince dur")
+    parser.add_argument("--no-model", action="store_true", help="Ön etiketleme yapma (Her şey elle girilir)")
+    parser.add_argument("--no-viewer", action="store_true", help="Görüntüleri resim görüntüleyicide açma")
+    parser.add_argument("--host", help="Farklı bir sunucu (Örn: benchmarks/fake_obs.py)")
+    parser.add_argument("--shard-size", type=int, default=512, help="Shard başına örnek sayısı")
+    parser.add_argument("--import-png", metavar="KLASÖR", help="Eski dataset/*.png klasörünü depoya aktar ve çık")
+    args = parser.parse_args()
+
+    console = Console()
+    store = DatasetStore(args.store, shard_size=args.shard_size)
+    if args.import_png:
+        import_png_dir(store, args.import_png, console)
+        return
+    harvest(store, args, console)
 
 if __name__ == "__main__":
     main()
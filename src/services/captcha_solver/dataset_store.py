@@ -0,0 +1,210 @@
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Etiket formatı: xx+x (Örn: 58+5 -> rakamlar [5, 8, 5])
+_LABEL = re.compile(r"^(\d)(\d)\+(\d)$")
+
+DIGIT_SIZE = 32
+DIGITS_PER_CAPTCHA = 3
+
+# Bir örneğin etiketi nereden geldi
+SOURCES = ("human", "confirmed", "corrected", "model", "import")
+
+def label_digits(label: str) -> Optional[List[int]]:
+    """'58+5' -> [5, 8, 5]. Format uymazsa None (Sadece ham görüntü saklanır)."""
+    match = _LABEL.match(label or "")
+    return [int(d) for d in match.groups()] if match else None
+
+
+@dataclass(slots=True)
+class Sample:
+    """Depodaki tek captcha örneği."""
+    image: np.ndarray              # Ham gri görüntü (h, w) uint8
+    label: str                     # Örn: 58+5
+    digits: Optional[np.ndarray]   # Kesilmiş rakamlar (3, 32, 32) uint8, yoksa None
+    digit_labels: Optional[List[int]]
+    source: str                    # SOURCES'tan biri
+    confidence: Optional[float] = None  # Ön etiketleyen modelin güveni
+    predicted: Optional[str] = None     # Modelin önerdiği etiket
+
+
+class DatasetStore:
+    """
+    Captcha veri seti için paketlenmiş, sadece eklenen (append-only) depo.
+    Her örnek için ayrı PNG yerine, örnekler shard'lar halinde birkaç .npy dosyasına yazılır:
+
+      index.json                    Shard listesi ve örnek sayıları
+      shard_00000.images.npy        Ham görüntüler, uç uca (1 boyutlu uint8)
+      shard_00000.offsets.npy       Her görüntünün başlangıcı (N+1, int64)
+      shard_00000.shapes.npy        Her görüntünün (h, w) boyutu
+      shard_00000.digits.npy        Kesilmiş rakamlar (N, 3, 32, 32) uint8
+      shard_00000.digit_labels.npy  Rakam etiketleri (N, 3) int8, rakam yoksa -1
+      shard_00000.labels.json       Etiket, kaynak, model tahmini ve güveni
+
+    .npy dosyaları np.load(mmap_mode="r") ile belleğe eşlenir: Eğitim, on binlerce küçük
+    dosyayı açıp decode etmek yerine birkaç dosyayı doğrudan okur.
+    append() thread-safe'dir; örnekler bellekte biriktirilir ve shard_size'a ulaşınca (veya
+    flush/close ile) yeni bir shard olarak yazılır. index.json en son ve atomik güncellenir,
+    yarım kalan bir yazma önceki shard'ları bozmaz.
+    """
+
+    INDEX_FILE = "index.json"
+    VERSION = 1
+
+    def __init__(self, root: str, shard_size: int = 512):
+        self.root = root
+        self.shard_size = max(1, shard_size)
+        self._lock = threading.Lock()
+        self._pending: List[Sample] = []
+        os.makedirs(root, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self) -> Dict:
+        path = os.path.join(self.root, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {"version": self.VERSION, "digit_size": DIGIT_SIZE, "shards": []}
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != self.VERSION:
+            raise ValueError(f"Desteklenmeyen depo sürümü: {index.get('version')} ({path})")
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(s["count"] for s in self._index["shards"]) + len(self._pending)
+
+    def __enter__(self) -> "DatasetStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def shards(self) -> List[str]:
+        return [s["name"] for s in self._index["shards"]]
+
+    def append(self, image: np.ndarray, label: str, digits: Optional[np.ndarray] = None,
+               source: str = "human", confidence: Optional[float] = None,
+               predicted: Optional[str] = None):
+        """Bir örnek ekler. digits verilirse rakam etiketleri label'dan çıkarılır (Format uymazsa rakamlar atlanır)."""
+        if source not in SOURCES:
+            raise ValueError(f"Bilinmeyen kaynak: {source} (Seçenekler: {', '.join(SOURCES)})")
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        if image.ndim != 2:
+            raise ValueError(f"Gri (2 boyutlu) görüntü bekleniyordu, gelen: {image.shape}")
+        digit_labels = label_digits(label)
+        if digits is not None and (digit_labels is None or digits.shape != (DIGITS_PER_CAPTCHA, DIGIT_SIZE, DIGIT_SIZE)):
+            digits, digit_labels = None, None
+        sample = Sample(image, label, digits, digit_labels if digits is not None else None,
+                        source, confidence, predicted)
+        with self._lock:
+            self._pending.append(sample)
+            if len(self._pending) >= self.shard_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self.flush()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        samples, self._pending = self._pending, []
+        name = f"shard_{len(self._index['shards']):05d}"
+
+        offsets = np.zeros(len(samples) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([s.image.size for s in samples])
+        digits = np.zeros((len(samples), DIGITS_PER_CAPTCHA, DIGIT_SIZE, DIGIT_SIZE), dtype=np.uint8)
+        digit_labels = np.full((len(samples), DIGITS_PER_CAPTCHA), -1, dtype=np.int8)
+        for i, sample in enumerate(samples):
+            if sample.digits is not None:
+                digits[i] = sample.digits
+                digit_labels[i] = sample.digit_labels
+
+        arrays = {
+            "images": np.concatenate([s.image.ravel() for s in samples]),
+            "offsets": offsets,
+            "shapes": np.array([s.image.shape for s in samples], dtype=np.int32),
+            "digits": digits,
+            "digit_labels": digit_labels
+        }
+        for key, array in arrays.items():
+            self._write_atomic(f"{name}.{key}.npy", lambda f, a=array: np.save(f, a))
+        labels = [{
+            "label": s.label,
+            "source": s.source,
+            "confidence": s.confidence,
+            "predicted": s.predicted
+        } for s in samples]
+        self._write_atomic(f"{name}.labels.json", lambda f: f.write(json.dumps(labels, ensure_ascii=False).encode("utf-8")))
+
+        self._index["shards"].append({
+            "name": name,
+            "count": len(samples),
+            "digits": int((digit_labels[:, 0] >= 0).sum()),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        })
+        self._write_atomic(self.INDEX_FILE, lambda f: f.write(json.dumps(self._index, indent=2).encode("utf-8")))
+
+    def _write_atomic(self, filename: str, write):
+        path = os.path.join(self.root, filename)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    # --- OKUMA ---
+
+    def load_shard(self, name: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+        """Bir shard'ın dizileri (mmap=True ise belleğe eşlenmiş, salt okunur) + 'labels' listesi."""
+        mode = "r" if mmap else None
+        shard = {key: np.load(os.path.join(self.root, f"{name}.{key}.npy"), mmap_mode=mode)
+                 for key in ("images", "offsets", "shapes", "digits", "digit_labels")}
+        with open(os.path.join(self.root, f"{name}.labels.json"), "r", encoding="utf-8") as f:
+            shard["labels"] = json.load(f)
+        return shard
+
+    def digit_arrays(self, sources: Optional[Tuple[str, ...]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Eğitim için tüm etiketli rakamlar: X (M, 32, 32) uint8, y (M,) uint8.
+        sources verilirse sadece o kaynaklardan gelen örnekler (Örn: ("human", "corrected")).
+        """
+        xs, ys = [], []
+        for name in self.shards:
+            shard = self.load_shard(name)
+            keep = shard["digit_labels"][:, 0] >= 0
+            if sources is not None:
+                keep &= np.array([entry["source"] in sources for entry in shard["labels"]], dtype=bool)
+            xs.append(shard["digits"][keep].reshape(-1, DIGIT_SIZE, DIGIT_SIZE))
+            ys.append(shard["digit_labels"][keep].reshape(-1).astype(np.uint8))
+        if not xs:
+            return np.zeros((0, DIGIT_SIZE, DIGIT_SIZE), dtype=np.uint8), np.zeros(0, dtype=np.uint8)
+        return np.concatenate(xs), np.concatenate(ys)
+
+    def iter_samples(self) -> Iterator[Sample]:
+        """Yazılmış tüm örnekler, eklenme sırasıyla (Ham görüntüler depodan kopyalanmadan, görünüm olarak)."""
+        for name in self.shards:
+            shard = self.load_shard(name)
+            images, offsets, shapes = shard["images"], shard["offsets"], shard["shapes"]
+            for i, entry in enumerate(shard["labels"]):
+                h, w = (int(v) for v in shapes[i])
+                has_digits = shard["digit_labels"][i, 0] >= 0
+                yield Sample(
+                    image=images[offsets[i]:offsets[i + 1]].reshape(h, w),
+                    label=entry["label"],
+                    digits=shard["digits"][i] if has_digits else None,
+                    digit_labels=[int(d) for d in shard["digit_labels"][i]] if has_digits else None,
+                    source=entry["source"],
+                    confidence=entry.get("confidence"),
+                    predicted=entry.get("predicted")
+                )
@@ -0,0 +1,287 @@
+"""
+CaptchaSolver doğruluk ve gecikme ölçümü.
+
+Etiketli captcha'lar üzerinde, her backend için:
+  - Rakam (pozisyon bazında da) ve cevap doğruluğu, okunamayan ve kesimi reddedilen görüntü sayısı
+  - 10x10 karışıklık matrisi (Satır: gerçek rakam, sütun: tahmin)
+  - Güven kalibrasyonu: Güven aralıklarına göre gerçek doğruluk ve güven eşiği (AI_MIN_CONFIDENCE)
+    için kapsama / kabul edilenlerin doğruluğu (Yanlış cevap = boşa giden bir login POST'u)
+  - Her batch boyutu için captcha başına gecikme (p50 / p99, PNG decode dahil)
+Sonuç JSON olarak yazılır; modeller/backend'ler commit'ler arasında karşılaştırılabilir.
+
+Veri: collect_data.py'nin eski çıktısı (dataset/<a>+<b>_<id>.png) veya paketlenmiş depo (DatasetStore).
+Depodan okurken, varsayılan olarak modelin kendi kendine etiketledikleri ("model") hariç tutulur.
+
+  python src/services/captcha_solver/evaluate.py --dir dataset/ --json eval.json
+  python src/services/captcha_solver/evaluate.py --store dataset_store --backends numpy,keras --batch-sizes 1,8,32
+"""
+import sys
+import os
+import glob
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Proje kök dizinini path'e ekle (src/services/captcha_solver -> proje kökü)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import cv2
+import numpy as np
+
+from src.handlers import AI_MIN_CONFIDENCE
+from src.services.captcha_solver.captcha_solver import CaptchaPrediction, CaptchaSolver
+from src.services.captcha_solver.dataset_store import DatasetStore, SOURCES, label_digits
+
+# Kalibrasyon aralıkları (Captcha güveni = en zayıf rakamın güveni)
+CALIBRATION_BINS = (0.0, 0.5, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0)
+GATE_THRESHOLDS = (0.5, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+LabelledCaptcha = Tuple[bytes, List[int]] # (PNG byte'ları, [a1, a2, b])
+
+def load_dir(dataset_dir: str) -> Tuple[List[LabelledCaptcha], int]:
+    """<a>+<b>_<id>.png dosyaları. (etiketli örnekler, formatı uymayan dosya sayısı) döner."""
+    samples, skipped = [], 0
+    for path in sorted(glob.glob(os.path.join(dataset_dir, "*.png"))):
+        digits = label_digits(os.path.basename(path).rsplit("_", 1)[0])
+        if digits is None:
+            skipped += 1
+            continue
+        with open(path, "rb") as f:
+            samples.append((f.read(), digits))
+    return samples, skipped
+
+def load_store(store_dir: str, sources: Sequence[str]) -> Tuple[List[LabelledCaptcha], int]:
+    """Depodaki ham görüntüler, üretimdeki gibi PNG byte'ı olarak (Decode süresi gecikmeye dahil olsun)."""
+    samples, skipped = [], 0
+    for sample in DatasetStore(store_dir).iter_samples():
+        digits = label_digits(sample.label)
+        if digits is None or sample.source not in sources:
+            skipped += 1
+            continue
+        ok, png = cv2.imencode(".png", np.ascontiguousarray(sample.image))
+        if ok:
+            samples.append((png.tobytes(), digits))
+    return samples, skipped
+
+def _answer(digits: Sequence[int]) -> int:
+    return digits[0] * 10 + digits[1] + digits[2]
+
+def accuracy_report(predictions: Sequence[Optional[CaptchaPrediction]], samples: List[LabelledCaptcha]) -> Dict:
+    """Doğruluk, karışıklık matrisi ve kalibrasyon."""
+    truth, predicted, confidences, correct, read, rejected = [], [], [], [], 0, 0
+    for (_, digits), prediction in zip(samples, predictions):
+        if prediction is None:
+            continue
+        if prediction.rejected:
+            rejected += 1
+            continue
+        read += 1
+        truth.append(digits)
+        predicted.append(prediction.digits)
+        confidences.append(prediction.confidence)
+        correct.append(int(prediction.answer) == _answer(digits))
+
+    if not read:
+        return {"captchas": len(samples), "unreadable": len(samples) - rejected, "rejected": rejected}
+
+    truth_arr, pred_arr = np.array(truth), np.array(predicted)
+    confidences, correct = np.array(confidences), np.array(correct)
+    digit_hits = truth_arr == pred_arr
+
+    confusion = np.zeros((10, 10), dtype=int)
+    np.add.at(confusion, (truth_arr.ravel(), pred_arr.ravel()), 1)
+
+    calibration = []
+    for low, high in zip(CALIBRATION_BINS, CALIBRATION_BINS[1:]):
+        in_bin = (confidences >= low) & ((confidences < high) if high < 1.0 else (confidences <= high))
+        if in_bin.any():
+            calibration.append({"range": [low, high], "captchas": int(in_bin.sum()),
+                                "mean_confidence": float(confidences[in_bin].mean()),
+                                "accuracy": float(correct[in_bin].mean())})
+    # Beklenen kalibrasyon hatası: Aralık ağırlıklı |ortalama güven - doğruluk|
+    ece = sum(b["captchas"] * abs(b["mean_confidence"] - b["accuracy"]) for b in calibration) / read
+
+    gates = []
+    for threshold in sorted(set(GATE_THRESHOLDS) | {AI_MIN_CONFIDENCE}):
+        accepted = confidences >= threshold
+        gates.append({"threshold": threshold, "coverage": float(accepted.mean()),
+                      "accuracy": float(correct[accepted].mean()) if accepted.any() else None,
+                      "wrong_accepted": int((accepted & ~correct).sum())})
+
+    return {
+        "captchas": len(samples),
+        "unreadable": len(samples) - read - rejected,
+        # Kesim güvenilmez bulunup modele gönderilmeyenler (Gerçekte yeni captcha istenir, POST harcanmaz)
+        "rejected": rejected,
+        "answer_accuracy": float(correct.mean()),
+        "exact_digits_accuracy": float(digit_hits.all(axis=1).mean()),
+        "digit_accuracy": float(digit_hits.mean()),
+        "digit_accuracy_by_position": [float(v) for v in digit_hits.mean(axis=0)],
+        "confusion": confusion.tolist(),
+        "calibration": calibration,
+        "ece": float(ece),
+        "gates": gates
+    }
+
+def latency_report(solver: CaptchaSolver, samples: List[LabelledCaptcha], batch_sizes: Sequence[int],
+                   repeat: int) -> List[Dict]:
+    """Batch boyutu başına captcha başına gecikme (ms). İlk çağrı (ısınma) ölçüme girmez."""
+    images = [image for image, _ in samples]
+    solver.solve_many(images[:max(batch_sizes)])
+    results = []
+    for batch_size in batch_sizes:
+        per_captcha = []
+        for _ in range(repeat):
+            for start in range(0, len(images), batch_size):
+                chunk = images[start:start + batch_size]
+                t0 = time.perf_counter()
+                solver.solve_many(chunk)
+                per_captcha.append((time.perf_counter() - t0) * 1000 / len(chunk))
+        results.append({"batch_size": batch_size, "calls": len(per_captcha),
+                        "p50_ms": float(np.percentile(per_captcha, 50)),
+                        "p99_ms": float(np.percentile(per_captcha, 99)),
+                        "mean_ms": float(np.mean(per_captcha))})
+    return results
+
+def agreement(predictions: Sequence[Optional[CaptchaPrediction]],
+              reference: Sequence[Optional[CaptchaPrediction]]) -> Dict:
+    """İki backend'in aynı captcha'larda ne kadar aynı tahmin ettiği (Etiketten bağımsız)."""
+    pairs = [(p, r) for p, r in zip(predictions, reference) if p is not None and r is not None]
+    if not pairs:
+        return {"captchas": 0}
+    return {
+        "captchas": len(pairs),
+        "same_digits": sum(p.digits == r.digits for p, r in pairs) / len(pairs),
+        "max_confidence_diff": max(abs(p.confidence - r.confidence) for p, r in pairs)
+    }
+
+def evaluate_backend(backend: str, samples: List[LabelledCaptcha], batch_sizes: Sequence[int],
+                     repeat: int, model_path: Optional[str] = None
+                     ) -> Tuple[Dict, List[Optional[CaptchaPrediction]]]:
+    """(Sonuç, tahminler) döner; tahminler backend'ler arası karşılaştırma için."""
+    solver = CaptchaSolver(backend=backend, model_path=model_path)
+    if not solver.model:
+        return {"backend": backend, "error": "model yüklenemedi"}, []
+    # Doğruluk tek batch ile; gecikme ayrıca ölçülür
+    predictions = solver.solve_many([image for image, _ in samples])
+    return {
+        "backend": backend,
+        "model_path": os.path.relpath(solver.model_path, project_root),
+        "model_sha256": _sha256(solver.model_path),
+        "load_ms": solver.load_seconds * 1000,
+        "quantization": getattr(solver.model, "quantization", "float32"),
+        "accuracy": accuracy_report(predictions, samples),
+        "latency": latency_report(solver, samples, batch_sizes, repeat)
+    }, predictions
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def print_report(result: Dict):
+    if "error" in result:
+        print(f"\n[{result['backend']}] {result['error']}")
+        return
+    acc = result["accuracy"]
+    print(f"\n[{result['backend']}] {result['model_path']} ({result['quantization']}, yükleme {result['load_ms']:.0f} ms)")
+    if "answer_accuracy" not in acc:
+        print(f"  Hiçbir captcha okunamadı (okunamayan {acc['unreadable']}, kesim reddi {acc['rejected']} / {acc['captchas']})")
+        return
+    positions = ", ".join(f"{v:.2%}" for v in acc["digit_accuracy_by_position"])
+    print(f"  Cevap doğruluğu: {acc['answer_accuracy']:.2%}  (Rakamlar tam: {acc['exact_digits_accuracy']:.2%}, "
+          f"okunamayan: {acc['unreadable']}, kesim reddi: {acc['rejected']} / {acc['captchas']})")
+    print(f"  Rakam doğruluğu: {acc['digit_accuracy']:.2%}  (Pozisyon: {positions})")
+    print("  Karışıklık matrisi (Satır gerçek, sütun tahmin):")
+    print("       " + " ".join(f"{d:>4}" for d in range(10)))
+    for digit, row in enumerate(acc["confusion"]):
+        print(f"    {digit}  " + " ".join(f"{v:>4}" for v in row))
+    print(f"  Kalibrasyon (ECE {acc['ece']:.3f}):")
+    for b in acc["calibration"]:
+        print(f"    güven {b['range'][0]:.2f}-{b['range'][1]:.2f}: {b['captchas']:5d} captcha, "
+              f"ort. güven {b['mean_confidence']:.3f}, doğruluk {b['accuracy']:.2%}")
+    print("  Güven eşiği (Kabul edilen oran / kabul edilenlerin doğruluğu / boşa POST):")
+    for g in acc["gates"]:
+        marker = "  <- AI_MIN_CONFIDENCE" if g["threshold"] == AI_MIN_CONFIDENCE else ""
+        gate_acc = f"{g['accuracy']:.2%}" if g["accuracy"] is not None else "-"
+        print(f"    >= {g['threshold']:.2f}: {g['coverage']:.2%} / {gate_acc} / {g['wrong_accepted']}{marker}")
+    if "agreement" in result:
+        ref = result["agreement"]
+        if ref.get("captchas"):
+            print(f"  {ref['reference']} ile aynı rakamlar: {ref['same_digits']:.2%} "
+                  f"(max güven farkı {ref['max_confidence_diff']:.4f})")
+    print("  Gecikme (captcha başına, ms):")
+    for lat in result["latency"]:
+        print(f"    batch {lat['batch_size']:3d}: p50 {lat['p50_ms']:.3f}, p99 {lat['p99_ms']:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="CaptchaSolver doğruluk ve gecikme ölçümü")
+    data = parser.add_mutually_exclusive_group(required=True)
+    data.add_argument("--dir", help="Etiketli PNG klasörü (<a>+<b>_<id>.png)")
+    data.add_argument("--store", help="collect_data.py deposu")
+    parser.add_argument("--sources", default="human,confirmed,corrected,import",
+                        help=f"Depodan alınacak etiket kaynakları (Seçenekler: {', '.join(SOURCES)})")
+    parser.add_argument("--backends", default="numpy",
+                        help=f"Virgüllü: {', '.join(CaptchaSolver.BACKENDS[1:])} (İlki diğerlerine referans olur)")
+    parser.add_argument("--batch-sizes", default="1,8,32", help="Gecikme ölçülecek batch boyutları")
+    parser.add_argument("--repeat", type=int, default=3, help="Gecikme ölçümünde veri setinin tekrar sayısı")
+    parser.add_argument("--limit", type=int, help="En fazla bu kadar captcha kullan")
+    parser.add_argument("--min-accuracy", type=float, help="Cevap doğruluğu bunun altındaysa çıkış kodu 1")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    if args.dir:
+        samples, skipped = load_dir(args.dir)
+    else:
+        samples, skipped = load_store(args.store, tuple(s.strip() for s in args.sources.split(",")))
+    samples = samples[:args.limit] if args.limit else samples
+    if not samples:
+        print("Hata: Etiketli captcha bulunamadı!")
+        sys.exit(1)
+    print(f"{len(samples)} etiketli captcha ({skipped} atlandı)")
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    results = []
+    reference = None
+    for backend in (b.strip() for b in args.backends.split(",")):
+        result, predictions = evaluate_backend(backend, samples, batch_sizes, args.repeat)
+        if reference is None and predictions:
+            reference = (backend, predictions)
+        elif reference is not None and predictions:
+            result["agreement"] = {"reference": reference[0], **agreement(predictions, reference[1])}
+        print_report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": _git_commit(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "dataset": {"path": args.dir or args.store, "captchas": len(samples), "skipped": skipped},
+                "min_confidence": AI_MIN_CONFIDENCE,
+                "results": results
+            }, f, indent=2)
+        print(f"\nSonuçlar yazıldı: {args.json}")
+
+    if args.min_accuracy is not None:
+        failed = [r["backend"] for r in results
+                  if r.get("accuracy", {}).get("answer_accuracy", 0.0) < args.min_accuracy]
+        if failed:
+            print(f"DOĞRULUK EŞİĞİN ALTINDA ({args.min_accuracy:.2%}): {', '.join(failed)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
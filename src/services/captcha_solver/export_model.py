@@ -0,0 +1,171 @@
+import sys
+import os
+import json
+import time
+import argparse
+import subprocess
+
+# Proje kök dizinini path'e ekle (src/services/captcha_solver -> proje kökü)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+
+from src.services.captcha_solver.captcha_solver import CaptchaSolver
+
+
+def _max_rss_mb() -> float:
+    """Sürecin tepe bellek kullanımı (MB)."""
+    # Linux: VmHWM exec sonrası sıfırlanır (ru_maxrss ebeveynin değerini miras alabilir)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return float("nan") # Windows'ta resource modülü yok
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döner
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def export(npz_path: str):
+    """.h5 modeli yükler, ağırlıkları .npz olarak yazar ve Keras modelini döner."""
+    import tensorflow as tf
+    from src.services.captcha_solver.numpy_backend import export_weights
+
+    model = tf.keras.models.load_model(CaptchaSolver.MODEL_PATH, compile=False)
+    export_weights(model, npz_path)
+    size_kb = os.path.getsize(npz_path) / 1024
+    print(f"[INFO] Ağırlıklar yazıldı: {npz_path} ({size_kb:.1f} KB)")
+    return model
+
+
+def check_parity(keras_model, npz_path: str, samples: int = 256, tolerance: float = 1e-4) -> bool:
+    """Aynı girdide Keras ve NumPy çıktılarını karşılaştırır."""
+    from src.services.captcha_solver.numpy_backend import NumpyDigitModel
+
+    rng = np.random.default_rng(123)
+    batch = rng.random((samples, 32, 32, 1), dtype=np.float32)
+    expected = keras_model.predict(batch, verbose=0)
+    actual = NumpyDigitModel(npz_path).predict(batch)
+
+    max_diff = float(np.abs(expected - actual).max())
+    same_argmax = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    ok = max_diff <= tolerance and same_argmax == 1.0
+    status = "OK" if ok else "UYUMSUZ"
+    print(f"[PARITE] {status} - max |fark|: {max_diff:.2e}, aynı tahmin oranı: {same_argmax:.2%}")
+    return ok
+
+
+def quantized_path(npz_path: str, mode: str) -> str:
+    """<kök>.npz -> <kök>.<mode>.npz (Varsayılan .npz için CaptchaSolver.QUANTIZED_PATHS ile aynı)."""
+    stem, _ = os.path.splitext(npz_path)
+    return f"{stem}.{mode}.npz"
+
+
+def quantize(npz_path: str, mode: str, samples: int = 256) -> bool:
+    """float32 .npz'den quantize edilmiş dosyayı (npz_path'in yanına) üretir ve aynı girdide float32
+    motorla karşılaştırır. Rakam tahminleri aynı kalmalı; olasılık farkı bilgi amaçlı yazılır."""
+    from src.services.captcha_solver.numpy_backend import NumpyDigitModel, quantize_weights
+
+    out_path = quantized_path(npz_path, mode)
+    quantize_weights(npz_path, out_path, mode)
+    size_kb = os.path.getsize(out_path) / 1024
+    print(f"[INFO] {mode} ağırlıklar yazıldı: {out_path} ({size_kb:.1f} KB)")
+
+    batch = np.random.default_rng(123).random((samples, 32, 32, 1), dtype=np.float32)
+    expected = NumpyDigitModel(npz_path).predict(batch)
+    actual = NumpyDigitModel(out_path).predict(batch)
+    max_diff = float(np.abs(expected - actual).max())
+    same_argmax = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    print(f"[PARITE] {mode} - max |fark|: {max_diff:.2e}, aynı tahmin oranı: {same_argmax:.2%} "
+          f"(Etiketli veride doğruluk: evaluate.py --backends numpy,{mode})")
+    return same_argmax >= 0.99
+
+
+def bench_backend(backend: str, model_path: str = None, repeats: int = 200) -> dict:
+    """Tek bir backend'in import+yükleme süresini, 3'lük batch gecikmesini ve belleğini ölçer.
+    Ölçümler birbirini etkilemesin diye compare() her backend'i ayrı süreçte çalıştırır."""
+    started = time.perf_counter()
+    solver = CaptchaSolver(backend=backend, model_path=model_path)
+    load_ms = (time.perf_counter() - started) * 1000
+    if not solver.model:
+        return {"backend": backend, "error": "model yüklenemedi"}
+
+    batch = np.random.default_rng(0).random((3, 32, 32, 1), dtype=np.float32)
+    solver.model.predict(batch, verbose=0) # İlk çağrı (graph kurulumu) ölçüme girmesin
+
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        solver.model.predict(batch, verbose=0)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "backend": backend,
+        "size_kb": round(os.path.getsize(solver.model_path) / 1024, 1),
+        "load_ms": round(load_ms, 1),
+        "predict_p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "predict_p95_ms": round(float(np.percentile(timings, 95)), 3),
+        "max_rss_mb": round(_max_rss_mb(), 1)
+    }
+
+
+def compare(npz_path: str):
+    print(f"\n{'Backend':<8} {'Boyut (KB)':>11} {'Yükleme (ms)':>13} {'p50 (ms)':>9} {'p95 (ms)':>9} {'RSS (MB)':>9}")
+    candidates = [("keras", CaptchaSolver.MODEL_PATH), ("numpy", npz_path)]
+    candidates += [(mode, quantized_path(npz_path, mode)) for mode in CaptchaSolver.QUANTIZED_PATHS
+                   if os.path.exists(quantized_path(npz_path, mode))]
+    for backend, path in candidates:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--bench-backend", backend, "--out", path],
+            capture_output=True, text=True
+        )
+        try:
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            print(f"{backend:<8} ölçülemedi: {out.stderr.strip()[-200:]}")
+            continue
+        if "error" in result:
+            print(f"{backend:<8} {result['error']}")
+            continue
+        print(f"{backend:<8} {result['size_kb']:>11} {result['load_ms']:>13} {result['predict_p50_ms']:>9} "
+              f"{result['predict_p95_ms']:>9} {result['max_rss_mb']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="digit_model.h5 -> digit_model.npz (TensorFlow'suz inference için)")
+    parser.add_argument("--out", default=CaptchaSolver.NPZ_PATH, help="Çıktı .npz yolu")
+    parser.add_argument("--compare", action="store_true", help="Keras ve NumPy backend'lerinin gecikme/bellek karşılaştırması")
+    parser.add_argument("--quantize", metavar="BİÇİMLER",
+                        help="Virgüllü: float16, int8 - .npz'den küçük ağırlık dosyaları üret "
+                             "(--out'un yanına: <kök>.<biçim>.npz, TensorFlow gerekmez)")
+    parser.add_argument("--skip-export", action="store_true",
+                        help=".h5'ten dışa aktarmayı atla, mevcut .npz'yi kullan (TensorFlow gerekmez)")
+    parser.add_argument("--bench-backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.bench_backend:
+        print(json.dumps(bench_backend(args.bench_backend, args.out)))
+        return
+
+    ok = True
+    if not args.skip_export:
+        model = export(args.out)
+        ok = check_parity(model, args.out)
+    for mode in (m.strip() for m in (args.quantize or "").split(",") if m.strip()):
+        ok = quantize(args.out, mode) and ok
+    if args.compare:
+        compare(args.out)
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
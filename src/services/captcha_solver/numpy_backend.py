@@ -0,0 +1,149 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Tuple
+
+# Keras katman sınıfı -> .npz içindeki katman türü
+SUPPORTED_LAYERS = ("Conv2D", "MaxPooling2D", "Flatten", "Dense")
+# Ağırlık saklama biçimleri (Hesaplama her durumda float32 yapılır)
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+
+def export_weights(model, path: str):
+    """Keras Sequential rakam modelinin ağırlıklarını NumPy motorunun okuyacağı .npz dosyasına yazar.
+    Mimari, 'arch' dizisinde 'tür:parametre' stringleri olarak saklanır (Örn: conv2d:relu, maxpool:2)."""
+    arch = []
+    arrays = {}
+    for i, layer in enumerate(model.layers):
+        kind = layer.__class__.__name__
+        if kind not in SUPPORTED_LAYERS:
+            raise ValueError(f"Desteklenmeyen katman: {kind} ({layer.name})")
+
+        if kind == "Conv2D":
+            if layer.padding != "valid" or tuple(layer.strides) != (1, 1):
+                raise ValueError(f"Sadece stride=1, padding='valid' Conv2D destekleniyor ({layer.name})")
+            arch.append(f"conv2d:{layer.activation.__name__}")
+        elif kind == "MaxPooling2D":
+            if tuple(layer.pool_size) != tuple(layer.strides):
+                raise ValueError(f"pool_size ve strides eşit olmalı ({layer.name})")
+            arch.append(f"maxpool:{layer.pool_size[0]}")
+        elif kind == "Flatten":
+            arch.append("flatten:")
+        else:
+            arch.append(f"dense:{layer.activation.__name__}")
+
+        if kind in ("Conv2D", "Dense"):
+            kernel, bias = layer.get_weights()
+            arrays[f"w{i}"] = kernel.astype(np.float32)
+            arrays[f"b{i}"] = bias.astype(np.float32)
+
+    np.savez_compressed(path, arch=np.array(arch), **arrays)
+
+
+def quantize_weights(src_path: str, dst_path: str, mode: str):
+    """
+    float32 .npz'yi daha küçük bir ağırlık dosyasına çevirir (TensorFlow gerekmez).
+      float16: Ağırlıklar yarım hassasiyet.
+      int8:    Çıkış kanalı başına simetrik ölçek (w ~ q * s, q int8 [-127, 127]); ölçekler s{i}'de.
+    Bias'lar küçük olduğu için float32 kalır. Yükleyici (NumpyDigitModel) ağırlıkları bir kez float32'ye açar.
+    """
+    if mode not in QUANTIZATIONS[1:]:
+        raise ValueError(f"Bilinmeyen quantization: {mode} (Seçenekler: {', '.join(QUANTIZATIONS[1:])})")
+    arrays = {}
+    with np.load(src_path, allow_pickle=False) as data:
+        for key in data.files:
+            arrays[key] = data[key]
+    for key in [k for k in arrays if k.startswith("w")]:
+        weights = arrays[key].astype(np.float32)
+        if mode == "float16":
+            arrays[key] = weights.astype(np.float16)
+            continue
+        # Son eksen çıkış kanalı (Conv2D: kh, kw, cin, cout / Dense: in, out)
+        max_abs = np.abs(weights.reshape(-1, weights.shape[-1])).max(axis=0)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        arrays[key] = np.clip(np.rint(weights / scale), -127, 127).astype(np.int8)
+        arrays["s" + key[1:]] = scale
+    np.savez_compressed(dst_path, quant=np.array(mode), **arrays)
+
+
+def _load_weights(data, i: int) -> np.ndarray:
+    """i. katmanın ağırlıkları float32 olarak (Quantize edilmişse açılır)."""
+    weights = data[f"w{i}"]
+    if weights.dtype == np.int8:
+        return weights.astype(np.float32) * data[f"s{i}"]
+    return weights.astype(np.float32, copy=False)
+
+
+def _activate(x: np.ndarray, name: str) -> np.ndarray:
+    if name == "relu":
+        return np.maximum(x, 0, out=x)
+    if name == "softmax":
+        x = x - x.max(axis=-1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=-1, keepdims=True)
+        return x
+    if name == "linear":
+        return x
+    raise ValueError(f"Desteklenmeyen aktivasyon: {name}")
+
+
+class NumpyDigitModel:
+    """Rakam CNN'inin TensorFlow gerektirmeyen ileri yönlü (inference) motoru.
+    Konvolüsyonlar im2col + tek matris çarpımı olarak vektörize edilir.
+    predict() imzası Keras ile aynıdır, CaptchaSolver backend'i fark etmez."""
+
+    def __init__(self, path: str):
+        self.layers: List[Tuple] = []
+        with np.load(path, allow_pickle=False) as data:
+            # Ağırlıkların dosyadaki biçimi (Eski dosyalarda alan yok: float32)
+            self.quantization = str(data["quant"]) if "quant" in data.files else "float32"
+            for i, spec in enumerate(data["arch"]):
+                kind, _, arg = str(spec).partition(":")
+                if kind == "conv2d":
+                    kernel = _load_weights(data, i)
+                    kh, kw, cin, cout = kernel.shape
+                    # (kh, kw, cin, cout) -> im2col sütun sırası (cin, kh, kw) ile uyumlu matris
+                    matrix = np.ascontiguousarray(kernel.transpose(2, 0, 1, 3).reshape(cin * kh * kw, cout))
+                    self.layers.append(("conv2d", arg, (kh, kw), matrix, data[f"b{i}"]))
+                elif kind == "maxpool":
+                    self.layers.append(("maxpool", int(arg)))
+                elif kind == "flatten":
+                    self.layers.append(("flatten",))
+                elif kind == "dense":
+                    self.layers.append(("dense", arg, _load_weights(data, i), data[f"b{i}"]))
+                else:
+                    raise ValueError(f"Bilinmeyen katman türü: {kind}")
+
+    @staticmethod
+    def _conv2d(x: np.ndarray, size: Tuple[int, int], matrix: np.ndarray, bias: np.ndarray) -> np.ndarray:
+        # (N, H, W, C) -> (N, oh, ow, C, kh, kw) pencereler; reshape burada im2col kopyasını üretir
+        windows = sliding_window_view(x, size, axis=(1, 2))
+        n, oh, ow = windows.shape[:3]
+        cols = windows.reshape(n * oh * ow, -1)
+        out = cols @ matrix
+        out += bias
+        return out.reshape(n, oh, ow, -1)
+
+    @staticmethod
+    def _maxpool(x: np.ndarray, k: int) -> np.ndarray:
+        n, h, w, c = x.shape
+        h2, w2 = h // k, w // k
+        # Keras 'valid' pooling: artık satır/sütunlar atılır
+        x = x[:, :h2 * k, :w2 * k, :]
+        return x.reshape(n, h2, k, w2, k, c).max(axis=(2, 4))
+
+    def predict(self, batch: np.ndarray, verbose: int = 0) -> np.ndarray:
+        """(N, 32, 32, 1) girdiden (N, 10) softmax olasılıkları döner."""
+        x = np.asarray(batch, dtype=np.float32)
+        for layer in self.layers:
+            kind = layer[0]
+            if kind == "conv2d":
+                _, act, size, matrix, bias = layer
+                x = _activate(self._conv2d(x, size, matrix, bias), act)
+            elif kind == "maxpool":
+                x = self._maxpool(x, layer[1])
+            elif kind == "flatten":
+                x = x.reshape(x.shape[0], -1)
+            else:
+                _, act, weights, bias = layer
+                x = _activate(x @ weights + bias, act)
+        return x
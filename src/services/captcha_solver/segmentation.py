@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Referans yerleşim (177x40 captcha'da rakam sütunları: xx + x). Model bu genişlikteki kesimlerle eğitildi;
+# kesim genişlikleri korunur, sadece yerleri görüntüye göre bulunur.
+TEMPLATE = ((13, 29), (29, 52), (88, 110))
+REFERENCE_WIDTH = 177
+DIGIT_SIZE = 32
+
+MAX_SHIFT = 0.15      # Yerleşim en fazla genişliğin bu oranı kadar kayabilir
+SHIFT_GAIN = 0.05     # En iyi skora bu oran kadar yakın kaydırmalar eşit sayılır
+STAY_SHIFT = 0.015    # Bulunan kayma genişliğin bu oranından küçükse referans yerleşim kullanılır (Standart captcha'da kesim değişmesin)
+REFINE_STEPS = 2      # Ağırlık merkezi ince ayarı tekrar sayısı
+MIN_CONTRAST = 40     # Arka plandan en az bu kadar farklı pikseller mürekkep sayılır
+INK_MIN_ROWS = 0.1    # Bir sütun, yüksekliğin bu oranı kadar mürekkep pikseli varsa dolu sayılır (İnce gürültü çizgileri sayılmaz)
+COVERAGE_FULL = 0.3   # Kutu sütunlarının bu oranı doluysa kutu tam güvenli (İnce '1' rakamı da geçsin)
+MIN_CONFIDENCE = 0.5  # Altındaki kesimler modele gönderilmez
+
+@dataclass(slots=True)
+class Segmentation:
+    """Bir captcha'daki rakam kutuları ve kesimin ne kadar güvenilir olduğu."""
+    boxes: List[Tuple[int, int]]  # Rakam başına [başlangıç, bitiş) sütun aralığı
+    shift: int                    # Referans yerleşime göre yatay kayma (px)
+    coverage: List[float]         # Kutu başına dolu sütun oranı
+    confidence: float             # 0-1: En zayıf kutunun doluluğu (Boş kutu = yanlış kesim)
+
+    @property
+    def ok(self) -> bool:
+        return self.confidence >= MIN_CONFIDENCE
+
+def _template(width: int) -> Tuple[np.ndarray, np.ndarray]:
+    scale = width / REFERENCE_WIDTH
+    starts = np.array([int(round(s * scale)) for s, _ in TEMPLATE])
+    ends = np.array([int(round(e * scale)) for _, e in TEMPLATE])
+    return starts, ends
+
+def _segment_group(images: np.ndarray) -> List[Segmentation]:
+    """Aynı boyuttaki (N, H, W) görüntüleri birlikte (vektörize) keser."""
+    n, h, w = images.shape
+    starts, ends = _template(w)
+    widths = np.maximum(ends - starts, 1)
+
+    # 1. Mürekkep maskesi: Arka plan = kenar piksellerinin medyanı (Açık veya koyu zemin fark etmez)
+    pixels = images.astype(np.int16)
+    border = np.concatenate([pixels[:, 0, :], pixels[:, -1, :], pixels[:, :, 0], pixels[:, :, -1]], axis=1)
+    background = np.median(border, axis=1)
+    diff = np.abs(pixels - background[:, None, None])
+    threshold = np.maximum(MIN_CONTRAST, 0.5 * np.percentile(diff.reshape(n, -1), 99, axis=1))
+    profile = (diff > threshold[:, None, None]).sum(axis=1) # Sütun başına mürekkep (N, W)
+    inked = profile >= max(1, int(round(INK_MIN_ROWS * h)))
+
+    # 2. Tüm kaydırmalar için kutulardaki toplam mürekkep (Kümülatif toplamla, döngüsüz)
+    max_shift = int(round(MAX_SHIFT * w))
+    shifts = np.arange(-max_shift, max_shift + 1)
+    shifts = shifts[(starts.min() + shifts >= 0) & (ends.max() + shifts <= w)]
+    if not (shifts == 0).any():
+        # Görüntü referans yerleşimi taşıyamayacak kadar küçük
+        return [Segmentation([(int(s), int(e)) for s, e in zip(starts, ends)], 0, [0.0] * len(TEMPLATE), 0.0)
+                for _ in range(n)]
+    cumulative = np.zeros((n, w + 1))
+    cumulative[:, 1:] = np.cumsum(profile, axis=1)
+    scores = (cumulative[:, ends[None, :] + shifts[:, None]] -
+              cumulative[:, starts[None, :] + shifts[:, None]]).sum(axis=2) # (N, kaydırma)
+
+    # Kutular rakamlardan geniş olduğundan en iyi skor bir düzlüktür: Düzlüğün ortası seçilir.
+    # Orta, sıfıra yakınsa yerleşim standarttır; kesim değişmez.
+    best = scores.argmax(axis=1)
+    near = scores >= scores[np.arange(n), best][:, None] * (1 - SHIFT_GAIN)
+    idx = np.arange(len(shifts))[None, :]
+    left = np.where(~near & (idx < best[:, None]), idx, -1).max(axis=1) + 1
+    right = np.where(~near & (idx > best[:, None]), idx, len(shifts)).min(axis=1) - 1
+    dx = shifts[(left + right) // 2]
+
+    # İnce ayar: Kutulardaki mürekkebin ağırlık merkezi kutu ortalarına getirilir (Düzlük ortası kaba kalır)
+    columns = np.arange(w)
+    weighted = np.zeros((n, w + 1))
+    weighted[:, 1:] = np.cumsum(profile * columns, axis=1)
+    centers = (starts + ends - 1) / 2
+    for _ in range(REFINE_STEPS):
+        lo = np.clip(starts[None, :] + dx[:, None], 0, w)
+        hi = np.clip(ends[None, :] + dx[:, None], 0, w)
+        mass = np.take_along_axis(cumulative, hi, axis=1) - np.take_along_axis(cumulative, lo, axis=1)
+        moment = np.take_along_axis(weighted, hi, axis=1) - np.take_along_axis(weighted, lo, axis=1)
+        offset = np.where(mass > 0, moment / np.maximum(mass, 1) - (centers[None, :] + dx[:, None]), 0.0)
+        dx = np.clip(dx + np.round(offset.mean(axis=1)).astype(int), shifts[0], shifts[-1])
+    dx[np.abs(dx) <= STAY_SHIFT * w] = 0
+
+    # 3. Güven: Her kutuda mürekkepli sütun oranı (Kayan/boş/bozuk görüntüde bir kutu boş kalır)
+    cumulative_ink = np.zeros((n, w + 1))
+    cumulative_ink[:, 1:] = np.cumsum(inked, axis=1)
+    box_starts = starts[None, :] + dx[:, None]
+    box_ends = ends[None, :] + dx[:, None]
+    coverage = (np.take_along_axis(cumulative_ink, box_ends, axis=1) -
+                np.take_along_axis(cumulative_ink, box_starts, axis=1)) / widths
+    confidence = np.clip(coverage.min(axis=1) / COVERAGE_FULL, 0.0, 1.0)
+
+    return [Segmentation(boxes=[(int(s), int(e)) for s, e in zip(box_starts[i], box_ends[i])],
+                         shift=int(dx[i]),
+                         coverage=[float(c) for c in coverage[i]],
+                         confidence=float(confidence[i]))
+            for i in range(n)]
+
+def segment_many(images: Sequence[np.ndarray]) -> List[Segmentation]:
+    """Gri görüntülerin rakam kutuları. Aynı boyuttakiler tek seferde işlenir."""
+    results: List[Optional[Segmentation]] = [None] * len(images)
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for idx, image in enumerate(images):
+        groups.setdefault(image.shape, []).append(idx)
+    for indices in groups.values():
+        for idx, seg in zip(indices, _segment_group(np.stack([images[i] for i in indices]))):
+            results[idx] = seg
+    return results
+
+def segment(image: np.ndarray) -> Segmentation:
+    return segment_many([image])[0]
+
+def crop_digits(image: np.ndarray, boxes: Sequence[Tuple[int, int]]) -> Optional[np.ndarray]:
+    """Kutuları tam yükseklikte keser, yatayda siyahla kareye tamamlar, 32x32'ye küçültür: (3, 32, 32) uint8.
+    Eğitim verisi ve inference aynı kesimi kullanır."""
+    digits = []
+    for start, end in boxes:
+        roi = image[:, start:end]
+        h, w = roi.shape
+        if w == 0 or h == 0:
+            return None
+        pad = max(0, (h - w) // 2)
+        padded = cv2.copyMakeBorder(roi, 0, 0, pad, pad, cv2.BORDER_CONSTANT, value=0)
+        digits.append(cv2.resize(padded, (DIGIT_SIZE, DIGIT_SIZE)))
+    return np.stack(digits)
@@ -1,47 +1,102 @@
+"""
+Rakam modelini eğitir.
+
+Veri, collect_data.py'nin paketlenmiş deposundan (DatasetStore, belleğe eşlenen .npy) tek seferde
+okunur; PNG'ler her epoch'ta tekrar decode edilmez. Eğitim hattı: bellekteki diziler -> karıştırma ->
+batch -> paralel normalize + veri artırma (Kaydırma / yakınlaştırma / kontrast) -> prefetch.
+Her epoch için saniyede işlenen örnek sayısı raporlanır.
+
+Eğitilen model CaptchaSolver'ın okuduğu yere (.h5) yazılır ve NumPy motoru için .npz olarak da
+dışa aktarılır; float16/int8 ağırlıklar da yanında yeniden üretilir (export_model.py'yi ayrıca
+çalıştırmak gerekmez).
+
+  python src/services/captcha_solver/train_digit_model.py --epochs 35
+  python src/services/captcha_solver/train_digit_model.py --sources human,confirmed,corrected
+"""
+import sys
+import os
+import glob
+import time
+import argparse
+from typing import List, Optional, Tuple
+
+# Proje kök dizinini path'e ekle (src/services/captcha_solver -> proje kökü)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, models
-import os
 
-DATASET_DIR = "dataset_digits"
-MODEL_PATH = "src/services/digit_model.h5"
+from src.services.captcha_solver.captcha_solver import CaptchaSolver
+from src.services.captcha_solver.dataset_store import DatasetStore, SOURCES, label_digits
+
+STORE_DIR = os.path.join(project_root, "dataset_store")
+LEGACY_DIGITS_DIR = os.path.join(project_root, "dataset_digits") # Eski format: dataset_digits/<rakam>/*.png
+MODEL_PATH = CaptchaSolver.MODEL_PATH # Solver'ın yüklediği dosya
+NPZ_PATH = CaptchaSolver.NPZ_PATH
 IMG_SIZE = (32, 32)
-BATCH_SIZE = 16
+BATCH_SIZE = 128
 EPOCHS = 35
+PATIENCE = 5 # val_loss bu kadar epoch iyileşmezse dur (En iyi ağırlıklar geri yüklenir)
+VALIDATION_SPLIT = 0.2
+SEED = 123
 
-def main():
-    if not os.path.exists(DATASET_DIR):
-        print("Hata: Dataset digits klasörü yok!")
-        return
+def resegment(store_dir: str = STORE_DIR, sources: Optional[Tuple[str, ...]] = None
+              ) -> Tuple[np.ndarray, np.ndarray]:
+    """Depodaki ham görüntüleri güncel kesimle (CaptchaSolver.slice_digits) yeniden keser.
+    Kesim değiştiyse eğitim verisi inference ile aynı kutulardan gelsin; kesimi reddedilenler atlanır."""
+    xs, ys = [], []
+    for sample in DatasetStore(store_dir).iter_samples():
+        digits = label_digits(sample.label)
+        if digits is None or (sources is not None and sample.source not in sources):
+            continue
+        crops = CaptchaSolver.slice_digits(np.ascontiguousarray(sample.image))
+        if crops is None:
+            continue
+        xs.append(crops)
+        ys.extend(digits)
+    if not xs:
+        return np.zeros((0,) + IMG_SIZE, dtype=np.uint8), np.zeros(0, dtype=np.uint8)
+    return np.concatenate(xs), np.array(ys, dtype=np.uint8)
+
+def load_digits(store_dir: str = STORE_DIR, legacy_dir: str = LEGACY_DIGITS_DIR,
+                sources: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Tüm etiketli rakamlar: X (N, 32, 32) uint8, y (N,) uint8. Depo yoksa eski PNG klasörü (bir kez decode edilir)."""
+    if os.path.exists(os.path.join(store_dir, DatasetStore.INDEX_FILE)):
+        return DatasetStore(store_dir).digit_arrays(sources)
+    if not os.path.isdir(legacy_dir):
+        return None
+
+    import cv2
+    print(f"[UYARI] Depo yok, eski PNG klasörü okunuyor: {legacy_dir} "
+          f"(Hızlı yükleme için: collect_data.py --import-png dataset/)")
+    xs, ys = [], []
+    for digit in range(10):
+        for path in sorted(glob.glob(os.path.join(legacy_dir, str(digit), "*.png"))):
+            image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                continue
+            if image.shape != IMG_SIZE:
+                image = cv2.resize(image, IMG_SIZE)
+            xs.append(image)
+            ys.append(digit)
+    if not xs:
+        return None
+    return np.stack(xs), np.array(ys, dtype=np.uint8)
+
+def split(x: np.ndarray, y: np.ndarray, validation: float = VALIDATION_SPLIT, seed: int = SEED):
+    """Sabit tohumla karıştırıp (eğitim, doğrulama) olarak ayırır."""
+    order = np.random.default_rng(seed).permutation(len(x))
+    n_val = int(len(x) * validation)
+    val, train = order[:n_val], order[n_val:]
+    return (x[train], y[train]), (x[val], y[val])
 
-    # Keras'ın built-in loader'ı ile klasörden yükle
-    # dataset_digits/0/*.png -> class 0
-    train_ds = tf.keras.preprocessing.image_dataset_from_directory(
-        DATASET_DIR,
-        validation_split=0.2,
-        subset="training",
-        seed=123,
-        image_size=IMG_SIZE,
-        batch_size=BATCH_SIZE,
-        color_mode='grayscale'
-    )
-
-    val_ds = tf.keras.preprocessing.image_dataset_from_directory(
-        DATASET_DIR,
-        validation_split=0.2,
-        subset="validation",
-        seed=123,
-        image_size=IMG_SIZE,
-        batch_size=BATCH_SIZE,
-        color_mode='grayscale'
-    )
-
-    # Normalize et (0-255 -> 0-1)
-    normalization_layer = layers.Rescaling(1./255)
-    train_ds = train_ds.map(lambda x, y: (normalization_layer(x), y))
-    val_ds = val_ds.map(lambda x, y: (normalization_layer(x), y))
-
-    # Model
-    model = models.Sequential([
+def build_model() -> tf.keras.Model:
+    # Mimari numpy_backend'in desteklediği katmanlarla sınırlı (Normalize modelin dışında yapılır)
+    return models.Sequential([
         layers.Input(shape=(32, 32, 1)),
         layers.Conv2D(32, 3, activation='relu'),
         layers.MaxPooling2D(),
@@ -52,21 +107,130 @@ def main():
         layers.Dense(10, activation='softmax')
     ])
 
+def build_augmenter(seed: int = SEED) -> tf.keras.Sequential:
+    """Sadece eğitimde: Kesimdeki küçük kaymaları ve boyut/kontrast farklarını taklit eder. Kenarlar siyah doldurulur."""
+    return tf.keras.Sequential([
+        layers.RandomTranslation(0.08, 0.08, fill_mode="constant", seed=seed),
+        layers.RandomZoom(0.1, fill_mode="constant", seed=seed),
+        # Batch'ler zaten [0, 1]'e ölçekli (make_dataset), kontrast çıktısı bu aralıkta kırpılmalı
+        layers.RandomContrast(0.2, value_range=(0, 1), seed=seed)
+    ])
+
+def make_dataset(x: np.ndarray, y: np.ndarray, batch_size: int = BATCH_SIZE,
+                 training: bool = False, augment: bool = True) -> tf.data.Dataset:
+    """uint8 dizilerden tf.data hattı. Normalize ve veri artırma batch üzerinde, paralel çalışır."""
+    ds = tf.data.Dataset.from_tensor_slices((x[..., np.newaxis], y))
+    if training:
+        ds = ds.shuffle(len(x), seed=SEED, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda images, labels: (tf.cast(images, tf.float32) / 255.0, labels),
+                num_parallel_calls=tf.data.AUTOTUNE)
+    if training and augment:
+        augmenter = build_augmenter()
+        ds = ds.map(lambda images, labels: (augmenter(images, training=True), labels),
+                    num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    """Her epoch'un süresini ve saniyede işlenen eğitim örneği sayısını kaydeder/yazar."""
+
+    def __init__(self, samples: int, verbose: bool = True):
+        super().__init__()
+        self.samples = samples
+        self.verbose = verbose
+        self.epochs: List[Tuple[float, float]] = [] # (süre sn, örnek/sn)
+        self._started = 0.0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._started = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._started
+        self.epochs.append((elapsed, self.samples / elapsed))
+        if self.verbose:
+            accuracy = (logs or {}).get("val_accuracy")
+            extra = f", val_accuracy {accuracy:.4f}" if accuracy is not None else ""
+            print(f"[EPOCH {epoch + 1}] {elapsed:.2f} sn, {self.samples / elapsed:,.0f} örnek/sn{extra}")
+
+def train(x: np.ndarray, y: np.ndarray, epochs: int = EPOCHS, batch_size: int = BATCH_SIZE,
+          augment: bool = True, verbose: bool = True, patience: int = 0,
+          initial_model: Optional[str] = None):
+    """
+    Modeli eğitir. (model, keras History, ThroughputCallback) döner.
+    patience > 0 ise erken durdurma; initial_model verilirse o modelin ağırlıklarından devam edilir
+    (Yeni etiketleme oturumundan sonra sıfırdan eğitmek yerine birkaç epoch ince ayar).
+    """
+    tf.keras.utils.set_random_seed(SEED)
+    (x_train, y_train), (x_val, y_val) = split(x, y)
+    train_ds = make_dataset(x_train, y_train, batch_size, training=True, augment=augment)
+    val_ds = make_dataset(x_val, y_val, batch_size) if len(x_val) else None
+
+    model = build_model()
+    if initial_model:
+        model.load_weights(initial_model)
     model.compile(optimizer='adam',
                   loss=tf.keras.losses.SparseCategoricalCrossentropy(),
                   metrics=['accuracy'])
+    if verbose:
+        model.summary()
+
+    throughput = ThroughputCallback(len(x_train), verbose)
+    callbacks = [throughput]
+    if patience > 0 and val_ds is not None:
+        callbacks.append(tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=patience,
+                                                          restore_best_weights=True))
+    history = model.fit(train_ds, validation_data=val_ds, epochs=epochs,
+                        callbacks=callbacks, verbose=0)
+    return model, history, throughput
+
+def main():
+    parser = argparse.ArgumentParser(description="Captcha rakam modelini eğit")
+    parser.add_argument("--store", default=STORE_DIR, help="collect_data.py deposu")
+    parser.add_argument("--legacy-dir", default=LEGACY_DIGITS_DIR, help="Depo yoksa okunacak eski PNG klasörü")
+    parser.add_argument("--sources", help=f"Sadece bu kaynaklardan gelen örnekler (Virgüllü: {', '.join(SOURCES)})")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--patience", type=int, default=PATIENCE, help="Erken durdurma sabrı (0: kapalı)")
+    parser.add_argument("--resume", action="store_true", help="Mevcut modelin (--out) ağırlıklarından devam et")
+    parser.add_argument("--no-augment", action="store_true", help="Veri artırmayı kapat")
+    parser.add_argument("--resegment", action="store_true",
+                        help="Rakamları depodaki ham görüntülerden güncel kesimle yeniden kes (Kayıtlı kesimler yerine)")
+    parser.add_argument("--out", default=MODEL_PATH, help="Kaydedilecek .h5 dosyası")
+    parser.add_argument("--npz-out", default=NPZ_PATH, help="NumPy motoru için .npz (Boş: dışa aktarma)")
+    args = parser.parse_args()
 
-    model.summary()
+    sources = tuple(s.strip() for s in args.sources.split(",")) if args.sources else None
+    if args.resegment:
+        data = resegment(args.store, sources)
+    else:
+        data = load_digits(args.store, args.legacy_dir, sources)
+    if data is None or not len(data[0]):
+        print("Hata: Eğitim verisi yok! (Önce collect_data.py ile veri toplayın)")
+        return
+    x, y = data
+    print(f"{len(x)} rakam yüklendi (Sınıf dağılımı: {np.bincount(y, minlength=10).tolist()})")
 
     print("Model eğitiliyor...")
-    model.fit(
-        train_ds,
-        validation_data=val_ds,
-        epochs=EPOCHS
-    )
-
-    model.save(MODEL_PATH)
-    print(f"Model kaydedildi: {MODEL_PATH}")
+    started = time.perf_counter()
+    initial_model = args.out if args.resume and os.path.exists(args.out) else None
+    model, history, throughput = train(x, y, args.epochs, args.batch_size, augment=not args.no_augment,
+                                       patience=args.patience, initial_model=initial_model)
+    elapsed = time.perf_counter() - started
+    # İlk epoch graph kurulumunu içerir, ortalamaya katılmaz
+    steady = [rate for _, rate in throughput.epochs[1:]] or [throughput.epochs[0][1]]
+    print(f"Eğitim: {len(throughput.epochs)} epoch, {elapsed:.1f} sn, ortalama {np.mean(steady):,.0f} örnek/sn")
+
+    model.save(args.out)
+    print(f"Model kaydedildi: {args.out}")
+    if args.npz_out:
+        from src.services.captcha_solver.numpy_backend import export_weights
+        export_weights(model, args.npz_out)
+        print(f"NumPy ağırlıkları kaydedildi: {args.npz_out}")
+        # float16/int8 dosyaları da yenilenir (Yoksa OBS_CAPTCHA_BACKEND=int8 sessizce eski ağırlıkları kullanır)
+        from src.services.captcha_solver.export_model import quantize
+        for mode in CaptchaSolver.QUANTIZED_PATHS:
+            if not quantize(args.npz_out, mode):
+                print(f"[UYARI] {mode} ağırlıkların tahminleri float32'den farklı (evaluate.py ile kontrol edin)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+from src.models import CourseGrade, ExamStats
+
+def _user_cache_path(app_dir: str, dirname: str, username: str, suffix: str) -> str:
+    cache_dir = os.path.join(app_dir, dirname)
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    safe_name = re.sub(r"[^\w.-]", "_", username)
+    return os.path.join(cache_dir, f"{safe_name}_{suffix}.json")
+
+def _write_json_atomic(path: str, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _read_versioned(path: Optional[str], version: int) -> Dict:
+    """{"version": ..., "terms": {...}} dosyasını okur. Yoksa, bozuksa veya sürümü farklıysa boş döner."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except:
+        return {}
+    if not isinstance(data, dict) or data.get("version") != version:
+        return {}
+    return data.get("terms", {})
+
+class GradeCache:
+    """
+    Ders satırlarının parmak izini (kod + ham sınav metni + harf notu) ve o satır için çekilen
+    sınıf ortalamalarını dönem bazında saklar. Satır değişmediyse ortalamalar buradan alınır,
+    istatistik sayfası için AJAX postback + GET atılmaz.
+    path verilmezse sadece bellekte tutulur (Örn: izleme modu).
+    """
+
+    DIRNAME = "cache"
+    # Dosya biçimi sürümü: Eski sürümler başarısız isteklerin '?' ortalamalarını da yazıyordu, okunmaz
+    VERSION = 2
+    # Her önbellek isabeti, atlanan istek sayısı (Postback + Ders_Istatistik GET)
+    REQUESTS_PER_LOOKUP = 2
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._terms: Dict[str, Dict[str, Dict]] = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_user(cls, app_dir: str, username: str) -> "GradeCache":
+        """Kullanıcının uygulama klasöründeki kalıcı önbelleği."""
+        return cls(_user_cache_path(app_dir, cls.DIRNAME, username, "grades"))
+
+    def _load(self) -> Dict[str, Dict[str, Dict]]:
+        return _read_versioned(self.path, self.VERSION)
+
+    @staticmethod
+    def fingerprint(code: str, raw_text: str, letter_grade: str) -> str:
+        return hashlib.sha1(f"{code}\x1f{raw_text}\x1f{letter_grade}".encode("utf-8")).hexdigest()
+
+    def lookup(self, term: str, code: str, fingerprint: str, scores: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Satır değişmemişse kayıtlı ortalamaları döner (scores: Satırdaki notlar, {"Vize": "80", ...}).
+        Notu olmayan sınavın '?' ortalaması saklanmış haliyle kullanılır (Örn: Yapılmamış bütünleme);
+        notu girilmiş bir sınavın ortalaması '?' ise henüz yayınlanmamış olabilir, tekrar çekilir."""
+        with self._lock:
+            entry = self._terms.get(term, {}).get(code)
+            if (entry and entry["fingerprint"] == fingerprint and
+                    not any(ExamStats(scores.get(exam, "-"), avg).average_missing
+                            for exam, avg in entry["averages"].items())):
+                self.hits += 1
+                return dict(entry["averages"])
+            self.misses += 1
+            return None
+
+    def store(self, term: str, code: str, fingerprint: str, averages: Dict[str, str]):
+        with self._lock:
+            self._terms.setdefault(term, {})[code] = {"fingerprint": fingerprint, "averages": dict(averages)}
+
+    def save(self):
+        """Önbelleği diske yazar (Bellek modunda bir şey yapmaz)."""
+        if not self.path:
+            return
+        # Dönemler paralel çekilirken aynı anda kaydedilebilir: yazma da kilit altında
+        with self._lock:
+            _write_json_atomic(self.path, {"version": self.VERSION, "terms": self._terms})
+
+    @property
+    def requests_saved(self) -> int:
+        return self.hits * self.REQUESTS_PER_LOOKUP
+
+
+class TermArchive:
+    """
+    Kesinleşmiş (tüm derslerin harf notu belli ve istatistikleri eksiksiz çekilmiş) dönemlerin kalıcı arşivi.
+    Bir dönem buraya girdikten sonra bir daha sunucudan istenmez.
+    """
+
+    DIRNAME = GradeCache.DIRNAME
+    # Eski sürümler istatistik istekleri başarısız olan dönemleri de arşivliyordu, okunmaz
+    VERSION = 2
+    # Harf notu henüz girilmemiş sayılan değerler
+    PENDING_LETTERS = ("", "-", "--")
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._terms: Dict[str, List[Dict]] = self._load()
+
+    @classmethod
+    def for_user(cls, app_dir: str, username: str) -> "TermArchive":
+        return cls(_user_cache_path(app_dir, cls.DIRNAME, username, "terms"))
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        return _read_versioned(self.path, self.VERSION)
+
+    @classmethod
+    def is_finalized(cls, grades: List[CourseGrade]) -> bool:
+        """Tüm harf notları girilmiş ve notu olan her sınavın ortalaması biliniyor."""
+        return bool(grades) and all(g.letter_grade not in cls.PENDING_LETTERS and g.averages_complete
+                                    for g in grades)
+
+    def get(self, term: str) -> Optional[List[CourseGrade]]:
+        with self._lock:
+            data = self._terms.get(term)
+        if data is None:
+            return None
+        return [CourseGrade.from_dict(d) for d in data]
+
+    def put(self, term: str, grades: List[CourseGrade]):
+        with self._lock:
+            self._terms[term] = [g.to_dict() for g in grades]
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            _write_json_atomic(self.path, {"version": self.VERSION, "terms": self._terms})
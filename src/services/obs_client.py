@@ -1,37 +1,90 @@
 import requests
 from bs4 import BeautifulSoup
 import re
-import os
-import shutil
-from typing import List, Callable, Dict, Optional
-from src.models import CourseGrade, ExamStats
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Callable, Dict, Iterator, Optional, Tuple
+from src.models import CourseGrade, ExamStats, GradeUpdate
+from src.services.grade_cache import GradeCache, TermArchive
+from src.services import profiler
+from src.services.transport import TransportConfig
+from src.services.page_parser import get_parser
+from src.services.postback import PostbackContext
+
+class SessionExpiredError(Exception):
+    """Oturum düştü (İstek login.aspx'e yönlendi). Yeniden giriş gerekir."""
+
+# captcha_callback bunu dönerse giriş POST atılmadan (Kalan denemeler de dahil) iptal edilir.
+# Örn: Model yok/bozuk; boş veya tahmini bir kod göndermek hesabı kilitleyebilir.
+CAPTCHA_ABORT = object()
+
+class _LoginAborted(Exception):
+    pass
 
 class OBSClient:
     # --- URL SABİTLERİ ---
+    HOST = "https://obs.ozal.edu.tr"
     BASE_URL = "https://obs.ozal.edu.tr/oibs/std/"
     LOGIN_URL = "https://obs.ozal.edu.tr/oibs/std/login.aspx"
     GRADES_URL = "https://obs.ozal.edu.tr/oibs/std/not_listesi_op.aspx"
     STATS_BASE_URL = "https://obs.ozal.edu.tr" # İstatistikler genelde /oibs/acd/ altında çıkıyor
 
-    def __init__(self):
+    # Aynı anda en fazla kaç dersin istatistiği çekilir (Sunucuyu boğmamak için sınırlı)
+    DEFAULT_STATS_WORKERS = 4
+
+    # Başarısız login POST'undan sonra kaç kez otomatik denenir (Toplam deneme sayısı)
+    DEFAULT_LOGIN_ATTEMPTS = 3
+    # Bir deneme içinde, callback pas geçerse en fazla kaç yeni captcha indirilir
+    MAX_CAPTCHA_REFRESHES = 5
+
+    # Transkript çekerken aynı anda kaç dönem işlenir (Her biri kendi içinde stats_workers kullanır)
+    DEFAULT_TERMS_IN_FLIGHT = 2
+
+    # Sayfalardan okunan elementler (Hızlı parser sadece bunları + gizli inputları ağaca çevirir)
+    LOGIN_PAGE_IDS = ("imgCaptchaImg",)
+    GRADES_PAGE_IDS = ("grd_not_listesi", "cmbDonemler")
+    STATS_PAGE_IDS = ("grdIstSnv",)
+
+    def __init__(self, stats_workers: int = DEFAULT_STATS_WORKERS, grade_cache: Optional[GradeCache] = None,
+                 host: Optional[str] = None, transport: Optional[TransportConfig] = None,
+                 parser: str = "fast"):
+        # Farklı bir sunucu (Örn: benchmarks/fake_obs.py yerel sahte OBS) için URL'ler örnek bazında ezilir
+        if host:
+            self.HOST = host.rstrip("/")
+            self.BASE_URL = self.HOST + "/oibs/std/"
+            self.LOGIN_URL = self.BASE_URL + "login.aspx"
+            self.GRADES_URL = self.BASE_URL + "not_listesi_op.aspx"
+            self.STATS_BASE_URL = self.HOST
+        self.stats_workers = max(1, stats_workers)
+        # Değişmeyen ders satırları için ortalama önbelleği (None: her seferinde çek)
+        self.grade_cache = grade_cache
+        # İstek başına hatalar yutulmaz, burada sayılır (Örn: {"stats_timeout": 2})
+        self.failures: Counter = Counter()
+        self._failures_lock = threading.Lock()
+        self.transport = transport or TransportConfig()
+        # HTML parser: "fast" (sadece gerekli bölgeler), "html.parser" / "lxml" (tam ağaç)
+        self.parser = get_parser(parser)
         self.session = requests.Session()
+        # Havuzlu, GET'leri backoff ile tekrar deneyen adapter (Worker kopyaları da bunu paylaşır)
+        self.transport.mount(self.session)
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Referer": self.LOGIN_URL,
-            "Origin": "https://obs.ozal.edu.tr",
+            "Origin": self.HOST,
             "Cache-Control": "no-cache"
         })
+        # --profile açıksa bu oturumun istekleri de ölçülsün (Worker kopyaları hook'ları devralır)
+        active_profiler = profiler.active()
+        if active_profiler is not None:
+            active_profiler.attach(self.session)
 
     def _get_hidden_inputs(self, soup: BeautifulSoup) -> Dict[str, str]:
         """Sayfadaki gizli inputları toplar (__VIEWSTATE vb.)."""
-        data = {}
-        for inp in soup.find_all("input", type="hidden"):
-            if inp.get("name"):
-                data[inp.get("name")] = inp.get("value", "")
-        return data
-
-    def _download_captcha(self, soup: BeautifulSoup) -> Optional[str]:
-        """Captcha resmini indirir ve dosya yolunu döner."""
+        return dict(PostbackContext.from_soup(soup).fields)
+
+    def _download_captcha(self, soup: BeautifulSoup) -> Optional[bytes]:
+        """Captcha resmini indirir ve ham (PNG) byte'larını döner. Diske yazılmaz."""
         img_tag = soup.find(id="imgCaptchaImg")
         if not img_tag: return None
         
@@ -42,102 +95,283 @@ class OBSClient:
         else:
             url = src
 
-        r = self.session.get(url, stream=True)
-        if r.status_code == 200:
-            path = "temp_captcha.png"
-            with open(path, "wb") as f:
-                r.raw.decode_content = True
-                shutil.copyfileobj(r.raw, f)
-            return path
+        r = self.session.get(url, timeout=self.transport.timeout("captcha"))
+        if r.status_code == 200 and r.content:
+            return r.content
         return None
 
-    def login(self, username: str, password: str, captcha_callback: Callable[[str], str]) -> bool:
+    def login(self, username: str, password: str,
+              captcha_callback: Callable[[bytes, int], Optional[str]],
+              max_attempts: int = DEFAULT_LOGIN_ATTEMPTS) -> bool:
         """
-        Giriş işlemini yönetir.
-        captcha_callback: Resmi gösterip kullanıcıdan kodu alan fonksiyondur.
+        Giriş işlemini yönetir. Başarısız POST'tan sonra max_attempts'e kadar otomatik tekrar dener.
+        captcha_callback(resim_byte, deneme_no): Kodu döner. None dönerse o captcha pas geçilir
+        ve (login sayfası tekrar yüklenmeden) yeni bir captcha indirilir. CAPTCHA_ABORT dönerse
+        POST atılmadan False döner.
         """
-        # 1. Sayfayı Yükle
-        r_get = self.session.get(self.LOGIN_URL)
-        soup = BeautifulSoup(r_get.content, "html.parser")
+        page = None
+        for attempt in range(max_attempts):
+            try:
+                success, page = self._login_attempt(username, password, captcha_callback, attempt, page)
+            except _LoginAborted:
+                return False
+            if success:
+                return True
+        return False
+
+    def _login_attempt(self, username: str, password: str,
+                       captcha_callback: Callable[[bytes, int], Optional[str]],
+                       attempt: int, page: Optional[bytes]):
+        """Tek giriş denemesi. (başarılı_mı, sonraki denemede kullanılabilecek login sayfası) döner."""
+        # 1. Sayfayı Yükle (Önceki başarısız POST'un cevabı zaten taze bir login sayfası)
+        if page is None:
+            page = self.session.get(self.LOGIN_URL, timeout=self.transport.timeout("login")).content
+        with profiler.span("parse.login_page"):
+            soup = self.parser.parse(page, self.LOGIN_PAGE_IDS)
         
         # 2. Captcha İndir ve Kullanıcıya Sor (Callback ile)
-        captcha_path = self._download_captcha(soup)
         captcha_code = ""
-        if captcha_path:
+        for _ in range(self.MAX_CAPTCHA_REFRESHES + 1):
+            captcha_image = self._download_captcha(soup)
+            if not captcha_image:
+                break
             # UI katmanına "Resim burada, bana kodu ver" diyoruz
-            captcha_code = captcha_callback(captcha_path) 
+            with profiler.span("captcha.callback"):
+                captcha_code = captcha_callback(captcha_image, attempt)
+            if captcha_code is CAPTCHA_ABORT:
+                raise _LoginAborted()
+            if captcha_code is not None:
+                break
+        else:
+            # Hiçbir captcha'ya cevap verilmedi, POST atmanın anlamı yok
+            return False, page
         
         # 3. Payload Hazırla
-        payload = self._get_hidden_inputs(soup)
-        payload.update({
-            "txtParamT01": username,
-            "txtParamT02": password,
-            "txtParamT1": password,
-            "txtSecCode": captcha_code,
-            "__EVENTTARGET": "btnLogin",
-            "__EVENTARGUMENT": "",
-            "txt_scrWidth": "1920", 
-            "txt_scrHeight": "1080"
-        })
+        payload = PostbackContext.from_soup(soup).payload(
+            "btnLogin",
+            txtParamT01=username,
+            txtParamT02=password,
+            txtParamT1=password,
+            txtSecCode=captcha_code,
+            txt_scrWidth="1920",
+            txt_scrHeight="1080"
+        )
         if "btnLogin" in payload: del payload["btnLogin"]
 
         # 4. Giriş Yap
-        r_post = self.session.post(self.LOGIN_URL, data=payload)
-        
-        # Dosyayı temizle
-        if captcha_path and os.path.exists(captcha_path):
-            os.remove(captcha_path)
+        r_post = self.session.post(self.LOGIN_URL, data=payload, timeout=self.transport.timeout("login"))
 
         # Başarılı mı?
-        return "login.aspx" not in r_post.url
+        if "login.aspx" not in r_post.url:
+            return True, None
+        return False, r_post.content if b"imgCaptchaImg" in r_post.content else None
 
-    def fetch_grades(self) -> List[CourseGrade]:
-        """Tüm notları ve istatistikleri çeker."""
-        self.session.headers.update({"Referer": self.GRADES_URL})
-        r = self.session.get(self.GRADES_URL)
-        soup = BeautifulSoup(r.content, "html.parser")
-        
-        table = soup.find(id="grd_not_listesi")
-        if not table:
-            raise Exception("Not tablosu bulunamadı! URL veya oturum hatalı olabilir.")
-            
-        # Dönem Bilgisi
+    def export_cookies(self) -> List[Dict]:
+        """Oturum cookie'lerini diske yazılabilir (JSON) bir listeye çevirir."""
+        return [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires,
+                "secure": c.secure
+            }
+            for c in self.session.cookies
+        ]
+
+    def load_cookies(self, cookies: List[Dict]):
+        """Daha önce export edilmiş cookie'leri oturuma geri yükler."""
+        self.session.cookies.clear()
+        for c in cookies:
+            self.session.cookies.set(
+                c["name"], c["value"],
+                domain=c.get("domain", ""),
+                path=c.get("path", "/"),
+                expires=c.get("expires"),
+                secure=c.get("secure", False)
+            )
+
+    def is_session_alive(self) -> bool:
+        """Not sayfasına ucuz bir istek atarak oturumun hâlâ geçerli olup olmadığını kontrol eder.
+        Yönlendirme takip edilmez ve gövde okunmaz; login.aspx'e yönlenirse oturum düşmüştür."""
+        try:
+            r = self.session.get(self.GRADES_URL, allow_redirects=False, stream=True,
+                                 timeout=self.transport.timeout("grades"))
+        except requests.RequestException:
+            return False
+        try:
+            if r.is_redirect or "login.aspx" in r.headers.get("Location", ""):
+                return False
+            return r.status_code == 200 and "login.aspx" not in r.url
+        finally:
+            r.close()
+
+    def _get_grades_page(self, session: Optional[requests.Session] = None) -> BeautifulSoup:
+        """Not sayfasını (seçili dönemle) indirir."""
+        session = session or self.session
+        session.headers.update({"Referer": self.GRADES_URL})
+        r = session.get(self.GRADES_URL, timeout=self.transport.timeout("grades"))
+        if "login.aspx" in r.url:
+            raise SessionExpiredError("Oturum zaman aşımına uğradı, yeniden giriş gerekli.")
+        with profiler.span("parse.grades_page"):
+            return self.parser.parse(r.content, self.GRADES_PAGE_IDS)
+
+    def _switch_term(self, context: PostbackContext, term: str, session: Optional[requests.Session] = None) -> BeautifulSoup:
+        """cmbDonemler postback'i ile verilen dönemin not sayfasını getirir."""
+        session = session or self.session
+        payload = context.payload("cmbDonemler", cmbDonemler=term)
+        r = session.post(self.GRADES_URL, data=payload, timeout=self.transport.timeout("grades"))
+        if "login.aspx" in r.url:
+            raise SessionExpiredError("Oturum zaman aşımına uğradı, yeniden giriş gerekli.")
+        with profiler.span("parse.grades_page"):
+            return self.parser.parse(r.content, self.GRADES_PAGE_IDS)
+
+    def _selected_term(self, soup: BeautifulSoup) -> str:
+        """Sayfada seçili dönem (Bulunamazsa varsayılan)."""
         donem_val = "20251" # Default
         donem_select = soup.find("select", id="cmbDonemler")
         if donem_select:
             opt = donem_select.find("option", selected=True)
             if opt: donem_val = opt.get("value")
+        return donem_val
+
+    def list_terms(self, soup: Optional[BeautifulSoup] = None) -> List[Tuple[str, str]]:
+        """cmbDonemler'deki tüm dönemler: [(değer, görünen ad), ...] (Sayfadaki sırayla)."""
+        soup = soup or self._get_grades_page()
+        donem_select = soup.find("select", id="cmbDonemler")
+        if not donem_select:
+            return []
+        terms = []
+        for opt in donem_select.find_all("option"):
+            value = (opt.get("value") or "").strip()
+            if value and value != "0": # "Seçiniz" gibi boş seçenekler
+                terms.append((value, opt.get_text(strip=True)))
+        return terms
+
+    def fetch_grades(self, term: Optional[str] = None) -> List[CourseGrade]:
+        """Tüm notları ve istatistikleri çeker (term verilmezse sayfada seçili dönem).
+        grade_cache varsa, satırı değişmemiş derslerin ortalamaları oradan alınır
+        ve o dersler için istatistik istekleri atılmaz."""
+        soup = self._get_grades_page()
+        if term and term != self._selected_term(soup):
+            soup = self._switch_term(PostbackContext.from_soup(soup), term)
+        return self._parse_grades_page(soup)
+
+    def fetch_transcript(self, terms: Optional[List[str]] = None,
+                         max_terms_in_flight: int = DEFAULT_TERMS_IN_FLIGHT,
+                         archive: Optional[TermArchive] = None) -> Dict[str, List[CourseGrade]]:
+        """
+        Birden fazla dönemi (varsayılan: cmbDonemler'deki hepsi) çeker, {dönem: dersler} döner.
+        Arşivde olan (kesinleşmiş) dönemler için hiç istek atılmaz; yeni kesinleşenler, istatistik istekleri
+        eksiksiz başarılıysa arşive yazılır.
+        Aynı anda en fazla max_terms_in_flight dönem işlenir, her biri kendi Session kopyasıyla.
+        """
+        base_soup = self._get_grades_page()
+        # Gizli alanlar bir kez okunur; her dönem postback'i bunun kopyasıyla üretilir
+        base_context = PostbackContext.from_soup(base_soup)
+        selected = self._selected_term(base_soup)
+        wanted = terms or [value for value, _ in self.list_terms(base_soup)] or [selected]
 
-        grades_list = []
-        rows = table.find_all("tr")[1:]
+        results: Dict[str, List[CourseGrade]] = {}
+        pending = []
+        for term in wanted:
+            archived = archive.get(term) if archive is not None else None
+            if archived is not None:
+                results[term] = archived
+            else:
+                pending.append(term)
 
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols) < 5: continue
+        def load(term: str) -> Tuple[List[CourseGrade], bool]:
+            # Seçili dönem zaten elimizde, postback gerekmez
+            if term == selected:
+                return self._load_grades_page(base_soup, context=base_context.fork())
+            session = self._clone_session()
+            try:
+                # Her dönem aynı başlangıç sayfası durumundan (__VIEWSTATE) postback'lenir
+                soup = self._switch_term(base_context, term, session)
+                return self._load_grades_page(soup, session)
+            finally:
+                self._close_clone(session)
 
-            # Temel Bilgiler
-            course_code = cols[1].get_text(strip=True)
-            course_name = cols[2].get_text(strip=True)
-            letter_grade = cols[6].get_text(strip=True)
-            raw_text = cols[4].get_text(" ", strip=True)
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_terms_in_flight, len(pending)))) as pool:
+                for term, (grades, complete) in zip(pending, pool.map(load, pending)):
+                    results[term] = grades
+                    # İstatistiği alınamayan ders varsa arşivlenmez ('?' ortalamalar kalıcı olmasın)
+                    if archive is not None and complete and TermArchive.is_finalized(grades):
+                        archive.put(term, grades)
+            if archive is not None:
+                archive.save()
+
+        return {term: results[term] for term in wanted}
+
+    def iter_grades(self, term: Optional[str] = None) -> Iterator[GradeUpdate]:
+        """fetch_grades'in akış (streaming) versiyonu.
+        Önce her ders satırı parse edilir edilmez yield edilir; ortalamaları çekilmesi gerekenler
+        için, ortalamalar geldikçe aynı index ile güncel ders tekrar yield edilir (stats_ready=True)."""
+        soup = self._get_grades_page()
+        if term and term != self._selected_term(soup):
+            soup = self._switch_term(PostbackContext.from_soup(soup), term)
+        yield from self._iter_grades_page(soup)
+
+    def _parse_grades_page(self, soup: BeautifulSoup, session: Optional[requests.Session] = None,
+                           context: Optional[PostbackContext] = None) -> List[CourseGrade]:
+        """Not sayfasındaki satırları parse eder, ortalamaları (gerekirse) çeker."""
+        return self._load_grades_page(soup, session, context)[0]
+
+    def _load_grades_page(self, soup: BeautifulSoup, session: Optional[requests.Session] = None,
+                          context: Optional[PostbackContext] = None) -> Tuple[List[CourseGrade], bool]:
+        """_parse_grades_page + tüm istatistik istekleri başarılı oldu mu (Dönem arşivlenebilir mi)."""
+        grades: Dict[int, CourseGrade] = {}
+        complete = True
+        for update in self._iter_grades_page(soup, session, context):
+            grades[update.index] = update.course
+            complete = complete and not update.stats_failed
+        return [grades[i] for i in sorted(grades)], complete
+
+    def _iter_grades_page(self, soup: BeautifulSoup, session: Optional[requests.Session] = None,
+                          context: Optional[PostbackContext] = None) -> Iterator[GradeUpdate]:
+        table = soup.find(id="grd_not_listesi")
+        if not table:
+            raise Exception("Not tablosu bulunamadı! URL veya oturum hatalı olabilir.")
             
-            # Senin notlarını parse et
-            my_grades = self._parse_my_grades(raw_text)
+        # Dönem Bilgisi
+        donem_val = self._selected_term(soup)
+
+        rows_data = []
+        with profiler.span("parse.grade_rows"):
+            rows = table.find_all("tr")[1:]
+
+            for row in rows:
+                cols = row.find_all("td")
+                if len(cols) < 5: continue
+
+                # Temel Bilgiler
+                course_code = cols[1].get_text(strip=True)
+                course_name = cols[2].get_text(strip=True)
+                letter_grade = cols[6].get_text(strip=True)
+                raw_text = cols[4].get_text(" ", strip=True)
             
-            # Sınıf Ortalamalarını Çek (AJAX İşlemleri)
-            class_avgs = {"Vize": "?", "Final": "?", "Büt": "?"}
+                # Senin notlarını parse et
+                my_grades = self._parse_my_grades(raw_text)
             
-            stats_btn = row.find("a", id=re.compile(r"btnIstatistik"))
-            if stats_btn:
-                href = stats_btn.get("href", "")
-                match = re.search(r"__doPostBack\('([^']*)'", href)
-                if match:
-                    target = match.group(1)
-                    # Ortalamaları getir
-                    class_avgs = self._fetch_course_stats(target, donem_val, soup)
+                # İstatistik butonunun postback hedefi (Ortalamalar sonra toplu çekilecek)
+                target = None
+                stats_btn = row.find("a", id=re.compile(r"btnIstatistik"))
+                if stats_btn:
+                    href = stats_btn.get("href", "")
+                    match = re.search(r"__doPostBack\('([^']*)'", href)
+                    if match:
+                        target = match.group(1)
+
+                fingerprint = GradeCache.fingerprint(course_code, raw_text, letter_grade)
+                rows_data.append((course_code, course_name, letter_grade, my_grades, target, fingerprint))
 
+        def build(i: int, class_avgs: Dict[str, str]) -> CourseGrade:
+            course_code, course_name, letter_grade, my_grades, _, _ = rows_data[i]
             # Veriyi Modele Dök
-            course = CourseGrade(
+            return CourseGrade(
                 code=course_code,
                 name=course_name,
                 term_id=donem_val,
@@ -146,50 +380,148 @@ class OBSClient:
                 final=ExamStats(my_grades["Final"], class_avgs["Final"]),
                 makeup=ExamStats(my_grades["Büt"], class_avgs["Büt"])
             )
-            grades_list.append(course)
 
-        return grades_list
+        # Değişmeyen satırların ortalamalarını önbellekten al (İstek atılmaz)
+        targets = []
+        all_avgs = []
+        for course_code, _, _, my_grades, target, fingerprint in rows_data:
+            class_avgs = None
+            if target and self.grade_cache is not None:
+                class_avgs = self.grade_cache.lookup(donem_val, course_code, fingerprint, my_grades)
+                if class_avgs:
+                    target = None
+            targets.append(target)
+            all_avgs.append(class_avgs or {"Vize": "?", "Final": "?", "Büt": "?"})
+
+        # 1. Satırlar hazır: Hemen ver (Ortalaması beklenenler '?' ile)
+        for i in range(len(rows_data)):
+            yield GradeUpdate(i, build(i, all_avgs[i]), stats_ready=targets[i] is None)
+
+        # 2. Sınıf Ortalamalarını Çek (AJAX İşlemleri) - geldikçe güncelle
+        # Sayfanın form durumu bir kez okunur, tüm istatistik postback'leri bundan üretilir
+        context = context or PostbackContext.from_soup(soup)
+        failed = set()
+        for i, class_avgs, ok in self._iter_stats(targets, donem_val, context, session):
+            all_avgs[i] = class_avgs
+            if not ok:
+                failed.add(i)
+            yield GradeUpdate(i, build(i, class_avgs), stats_ready=True, stats_failed=not ok)
+
+        if self.grade_cache is not None:
+            # İsteği başarısız olan satırlar saklanmaz (Sonraki çekimde tekrar istenir).
+            # Başarılı satırlar saklanır; notu girilmiş sınavın '?' ortalamasını lookup isabet saymaz.
+            for i, ((course_code, _, _, _, _, fingerprint), class_avgs) in enumerate(zip(rows_data, all_avgs)):
+                if i not in failed:
+                    self.grade_cache.store(donem_val, course_code, fingerprint, class_avgs)
+            self.grade_cache.save()
+
+    def _clone_session(self, base: Optional[requests.Session] = None) -> requests.Session:
+        """Ana oturumun (veya base'in) cookie ve header'larını taşıyan bağımsız bir Session üretir.
+        requests.Session thread-safe olmadığı için her worker kendi kopyasını kullanır."""
+        base = base or self.session
+        clone = requests.Session()
+        clone.headers.update(base.headers)
+        clone.cookies.update(base.cookies)
+        # Response hook'ları (ölçüm/kayıt) kopyalarda da çalışsın
+        clone.hooks = {event: list(hooks) for event, hooks in base.hooks.items()}
+        # Bağlantı havuzu paylaşılır (urllib3 havuzu thread-safe): Açık keep-alive bağlantılar
+        # worker'lar ve çekimler arasında yeniden kullanılır, her kopya yeni TLS el sıkışması yapmaz
+        for prefix, adapter in base.adapters.items():
+            clone.mount(prefix, adapter)
+        return clone
+
+    @staticmethod
+    def _close_clone(clone: requests.Session):
+        """Kopyayı kapatır ama paylaşılan adapter'ları (havuzu) kapatmaz."""
+        clone.adapters.clear()
+        clone.close()
+
+    def _record_failure(self, kind: str):
+        with self._failures_lock:
+            self.failures[kind] += 1
+
+    def _iter_stats(self, targets: List[Optional[str]], donem: str, context: PostbackContext,
+                    session: Optional[requests.Session] = None) -> Iterator[Tuple[int, Dict[str, str], bool]]:
+        """Hedefi olan her dersin ortalamalarını çeker, (index, ortalamalar, başarılı mı) olarak geldikçe verir.
+        stats_workers > 1 ise sınırlı bir thread havuzu kullanılır (Sıra: tamamlanma sırası)."""
+        jobs = [i for i, target in enumerate(targets) if target]
+
+        # Seri mod: Tek oturum üzerinden sırayla (Her postback bir öncekinin güncellediği durumla gider)
+        if self.stats_workers <= 1 or len(jobs) <= 1:
+            for i in jobs:
+                yield (i,) + self._fetch_course_stats(targets[i], donem, context, session)
+            return
+
+        # Paralel mod: Her worker thread kendi Session ve bağlam kopyasıyla çalışır.
+        # Her worker'ın zinciri aynı sayfa durumundan (__VIEWSTATE) başladığı için birbirinden bağımsızdır.
+        local = threading.local()
+        clones = []
+        clones_lock = threading.Lock()
+
+        def run(target: str) -> Tuple[Dict[str, str], bool]:
+            if not hasattr(local, "session"):
+                local.session = self._clone_session(session)
+                local.context = context.fork()
+                with clones_lock:
+                    clones.append(local.session)
+            return self._fetch_course_stats(target, donem, local.context, local.session)
 
-    def _fetch_course_stats(self, target: str, donem: str, main_soup: BeautifulSoup) -> Dict[str, str]:
-        """AJAX ile istatistik URL'sini bulur ve ortalamaları parse eder."""
         try:
-            # 1. AJAX Trigger
-            hidden_data = self._get_hidden_inputs(main_soup)
-            hidden_data.update({
-                "ScriptManager1": f"UpdatePanel1|{target}",
-                "__EVENTTARGET": target,
-                "__EVENTARGUMENT": "",
-                "__ASYNCPOST": "true",
-                "cmbDonemler": donem
-            })
-            
-            self.session.headers.update({"X-MicrosoftAjax": "Delta=true"})
-            r_post = self.session.post(self.GRADES_URL, data=hidden_data)
-            
-            # Header temizliği
-            if "X-MicrosoftAjax" in self.session.headers: 
-                del self.session.headers["X-MicrosoftAjax"]
+            with ThreadPoolExecutor(max_workers=min(self.stats_workers, len(jobs))) as pool:
+                futures = {pool.submit(run, targets[i]): i for i in jobs}
+                for future in as_completed(futures):
+                    yield (futures[future],) + future.result()
+        finally:
+            for clone in clones:
+                self._close_clone(clone)
+
+    def _fetch_course_stats(self, target: str, donem: str, context: PostbackContext,
+                            session: Optional[requests.Session] = None) -> Tuple[Dict[str, str], bool]:
+        """AJAX ile istatistik URL'sini bulur ve ortalamaları parse eder: (ortalamalar, başarılı mı).
+        session verilirse (paralel mod) istekler o oturum üzerinden atılır.
+        Ağ/HTTP hataları yutulmaz: self.failures'a türüyle sayılır, ders '?' ortalamalar ve False ile döner
+        (Sayfada ortalaması olmayan sınavın '?'su ise başarılı bir sonuçtur)."""
+        session = session or self.session
+        unknown = {"Vize": "?", "Final": "?", "Büt": "?"}
+        timeout = self.transport.timeout("stats")
+        try:
+            # 1. AJAX Trigger (AJAX header'ı sadece bu isteğe verilir, Session'a yazılmaz)
+            hidden_data = context.async_payload("UpdatePanel1", target, cmbDonemler=donem)
+            r_post = session.post(self.GRADES_URL, data=hidden_data, headers=PostbackContext.AJAX_HEADERS,
+                                  timeout=timeout)
+            if r_post.status_code != 200:
+                self._record_failure(f"stats_postback_http_{r_post.status_code}")
+                return unknown, False
+            # Sunucunun döndüğü yeni __VIEWSTATE/__EVENTVALIDATION sonraki postback'te kullanılır
+            context.update_from_delta(r_post.text)
 
             # 2. URL Bulma
             url_match = re.search(r"(Ders_Istatistik\.aspx[^'\"]*)", r_post.text)
             if not url_match:
                 url_match = re.search(r"prolizPopup\('([^']+)'", r_post.text)
             
-            if url_match:
-                raw_url = url_match.group(1)
-                full_url = ""
-                if raw_url.startswith("http"): full_url = raw_url
-                elif raw_url.startswith("/"): full_url = "https://obs.ozal.edu.tr" + raw_url
-                else: full_url = "https://obs.ozal.edu.tr/oibs/std/" + raw_url.lstrip("/") # Fallback
-
-                # 3. İstatistik Sayfasını İndir
-                r_stats = self.session.get(full_url)
-                return self._parse_averages_from_html(r_stats.text)
-            
-            return {"Vize": "?", "Final": "?", "Büt": "?"}
+            if not url_match:
+                self._record_failure("stats_url_not_found")
+                return unknown, False
+
+            raw_url = url_match.group(1)
+            full_url = ""
+            if raw_url.startswith("http"): full_url = raw_url
+            elif raw_url.startswith("/"): full_url = self.STATS_BASE_URL + raw_url
+            else: full_url = self.BASE_URL + raw_url.lstrip("/") # Fallback
+
+            # 3. İstatistik Sayfasını İndir (GET: Geçici hatalarda adapter backoff ile tekrar dener)
+            r_stats = session.get(full_url, timeout=timeout)
+            if r_stats.status_code != 200:
+                self._record_failure(f"stats_http_{r_stats.status_code}")
+                return unknown, False
+            return self._parse_averages_from_html(r_stats.text), True
 
-        except Exception:
-            return {"Vize": "?", "Final": "?", "Büt": "?"}
+        except requests.Timeout:
+            self._record_failure("stats_timeout")
+        except requests.RequestException:
+            self._record_failure("stats_connection")
+        return unknown, False
 
     def _parse_my_grades(self, text: str) -> Dict[str, str]:
         """ 'Vize : 80 Final : --' stringini parse eder."""
@@ -206,7 +538,8 @@ class OBSClient:
     def _parse_averages_from_html(self, html: str) -> Dict[str, str]:
         """State Machine mantığıyla tüm ortalamaları çeker."""
         averages = {"Vize": "?", "Final": "?", "Büt": "?"}
-        soup = BeautifulSoup(html, "html.parser")
+        with profiler.span("parse.stats_page"):
+            soup = self.parser.parse(html, self.STATS_PAGE_IDS, hidden_inputs=False)
         table = soup.find("table", id="grdIstSnv")
         if not table: return averages
 
@@ -0,0 +1,133 @@
+import re
+from typing import List, Sequence, Tuple, Union
+from bs4 import BeautifulSoup, UnicodeDammit
+
+Markup = Union[str, bytes]
+
+# Gizli inputlar: Tırnak içindeki '>' karakterlerine takılmadan tüm <input ...> etiketleri
+_INPUT_TAG = re.compile(r"""<input\b(?:[^>"']|"[^"]*"|'[^']*')*>""", re.I)
+_HIDDEN_TYPE = re.compile(r"""\btype\s*=\s*["']?hidden\b""", re.I)
+# Tarayıcının etiket olarak görmediği bölgeler (İçlerindeki <input> sayılmaz)
+_OPAQUE = re.compile(r"<script\b.*?</script\s*>|<!--.*?-->", re.I | re.S)
+_VOID_TAGS = ("img", "input", "br", "hr", "meta", "link")
+# Bir id değerinden hemen önce gelmesi gereken kısım: id="  /  id='  /  id=
+_TAG_NAME = re.compile(r"<([A-Za-z][\w-]*)")
+_ID_ATTR_END = re.compile(r"""(?<![\w-])id\s*=\s*["']?$""", re.I)
+
+
+class PageParser:
+    """
+    Sayfanın tamamından BeautifulSoup ağacı kurar (Eski davranış).
+    features: "html.parser" (Varsayılan, ek bağımlılık yok) veya "lxml" (Kuruluysa).
+    """
+
+    name = "html.parser"
+
+    def __init__(self, features: str = "html.parser"):
+        if features == "lxml":
+            try:
+                import lxml # noqa: F401
+            except ImportError:
+                raise ValueError("lxml kurulu değil (pip install lxml) - 'fast' veya 'html.parser' kullanın.")
+        self.features = features
+        self.name = features
+
+    def parse(self, markup: Markup, ids: Sequence[str] = (), hidden_inputs: bool = True) -> BeautifulSoup:
+        """ids / hidden_inputs, hızlı parser ile aynı imza için var; burada her şey parse edilir."""
+        return BeautifulSoup(markup, self.features)
+
+
+class RegionParser(PageParser):
+    """
+    Hızlı yol: Sayfanın sadece gerekli bölgelerini (id'si verilen elementler + gizli inputlar)
+    ham metinden kesip, küçük bir belge olarak parse eder (lxml kuruluysa onunla, değilse html.parser). __VIEWSTATE'li büyük ASP.NET
+    sayfalarında menü, script ve yerleşim markup'ı için ağaç kurulmaz.
+    Dönen soup'ta find(id=...) ve find_all("input", type="hidden") tam ağaçtakiyle aynı sonucu verir.
+    Bir element bulunamaz veya kapanışı eşleşmezse sayfanın tamamı parse edilir (Güvenli geri dönüş).
+    """
+
+    name = "fast"
+
+    def __init__(self):
+        try:
+            import lxml # noqa: F401
+            features = "lxml"
+        except ImportError:
+            features = "html.parser"
+        super().__init__(features)
+        self.name = "fast"
+
+    @staticmethod
+    def _decode(markup: Markup) -> str:
+        if isinstance(markup, str):
+            return markup
+        # BeautifulSoup'un kendi seçeceği kodlamayla çöz (BOM / meta charset / utf-8 ...)
+        return UnicodeDammit(markup, is_html=True).unicode_markup
+
+    @staticmethod
+    def _element_span(text: str, element_id: str) -> Tuple[int, int]:
+        """id'si verilen elementin [başlangıç, bitiş) aralığı. Bulunamazsa (-1, -1)."""
+        # Önce düz metin araması (Büyük __VIEWSTATE üzerinde regex çalıştırmamak için), sonra doğrulama
+        pos = text.find(element_id)
+        while pos >= 0:
+            after = text[pos + len(element_id):pos + len(element_id) + 1]
+            if after and after in "\"' \t\r\n/>" and _ID_ATTR_END.search(text, max(0, pos - 16), pos):
+                break
+            pos = text.find(element_id, pos + 1)
+        if pos < 0:
+            return -1, -1
+        start = text.rfind("<", 0, pos)
+        tag_match = _TAG_NAME.match(text, start)
+        if start < 0 or not tag_match:
+            return -1, -1
+        tag = tag_match.group(1).lower()
+        open_end = text.find(">", pos + len(element_id))
+        if open_end < 0:
+            return -1, -1
+        if tag in _VOID_TAGS or text[open_end - 1] == "/":
+            return start, open_end + 1
+
+        # İç içe aynı etiketleri (Tablo içinde tablo) sayarak eşleşen kapanışı bul
+        depth = 0
+        for tag_token in re.compile(r"<(/?)%s\b[^>]*>" % tag, re.I).finditer(text, start):
+            depth += -1 if tag_token.group(1) else 1
+            if depth == 0:
+                return start, tag_token.end()
+        return -1, -1
+
+    def parse(self, markup: Markup, ids: Sequence[str] = (), hidden_inputs: bool = True) -> BeautifulSoup:
+        text = self._decode(markup)
+        spans: List[Tuple[int, int]] = []
+        for element_id in ids:
+            span = self._element_span(text, element_id)
+            if span[0] < 0:
+                return BeautifulSoup(text, self.features)
+            spans.append(span)
+
+        if hidden_inputs:
+            # Script/yorum içlerini aynı uzunlukta boşlukla maskele ki konumlar değişmesin
+            visible = _OPAQUE.sub(lambda m: " " * len(m.group(0)), text)
+            for tag in _INPUT_TAG.finditer(visible):
+                if _HIDDEN_TYPE.search(tag.group(0)):
+                    spans.append(tag.span())
+
+        # Belge sırasını koru; başka bir bölgenin içinde kalanları (Tablodaki gizli input) atla
+        fragments = []
+        covered_until = -1
+        for start, end in sorted(spans):
+            if start < covered_until:
+                continue
+            fragments.append(text[start:end])
+            covered_until = end
+        return BeautifulSoup("".join(fragments), self.features)
+
+
+PARSERS = ("fast", "html.parser", "lxml")
+
+def get_parser(name: str = "fast") -> PageParser:
+    """İsimle parser seçer: 'fast' (bölge kesme), 'html.parser' (tam ağaç), 'lxml' (tam ağaç, C)."""
+    if name not in PARSERS:
+        raise ValueError(f"Bilinmeyen parser: {name} (Seçenekler: {', '.join(PARSERS)})")
+    if name == "fast":
+        return RegionParser()
+    return PageParser(name)
@@ -0,0 +1,86 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup
+
+def parse_delta(text: str) -> List[Tuple[str, str, str]]:
+    """
+    ASP.NET UpdatePanel delta cevabını parçalar: 'uzunluk|tür|id|içerik|' tekrarları.
+    İçerik '|' içerebildiği için uzunluk alanına göre kesilir. [(tür, id, içerik), ...] döner.
+    Format bozuksa o noktaya kadar okunanlar döner.
+    """
+    parts = []
+    pos = 0
+    while pos < len(text):
+        length_end = text.find("|", pos)
+        type_end = text.find("|", length_end + 1) if length_end >= 0 else -1
+        id_end = text.find("|", type_end + 1) if type_end >= 0 else -1
+        if id_end < 0 or not text[pos:length_end].isdigit():
+            break
+        length = int(text[pos:length_end])
+        content_start = id_end + 1
+        content_end = content_start + length
+        if content_end > len(text) or text[content_end:content_end + 1] != "|":
+            break
+        parts.append((text[length_end + 1:type_end], text[type_end + 1:id_end], text[content_start:content_end]))
+        pos = content_end + 1
+    return parts
+
+
+class PostbackContext:
+    """
+    Bir sayfa yüklemesinin form durumu (__VIEWSTATE, __EVENTVALIDATION ve diğer gizli alanlar).
+    Sayfa başına bir kez kurulur; her istek için payload, ortak alanların kopyası üzerine
+    (copy-on-write) üretilir, ortak sözlük hiç değiştirilmez. UpdatePanel cevaplarındaki
+    hiddenField güncellemeleri update_from_delta ile alınır, böylece art arda postback'ler
+    tarayıcıdaki gibi güncel durumla gider.
+    Aynı bağlam thread'ler arasında paylaşılmaz: Her worker fork() ile kendi kopyasını alır.
+    """
+
+    # AJAX (UpdatePanel) isteğine özel header'lar: Session'a yazılmaz, isteğe verilir
+    AJAX_HEADERS = {"X-MicrosoftAjax": "Delta=true"}
+
+    def __init__(self, fields: Dict[str, str]):
+        self._fields = dict(fields)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> "PostbackContext":
+        """Sayfadaki gizli inputları toplar (__VIEWSTATE vb.)."""
+        fields = {}
+        for inp in soup.find_all("input", type="hidden"):
+            if inp.get("name"):
+                fields[inp.get("name")] = inp.get("value", "")
+        return cls(fields)
+
+    @property
+    def fields(self) -> Dict[str, str]:
+        """Gizli alanların güncel hali (Salt okunur kabul edilmeli)."""
+        return self._fields
+
+    def fork(self) -> "PostbackContext":
+        """Aynı durumdan başlayan bağımsız bir kopya (Paralel worker'lar için)."""
+        return PostbackContext(self._fields)
+
+    def payload(self, target: str, argument: str = "", **extra: str) -> Dict[str, str]:
+        """Tam sayfa postback'i (__doPostBack(target, argument)) için form verisi."""
+        data = dict(self._fields)
+        data.update(extra)
+        data["__EVENTTARGET"] = target
+        data["__EVENTARGUMENT"] = argument
+        return data
+
+    def async_payload(self, panel: str, target: str, argument: str = "", **extra: str) -> Dict[str, str]:
+        """UpdatePanel (ScriptManager) üzerinden AJAX postback için form verisi."""
+        data = self.payload(target, argument, **extra)
+        data["ScriptManager1"] = f"{panel}|{target}"
+        data["__ASYNCPOST"] = "true"
+        return data
+
+    def update_from_delta(self, text: str) -> int:
+        """Delta cevabındaki hiddenField değerlerini bağlama işler. Güncellenen alan sayısını döner."""
+        updates = {ident: content for kind, ident, content in parse_delta(text) if kind == "hiddenField"}
+        if updates:
+            with self._lock:
+                # Yeni sözlük: Önceki payload'lar ve fork'lar etkilenmez
+                self._fields = {**self._fields, **updates}
+        return len(updates)
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+class Profiler:
+    """
+    Bir çekimin nerede vakit harcadığını kaydeder:
+      - HTTP: Session'a takılan response hook'u ile her istek (aşama, URL sınıfı, durum, byte, süre)
+        (Gelen byte: Ağdan aktarılan, sıkıştırılmış boyut + header'lar)
+      - CPU: span() blokları (Captcha çözümü, BeautifulSoup parse adımları)
+    Hook'lar OBSClient'ın worker Session kopyalarına da taşındığı için paralel istekler de görünür.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.records: List[Dict] = []
+
+    # --- HTTP ---
+    def attach(self, session: requests.Session):
+        """Session'a ölçüm hook'unu ekler (Aynı Session'a iki kez eklenmez)."""
+        hooks = session.hooks.setdefault("response", [])
+        if self._on_response not in hooks:
+            hooks.append(self._on_response)
+
+    @staticmethod
+    def classify(r: requests.Response) -> Tuple[str, str]:
+        """İsteği (aşama, URL sınıfı) olarak sınıflandırır. URL sınıfı: Sorgu olmadan sayfa adı."""
+        url_class = os.path.basename(urlsplit(r.url).path) or "/"
+        name = url_class.lower()
+        method = r.request.method if r.request is not None else "GET"
+
+        if r.headers.get("Content-Type", "").startswith("image/") or "captcha" in name:
+            return "captcha_download", url_class
+        if name == "login.aspx":
+            return ("login_post" if method == "POST" else "login_page"), url_class
+        if name == "not_listesi_op.aspx":
+            if method != "POST":
+                return "grades_page", url_class
+            # İstatistik butonu AJAX (UpdatePanel) ile, dönem değişimi tam postback ile gider
+            if r.request.headers.get("X-MicrosoftAjax"):
+                return "stats_postback", url_class
+            return "term_switch", url_class
+        if name == "ders_istatistik.aspx":
+            return "stats_page", url_class
+        # Örn: Login sonrası yönlendirilen index.aspx
+        return "other", url_class
+
+    @staticmethod
+    def _header_bytes(headers) -> int:
+        return sum(len(k) + len(v) + 4 for k, v in headers.items())
+
+    @staticmethod
+    def _wire_body_bytes(r: requests.Response) -> int:
+        """Gövdenin ağdan gelen (sıkıştırılmış) boyutu. r.content gzip'i açılmış halidir ve ASP.NET
+        sayfalarında aktarılanın birkaç katıdır. urllib3 soketten okunan ham byte'ları sayar (tell());
+        o yoksa Content-Length, o da yoksa açılmış gövde."""
+        content = r.content
+        try:
+            wire = int(r.raw.tell())
+        except (AttributeError, TypeError, ValueError, OSError):
+            wire = 0
+        if wire > 0:
+            return wire
+        length = r.headers.get("Content-Length")
+        if length and length.isdigit():
+            return int(length)
+        return len(content)
+
+    def _on_response(self, r: requests.Response, *args, **kwargs):
+        # Hook gövde okunmadan çağrılır. stream=False ise gövde zaten hemen ardından okunacak,
+        # burada okuyup süreyi de dahil ediyoruz. stream=True (Örn: is_session_alive) ise dokunulmaz.
+        body_started = time.perf_counter()
+        if kwargs.get("stream"):
+            body_len = int(r.headers.get("Content-Length", 0) or 0)
+        else:
+            body_len = self._wire_body_bytes(r)
+        end = time.perf_counter()
+        seconds = r.elapsed.total_seconds() + (end - body_started)
+
+        request_body = r.request.body or b""
+        phase, url_class = self.classify(r)
+        self._add({
+            "kind": "http",
+            "name": phase,
+            "url_class": url_class,
+            "method": r.request.method,
+            "status": r.status_code,
+            "bytes_out": len(request_body) + self._header_bytes(r.request.headers),
+            "bytes_in": body_len + self._header_bytes(r.headers),
+            "start": end - seconds - self._origin,
+            "seconds": seconds,
+            "thread": threading.get_ident()
+        })
+        return r
+
+    # --- CPU ---
+    @contextmanager
+    def span(self, name: str, kind: str = "cpu"):
+        """Bloğun süresini kaydeder: with profiler.span("parse.grades"): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._add({
+                "kind": kind,
+                "name": name,
+                "start": started - self._origin,
+                "seconds": end - started,
+                "thread": threading.get_ident()
+            })
+
+    def _add(self, record: Dict):
+        with self._lock:
+            self.records.append(record)
+
+    # --- RAPOR ---
+    @property
+    def wall_seconds(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def summary(self) -> List[Dict]:
+        """Aşama bazında toplamlar (İlk görülme sırasıyla)."""
+        with self._lock:
+            records = list(self.records)
+
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for record in records:
+            groups.setdefault((record["kind"], record["name"]), []).append(record)
+
+        rows = []
+        for (kind, name), items in groups.items():
+            durations = sorted(item["seconds"] for item in items)
+            rows.append({
+                "kind": kind,
+                "name": name,
+                "count": len(items),
+                "total_ms": sum(durations) * 1000,
+                "avg_ms": sum(durations) / len(durations) * 1000,
+                "p95_ms": durations[min(len(durations) - 1, int(0.95 * len(durations)))] * 1000,
+                "bytes_out": sum(item.get("bytes_out", 0) for item in items),
+                "bytes_in": sum(item.get("bytes_in", 0) for item in items),
+                "errors": sum(1 for item in items if item.get("status", 200) >= 400)
+            })
+        return rows
+
+    def chrome_trace(self) -> List[Dict]:
+        """chrome://tracing / Perfetto'nun okuduğu 'Complete' (ph=X) olayları, mikrosaniye cinsinden."""
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            args = {k: v for k, v in record.items() if k not in ("kind", "name", "start", "seconds", "thread")}
+            events.append({
+                "name": record["name"],
+                "cat": record["kind"],
+                "ph": "X",
+                "ts": round(record["start"] * 1e6),
+                "dur": round(record["seconds"] * 1e6),
+                "pid": pid,
+                "tid": record["thread"],
+                "args": args
+            })
+        return events
+
+    def dump(self, path: str):
+        """Özet + ham kayıtları JSON olarak yazar. Dosya ayrıca doğrudan chrome://tracing'e yüklenebilir."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "wall_seconds": self.wall_seconds,
+                "summary": self.summary(),
+                "records": self.records,
+                "traceEvents": self.chrome_trace(),
+                "displayTimeUnit": "ms"
+            }, f, ensure_ascii=False, indent=2)
+
+
+# --- SÜREÇ GENELİ AKTİF PROFİLER ---
+# Solver ve parse adımları, profiler'ı parametre olarak taşımadan buraya raporlar.
+_active: Optional[Profiler] = None
+
+def activate(profiler: Optional[Profiler]):
+    global _active
+    _active = profiler
+
+def active() -> Optional[Profiler]:
+    return _active
+
+def span(name: str, kind: str = "cpu"):
+    """Aktif profiler varsa bloğu ölçer, yoksa hiçbir şey yapmaz."""
+    profiler = _active
+    return profiler.span(name, kind) if profiler is not None else nullcontext()
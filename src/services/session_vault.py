@@ -0,0 +1,61 @@
+import json
+import os
+import re
+import time
+from typing import List, Dict, Optional
+
+class SessionVault:
+    """Kullanıcı başına OBS oturum cookie'lerini diskte saklar.
+    Tekrar eden çalıştırmalarda login + captcha adımını atlamak için kullanılır."""
+
+    DIRNAME = "sessions"
+
+    # ASP.NET varsayılan oturum zaman aşımı 20 dk. Her başarılı kullanımda süre yenilenir.
+    SESSION_TTL = 20 * 60
+
+    def __init__(self, app_dir: str):
+        # AuthManager'ın profil dosyasının yanında (aynı uygulama klasörü)
+        self.vault_dir = os.path.join(app_dir, self.DIRNAME)
+        if not os.path.exists(self.vault_dir):
+            os.makedirs(self.vault_dir, mode=0o700)
+
+    def _path(self, username: str) -> str:
+        safe_name = re.sub(r"[^\w.-]", "_", username)
+        return os.path.join(self.vault_dir, f"{safe_name}.json")
+
+    def load(self, username: str) -> Optional[List[Dict]]:
+        """Süresi dolmamış cookie listesini döner, yoksa None."""
+        path = self._path(username)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except:
+            return None
+
+        if data.get("expires_at", 0) <= time.time():
+            self.delete(username)
+            return None
+        return data.get("cookies") or None
+
+    def save(self, username: str, cookies: List[Dict]):
+        """Cookie'leri son kullanma zamanıyla birlikte yazar (Sadece sahibi okuyabilir)."""
+        now = time.time()
+        expires_at = now + self.SESSION_TTL
+        # Kalıcı cookie'lerden biri daha erken bitiyorsa onu esas al
+        for cookie in cookies:
+            if cookie.get("expires"):
+                expires_at = min(expires_at, cookie["expires"])
+
+        path = self._path(username)
+        tmp_path = path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": now, "expires_at": expires_at, "cookies": cookies}, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, username: str):
+        path = self._path(username)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+@dataclass
+class TransportConfig:
+    """
+    OBSClient'ın HTTP katmanı ayarları: Bağlantı havuzu, aşama bazında zaman aşımları,
+    tekrar deneme politikası ve sıkıştırma.
+    """
+    # Havuz: Ana oturum ve worker kopyaları aynı adapter'ı paylaşır,
+    # bu yüzden en az stats_workers x dönem sayısı kadar bağlantı tutabilmeli
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+
+    # Zaman aşımları (sn): (bağlantı, okuma). Not sayfaları büyük __VIEWSTATE taşıdığı için daha uzun.
+    connect_timeout: float = 5.0
+    read_timeouts: Dict[str, float] = field(default_factory=lambda: {
+        "login": 20.0,
+        "captcha": 10.0,
+        "grades": 30.0,
+        "stats": 15.0
+    })
+    default_read_timeout: float = 20.0
+
+    # Tekrar deneme: Sadece idempotent istekler (GET/HEAD). Postback'ler (login, AJAX) tekrar gönderilmez,
+    # çünkü sunucu tarafında durum değiştirebilirler (Captcha tüketilir, __VIEWSTATE ilerler).
+    retries: int = 3
+    backoff_factor: float = 0.5 # 0.5, 1, 2 sn... (urllib3 üstel bekleme)
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    accept_encoding: str = "gzip, deflate"
+
+    def timeout(self, phase: str) -> Tuple[float, float]:
+        """requests'e verilecek (connect, read) zaman aşımı."""
+        return self.connect_timeout, self.read_timeouts.get(phase, self.default_read_timeout)
+
+    def make_adapter(self) -> HTTPAdapter:
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False # Son cevap (Örn: 503) requests'e normal Response olarak döner
+        )
+        return HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                           max_retries=retry)
+
+    def mount(self, session: requests.Session, adapter: HTTPAdapter = None) -> HTTPAdapter:
+        """Session'a (verilmezse yeni) adapter'ı http/https için takar ve sıkıştırma başlığını ayarlar."""
+        adapter = adapter or self.make_adapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = self.accept_encoding
+        return adapter
@@ -3,12 +3,13 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich import box
-from typing import List, Optional
-from src.models import CourseGrade, ExamStats
+from typing import Dict, Iterable, List, Optional, Set
+from src.models import CourseGrade, ExamStats, GradeUpdate, ScoreState
 
 class DisplayManager:
-    def __init__(self):
-        self.console = Console()
+    def __init__(self, stderr: bool = False):
+        # stderr=True: Çıktı stdout'u kirletmez (Örn: --export - ile stdout sadece veri taşır)
+        self.console = Console(stderr=stderr)
 
     def print_banner(self):
         self.console.clear()
@@ -36,12 +37,12 @@ class DisplayManager:
                 return choices[int(selection) - 1]
             self.console.print("[red]Geçersiz seçim, tekrar deneyin.[/red]")
 
-    def _format_score(self, my_score: str, class_avg: str) -> str:
-        """Notu renklendirir ve ortalamaya göre ok işareti ekler."""
-        if not my_score.replace(',', '').isdigit(): 
-            return my_score # Girmediyse veya tire ise olduğu gibi dön
+    def _format_score(self, exam: ExamStats) -> str:
+        """Notu renklendirir ve ortalamaya göre ok işareti ekler (Sayılar modelde bir kez parse edildi)."""
+        if exam.score_state is not ScoreState.NUMBER:
+            return exam.score # Girmediyse veya tire ise olduğu gibi dön
 
-        score_val = float(my_score.replace(',', '.'))
+        score_val = exam.score_value
         
         # Renklendirme
         color = "white"
@@ -51,18 +52,16 @@ class DisplayManager:
         
         # Ortalama Kıyaslaması
         icon = ""
-        if class_avg.replace(',', '').replace('.', '').isdigit():
-            avg_val = float(class_avg.replace(',', '.'))
+        if exam.avg_state is ScoreState.NUMBER:
+            avg_val = exam.avg_value
             if score_val > avg_val: icon = "[bold green]↑[/bold green]"
             elif score_val < avg_val: icon = "[bold red]↓[/bold red]"
         
-        return f"[{color}]{my_score}[/{color}] {icon}"
-
-    def render_grades(self, grades: List[CourseGrade], term_name: str):
-        if not grades:
-            self.console.print("[yellow]Gösterilecek not bulunamadı.[/yellow]")
-            return
+        return f"[{color}]{exam.score}[/{color}] {icon}"
 
+    def _build_table(self, grades: List[CourseGrade], term_name: str, pending: Optional[Set[int]] = None) -> Table:
+        """Not tablosunu kurar. pending: Ortalaması henüz gelmemiş satırların index'leri."""
+        pending = pending or set()
         table = Table(
             title=f"Not Durumu ({term_name})", 
             box=box.ROUNDED, 
@@ -87,11 +86,16 @@ class DisplayManager:
         
         table.add_column("Harf", justify="center", style="bold white")
 
-        for g in grades:
+        for idx, g in enumerate(grades):
             # Notları formatla
-            v_str = self._format_score(g.midterm.score, g.midterm.class_avg)
-            f_str = self._format_score(g.final.score, g.final.class_avg)
-            b_str = self._format_score(g.makeup.score, g.makeup.class_avg)
+            v_str = self._format_score(g.midterm)
+            f_str = self._format_score(g.final)
+            b_str = self._format_score(g.makeup)
+
+            # Ortalamalar yoldaysa '?' yerine bekleme işareti
+            avgs = [g.midterm.class_avg, g.final.class_avg, g.makeup.class_avg]
+            if idx in pending:
+                avgs = ["[yellow]…[/yellow]" if avg == "?" else avg for avg in avgs]
 
             # Harf notu renklendirmesi (FF ise kırmızı)
             letter = g.letter_grade
@@ -102,10 +106,76 @@ class DisplayManager:
 
             table.add_row(
                 g.name,
-                v_str, g.midterm.class_avg,
-                f_str, g.final.class_avg,
-                b_str, g.makeup.class_avg,
+                v_str, avgs[0],
+                f_str, avgs[1],
+                b_str, avgs[2],
                 letter
             )
 
-        self.console.print(table)
\ No newline at end of file
+        return table
+
+    def render_grades(self, grades: List[CourseGrade], term_name: str):
+        if not grades:
+            self.console.print("[yellow]Gösterilecek not bulunamadı.[/yellow]")
+            return
+
+        self.console.print(self._build_table(grades, term_name))
+
+    def render_grades_live(self, updates: Iterable[GradeUpdate]) -> List[CourseGrade]:
+        """OBSClient.iter_grades akışını canlı tabloda gösterir: Satırlar parse edilir edilmez,
+        ortalama hücreleri de geldikçe dolar. Akış bitince son ders listesini döner."""
+        grades: Dict[int, CourseGrade] = {}
+        pending: Set[int] = set()
+
+        def current_table() -> Table:
+            ordered = [grades[i] for i in sorted(grades)]
+            term_name = ordered[0].term_id if ordered else "Yükleniyor..."
+            return self._build_table(ordered, term_name, {pos for pos, i in enumerate(sorted(grades)) if i in pending})
+
+        from rich.live import Live # Sadece canlı tabloda gerekiyor
+        with Live(current_table(), console=self.console, refresh_per_second=8) as live:
+            for update in updates:
+                grades[update.index] = update.course
+                if update.stats_ready:
+                    pending.discard(update.index)
+                else:
+                    pending.add(update.index)
+                live.update(current_table())
+
+        result = [grades[i] for i in sorted(grades)]
+        if not result:
+            self.console.print("[yellow]Gösterilecek not bulunamadı.[/yellow]")
+        return result
+
+    def render_profile(self, rows: List[Dict], wall_seconds: float):
+        """Profiler.summary() çıktısını aşama bazında tablo olarak basar."""
+        table = Table(
+            title=f"Profil (Toplam {wall_seconds:.2f} sn)",
+            box=box.ROUNDED,
+            header_style="bold magenta"
+        )
+        table.add_column("Aşama", style="cyan", no_wrap=True)
+        table.add_column("Tür", style="dim")
+        table.add_column("Adet", justify="right")
+        table.add_column("Toplam ms", justify="right")
+        table.add_column("Ort. ms", justify="right")
+        table.add_column("p95 ms", justify="right")
+        table.add_column("Giden KB", justify="right")
+        table.add_column("Gelen KB", justify="right")
+        table.add_column("Hata", justify="right")
+
+        for row in rows:
+            is_http = row["kind"] == "http"
+            table.add_row(
+                row["name"],
+                row["kind"],
+                str(row["count"]),
+                f"{row['total_ms']:.1f}",
+                f"{row['avg_ms']:.1f}",
+                f"{row['p95_ms']:.1f}",
+                f"{row['bytes_out'] / 1024:.1f}" if is_http else "",
+                f"{row['bytes_in'] / 1024:.1f}" if is_http else "",
+                f"[red]{row['errors']}[/red]" if row["errors"] else ""
+            )
+
+        self.console.print(table)
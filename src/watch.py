@@ -0,0 +1,97 @@
+import random
+import threading
+from typing import List, Callable, Optional
+
+from src.models import CourseGrade
+from src.services.grade_cache import GradeCache
+from src.services.obs_client import OBSClient, SessionExpiredError
+
+# --- ZAMANLAMA AYARLARI ---
+DEFAULT_INTERVAL = 15 * 60   # Normal yoklama aralığı (sn)
+ERROR_BACKOFF_BASE = 30      # İlk hatadan sonra bekleme (sn), her hatada ikiye katlanır
+MAX_BACKOFF = 60 * 60        # Bekleme üst sınırı (sn)
+JITTER = 0.2                 # Bekleme süreleri ±%20 rastgele kaydırılır (Sunucuya hep aynı anda gidilmesin)
+
+class GradeWatcher:
+    """
+    Tek bir oturumu canlı tutarak not sayfasını periyodik yoklar ve sadece değişen dersleri bildirir.
+    Oturum düşerse sessizce yeniden giriş yapar. İstatistik sayfaları sadece satırı değişen
+    dersler için çekilir (İstemcinin GradeCache'i; yoksa bellekte bir tane kurulur).
+    captcha_factory her yeniden girişte yeni bir captcha callback'i üretir (Örn: create_auto_captcha_handler):
+    Callback'lerin pas sayaçları giriş başına tutulur, oturumlar arasında taşınmamalı.
+    """
+
+    def __init__(self, client: OBSClient, username: str, password: str,
+                 captcha_factory: Callable[[], Callable[[bytes, int], Optional[str]]],
+                 interval: float = DEFAULT_INTERVAL,
+                 on_poll: Optional[Callable[[], None]] = None):
+        self.client = client
+        if self.client.grade_cache is None:
+            self.client.grade_cache = GradeCache()
+        self.username = username
+        self.password = password
+        self.captcha_factory = captcha_factory
+        self.interval = interval
+        self.on_poll = on_poll # Her başarılı yoklamadan sonra (Örn: oturumu kasaya yazmak için)
+        self.snapshot: Optional[List[CourseGrade]] = None
+        self.errors = 0
+
+    def _login(self):
+        if not self.client.login(self.username, self.password, self.captcha_factory()):
+            raise Exception("Yeniden giriş başarısız (şifre veya captcha hatalı).")
+
+    def _fetch(self) -> List[CourseGrade]:
+        try:
+            return self.client.fetch_grades()
+        except SessionExpiredError:
+            # Oturum düşmüş: Sessizce tekrar giriş yap ve bir kez daha dene
+            self.client.session.cookies.clear()
+            self._login()
+            return self.client.fetch_grades()
+
+    @staticmethod
+    def diff(old: Optional[List[CourseGrade]], new: List[CourseGrade]) -> List[CourseGrade]:
+        """Yeni listede, önceki anlık görüntüye göre değişen (veya yeni eklenen) dersler."""
+        old_by_code = {g.code: g for g in old or []}
+        return [g for g in new if old_by_code.get(g.code) != g]
+
+    def poll(self) -> List[CourseGrade]:
+        """Tek yoklama: Değişen dersleri döner. İlk yoklamada tüm liste döner (başlangıç durumu)."""
+        grades = self._fetch()
+        changed = self.diff(self.snapshot, grades)
+        self.snapshot = grades
+        if self.on_poll:
+            self.on_poll()
+        return changed
+
+    def next_delay(self) -> float:
+        """Başarıdan sonra normal aralık, hatalardan sonra üstel artan bekleme (ikisi de jitter'lı)."""
+        if self.errors:
+            delay = min(MAX_BACKOFF, ERROR_BACKOFF_BASE * (2 ** (self.errors - 1)))
+        else:
+            delay = self.interval
+        return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def run(self, on_change: Callable[[List[CourseGrade], bool], None],
+            on_error: Optional[Callable[[Exception, float], None]] = None,
+            stop_event: Optional[threading.Event] = None):
+        """
+        stop_event set edilene kadar (veya Ctrl+C) yoklar.
+        on_change(değişen_dersler, ilk_yoklama_mı), on_error(hata, sonraki_bekleme_sn).
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            initial = self.snapshot is None
+            try:
+                changed = self.poll()
+                self.errors = 0
+                if changed:
+                    on_change(changed, initial)
+            except Exception as e:
+                self.errors += 1
+                delay = self.next_delay()
+                if on_error:
+                    on_error(e, delay)
+                stop_event.wait(delay)
+                continue
+            stop_event.wait(self.next_delay())